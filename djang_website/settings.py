@@ -93,6 +93,21 @@ DATABASES = {
 }
 
 
+# Önbellekler
+# 'counters': yazılmamış görüntülenme artışları; ayıklanırsa artışlar kaybolur
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'counters': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'view-counters',
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': 10 ** 9},  # Pratikte ayıklama yok
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
 
@@ -179,4 +194,72 @@ TINYMCE_DEFAULT_CONFIG = {
     "height": "600px",
     'image_caption': True,
     "images_upload_url": "upload_image",
-}
\ No newline at end of file
+}
+
+# Kitap işleme ayarları
+PDF_EXTRACTION_WORKERS = None  # None: CPU sayısı kadar süreç, 1: seri çıkarma
+EXTRACTION_CACHE_DIR = BASE_DIR / 'cache' / 'extraction'  # SHA-256 anahtarlı çıkarma önbelleği
+EXTRACTION_CACHE_MAX_BYTES = 512 * 1024 * 1024  # Aşılınca en eski kayıtlar silinir
+
+# Kitap işleme kuyruğu (python manage.py process_jobs)
+AI_PROVIDER = 'openai'  # openai, gemini veya local
+PROCESSING_WORKER_CONCURRENCY = 1  # Aynı anda çalışan görev sayısı
+PROCESSING_JOB_LEASE_SECONDS = 300  # Sinyal gelmezse görev bu süre sonunda başka işçiye geçer
+PROCESSING_JOB_MAX_ATTEMPTS = 3
+PROCESSING_JOB_RETRY_BACKOFF = 30  # Yeniden deneme gecikmesi: 30, 60, 120... saniye
+
+# AI sağlayıcı istemcileri (süreç genelinde paylaşılır)
+OPENAI_BASE_URL = ''  # Boş: varsayılan API adresi. Testlerde yerel sahte sunucu verilebilir.
+GEMINI_BASE_URL = ''
+AI_HTTP_POOL_SIZE = 10  # Sağlayıcı başına açık tutulacak en fazla bağlantı
+AI_HTTP_TIMEOUT = 120  # saniye
+AI_SUMMARY_CONCURRENCY = 4  # Bölüm özetleri için aynı anda gönderilen istek sayısı
+AI_TOKENS_PER_MINUTE = 0  # Dakikalık token bütçesi, 0: sınırsız
+AI_BOOK_SUMMARY_MODE = 'combined'  # combined: üç özet tek istekte, derived: detaylı özetten türet, separate: ayrı istekler,
+                                  # stream: özetler akış halinde parça parça kaydedilir, hata sonrası kaldığı yerden sürer
+
+# AI yanıt önbelleği (sağlayıcı, model, istem sürümü, özet tipi ve metin özetine göre)
+AI_RESPONSE_CACHE_ENABLED = True
+AI_RESPONSE_CACHE_PATH = BASE_DIR / 'cache' / 'ai_responses.sqlite3'
+AI_RESPONSE_CACHE_TTL = 30 * 24 * 3600  # saniye, 0: süresiz
+AI_RESPONSE_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Aşılınca en az kullanılan kayıtlar silinir
+
+# AI sağlayıcı hız sınırları ve yeniden deneme (429 yanıtlarında Retry-After dikkate alınır)
+AI_REQUESTS_PER_MINUTE = 0  # Dakikalık istek sınırı, 0: sınırsız
+AI_MAX_RETRIES = 5
+AI_RETRY_BASE_DELAY = 1.0  # saniye; deneme n için en fazla base * 2**n (jitter ile)
+AI_RETRY_MAX_DELAY = 60.0
+
+# Yerel özetleyici (AI_PROVIDER = 'local'): ağ ve ücret gerektirmez
+AI_LOCAL_PROVIDER_LATENCY = 0  # Her isteğe eklenecek yapay gecikme (saniye), yük testleri için
+AI_FALLBACK_PROVIDER = ''  # Örn. 'local': uzak sağlayıcı hata verirse bu sağlayıcı kullanılır
+
+# Kitap etiketleri için TF-IDF modeli (python manage.py update_book_tags)
+KEYWORD_INDEX_PATH = BASE_DIR / 'cache' / 'keywords.json.z'
+
+# Akış halinde özet üretimi (AI_BOOK_SUMMARY_MODE = 'stream')
+AI_SUMMARY_FLUSH_SECONDS = 1.0  # Yarım özet en geç bu aralıkla kaydedilir
+AI_SUMMARY_FLUSH_CHARS = 400  # veya bu kadar yeni karakter biriktiğinde
+
+# Tamponlu görüntülenme sayaçları (python manage.py flush_view_counts)
+# Birden fazla süreçte çalışırken VIEW_COUNTER_CACHE ortak bir önbellek (Redis, Memcached) olmalıdır;
+# süreç içi önbellekte flush_view_counts çalışmaz, her süreç kendi artışlarını zamanlayıcıyla yazar
+VIEW_COUNTER_CACHE = 'counters'
+VIEW_COUNTER_FLUSH_INTERVAL = 60  # saniye; bekleyen artışlar en geç bu aralıkla yazılır
+
+# Listeleme sayfalaması: 'cursor' (imleçli, COUNT/OFFSET yok) veya 'page' (sayfa numaralı)
+PAGINATION_MODE = 'cursor'
+PAGINATION_COUNT_CACHE_TIMEOUT = 300  # saniye; imleçli modda gösterilen yaklaşık toplam
+
+# SiteSettings önbelleği; birden fazla süreçte ortak bir önbellek (Redis, Memcached) olmalıdır
+SITE_SETTINGS_CACHE = 'default'
+
+# Anonim ziyaretçiler için sayfa önbelleği (anasayfa, blog ve kitap listeleri, kitap detayı)
+# İçerik kaydedildiğinde ilgili sayfalar etiketlerle yenilenir
+PAGE_CACHE = 'default'
+PAGE_CACHE_ENABLED = True
+PAGE_CACHE_TIMEOUT = 300  # saniye
+PAGE_CACHE_LOCK_WAIT = 5  # Aynı sayfayı başka istek üretirken en fazla bekleme (saniye)
+
+# header, footer ve slider şablon parçaları önbelleği (site ayarları sürümü ve kullanıcı durumuna göre)
+FRAGMENT_CACHE_TIMEOUT = 3600  # saniye, 0: önbelleğe alma
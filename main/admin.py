@@ -1,7 +1,11 @@
 from django.contrib import admin
-from .models import Article, ArticleSeries, SiteSettings, Book, Chapter, BookSummary, BookCategory
+from django.db.models import Count
+from .models import Article, ArticleSeries, SiteSettings, Book, Chapter, BookSummary, BookCategory, ProcessingJob
+from django.urls import reverse
 from django.utils.html import format_html
 
+from .services import search
+
 
 @admin.register(ArticleSeries)
 class ArticleSeriesAdmin(admin.ModelAdmin):
@@ -20,10 +24,14 @@ class ArticleSeriesAdmin(admin.ModelAdmin):
         'published'
     ]
     
+    def get_queryset(self, request):
+        # Makale sayısı satır başına COUNT yerine tek sorguda hesaplanır
+        return super().get_queryset(request).select_related('author').annotate(article_total=Count('article'))
+    
     def article_count(self, obj):
-        count = obj.article_set.count()
-        return format_html('<span style="font-weight: bold; color: #667eea;">{} Makale</span>', count)
+        return format_html('<span style="font-weight: bold; color: #667eea;">{} Makale</span>', obj.article_total)
     article_count.short_description = 'Makale Sayısı'
+    article_count.admin_order_field = 'article_total'
     
     def published_badge(self, obj):
         return format_html(
@@ -63,6 +71,9 @@ class ArticleAdmin(admin.ModelAdmin):
         })
     ]
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('series', 'author')
+    
     def status_badge(self, obj):
         return format_html(
             '<span style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 3px 10px; border-radius: 12px; font-size: 11px;">Yayında</span>'
@@ -161,6 +172,15 @@ class BookCategoryAdmin(admin.ModelAdmin):
     color_badge.short_description = 'Renk Önizleme'
 
 
+class BookListFilter(admin.RelatedFieldListFilter):
+    """Kitap filtresi; kitap adı yazar adını da içerdiğinden yazarlar tek sorguda gelir"""
+    
+    def field_choices(self, field, request, model_admin):
+        ordering = self.field_admin_ordering(field, request, model_admin) or Book._meta.ordering
+        books = Book.objects.select_related('author').order_by(*ordering)
+        return [(book.pk, str(book)) for book in books]
+
+
 class ChapterInline(admin.TabularInline):
     model = Chapter
     extra = 0
@@ -174,7 +194,7 @@ class BookAdmin(admin.ModelAdmin):
     list_filter = ['status', 'category', 'is_processed', 'has_toc', 'has_summary', 'created_at']
     search_fields = ['title', 'author__username', 'isbn', 'description']
     readonly_fields = ['slug', 'created_at', 'updated_at', 'view_count', 'download_count', 
-                       'file_type', 'file_size', 'is_processed', 'processing_error']
+                       'file_type', 'file_size', 'is_processed', 'processing_error', 'processing_status']
     
     fieldsets = [
         ("Temel Bilgiler", {
@@ -190,7 +210,7 @@ class BookAdmin(admin.ModelAdmin):
             "fields": ['status', 'rejection_reason', 'approved_by', 'published_at']
         }),
         ("AI İşleme", {
-            "fields": ['is_processed', 'has_toc', 'has_summary', 'processing_error'],
+            "fields": ['is_processed', 'has_toc', 'has_summary', 'processing_status', 'processing_error'],
             "classes": ['collapse']
         }),
         ("İstatistikler", {
@@ -205,8 +225,16 @@ class BookAdmin(admin.ModelAdmin):
     
     inlines = [ChapterInline]
     
+    class Media:
+        # processing_status alanındaki görev durumunu canlı günceller
+        js = ['admin/js/processing_status.js']
+    
     actions = ['approve_books', 'publish_books', 'reject_books', 'process_with_ai']
     
+    def get_queryset(self, request):
+        # category boş olabildiğinden Django'nun otomatik select_related'ı onu atlar
+        return super().get_queryset(request).select_related('author', 'category')
+    
     def status_badge(self, obj):
         colors = {
             'draft': 'gray',
@@ -223,6 +251,19 @@ class BookAdmin(admin.ModelAdmin):
         )
     status_badge.short_description = 'Durum'
     
+    def processing_status(self, obj):
+        job = obj.processing_jobs.first()
+        if not job:
+            return '-'
+        return format_html(
+            '<span data-processing-status-url="{}">{} - {} (%{})</span>',
+            reverse('book_processing_status', args=[obj.slug]),
+            job.get_status_display(),
+            job.get_stage_display(),
+            job.progress,
+        )
+    processing_status.short_description = 'İşleme Durumu'
+    
     def approve_books(self, request, queryset):
         updated = queryset.filter(status='pending').update(
             status='approved',
@@ -247,18 +288,35 @@ class BookAdmin(admin.ModelAdmin):
     reject_books.short_description = 'Seçili kitapları reddet'
     
     def process_with_ai(self, request, queryset):
-        # TODO: AI işleme fonksiyonunu çağır
-        self.message_user(request, 'AI işleme başlatıldı (yakında eklenecek).')
+        from .services.job_queue import enqueue_book_processing
+        jobs = [enqueue_book_processing(book) for book in queryset]
+        self.message_user(
+            request,
+            f'{len(jobs)} kitap işleme kuyruğuna eklendi. İlerlemeyi "İşleme Görevleri" sayfasından takip edebilirsiniz.'
+        )
     process_with_ai.short_description = 'AI ile işle (içindekiler + özet)'
 
 
 @admin.register(Chapter)
 class ChapterAdmin(admin.ModelAdmin):
     list_display = ['title', 'book', 'order', 'level', 'page_start', 'page_end', 'word_count']
-    list_filter = ['book', 'level', 'created_at']
-    search_fields = ['title', 'book__title', 'content']
+    list_filter = [('book', BookListFilter), 'level', 'created_at']
+    search_fields = ['title', 'book__title']
     readonly_fields = ['slug', 'created_at', 'updated_at']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('book__author')
+    
+    def get_search_results(self, request, queryset, search_term):
+        """İçerik araması LIKE yerine bölüm indeksinden yapılır (indeks yoksa LIKE)"""
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if not search_term:
+            return results, may_have_duplicates
+        chapter_ids = search.search_chapter_ids(search_term)
+        if chapter_ids is None:
+            return results | queryset.filter(content__icontains=search_term), may_have_duplicates
+        return results | queryset.filter(pk__in=chapter_ids), may_have_duplicates
+    
     fieldsets = [
         ("Temel Bilgiler", {
             "fields": ['book', 'title', 'slug', 'order', 'level', 'parent']
@@ -295,4 +353,56 @@ class BookSummaryAdmin(admin.ModelAdmin):
             "fields": ['is_premium_only']
         }),
     ]
+    
+    def get_queryset(self, request):
+        # Kitap adı yazarı, bölüm adı kitabı içerir
+        return super().get_queryset(request).select_related('book__author', 'chapter__book')
+
 
+@admin.register(ProcessingJob)
+class ProcessingJobAdmin(admin.ModelAdmin):
+    list_display = ['book', 'status', 'stage', 'progress_bar', 'attempts', 'locked_by', 'heartbeat_at', 'created_at']
+    list_filter = ['status', 'stage', 'provider', 'created_at']
+    search_fields = ['book__title', 'locked_by', 'last_error']
+    readonly_fields = ['status', 'stage', 'progress', 'attempts', 'run_after', 'last_error', 'locked_by',
+                       'lease_expires_at', 'heartbeat_at', 'created_at', 'started_at', 'finished_at']
+    
+    fieldsets = [
+        ("Görev", {
+            "fields": ['book', 'provider', 'max_attempts']
+        }),
+        ("Durum", {
+            "fields": ['status', 'stage', 'progress', 'attempts', 'run_after', 'last_error']
+        }),
+        ("İşçi", {
+            "fields": ['locked_by', 'lease_expires_at', 'heartbeat_at'],
+            "classes": ['collapse']
+        }),
+        ("Tarihler", {
+            "fields": ['created_at', 'started_at', 'finished_at'],
+            "classes": ['collapse']
+        }),
+    ]
+    
+    actions = ['retry_jobs']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('book__author')
+    
+    def progress_bar(self, obj):
+        return format_html(
+            '<div style="width: 120px; background: #eee; border-radius: 3px;">'
+            '<div style="width: {}%; background: #667eea; color: white; font-size: 11px; padding: 2px 0; border-radius: 3px; text-align: center;">%{}</div>'
+            '</div>',
+            obj.progress,
+            obj.progress,
+        )
+    progress_bar.short_description = 'İlerleme'
+    
+    def retry_jobs(self, request, queryset):
+        from django.utils import timezone
+        updated = queryset.filter(status='failed').update(
+            status='queued', stage='queued', progress=0, attempts=0, run_after=timezone.now(), last_error=''
+        )
+        self.message_user(request, f'{updated} görev yeniden sıraya alındı.')
+    retry_jobs.short_description = 'Başarısız görevleri yeniden dene'
@@ -1,4 +1,23 @@
+from django.conf import settings as django_settings
+
 from .models import SiteSettings
+from .services.site_settings_cache import get_settings_version
+
+
+def fragment_user_state(user) -> str:
+    """
+    Şablon parçalarının önbellek anahtarı için kaba kullanıcı durumu
+    Örn. 'anonymous', 'reader', 'author+premium', 'staff+reader'. Kullanıcıya
+    özel değerler (kullanıcı adı vb.) önbelleğe alınan parçalarda kullanılmamalıdır.
+    """
+    if not user.is_authenticated:
+        return 'anonymous'
+    states = ['author' if user.user_role == 'author' else 'reader']
+    if user.is_premium_active:
+        states.append('premium')
+    if user.is_staff:
+        states.insert(0, 'staff')
+    return '+'.join(states)
 
 
 def site_settings(request):
@@ -9,6 +28,9 @@ def site_settings(request):
     {{ site_settings.site_name }}
     {{ site_settings.logo.url }}
     {{ site_settings.contact_email }}
+    
+    Şablon parçası önbelleği (header, footer, slider):
+    {% cache fragment_cache_timeout header_menu fragment_cache_key %}
     """
     settings = SiteSettings.get_settings()
     
@@ -17,4 +39,7 @@ def site_settings(request):
         'site_name': settings.site_name,
         'site_logo': settings.logo,
         'maintenance_mode': settings.maintenance_mode,
+        # Şablonda kullanılırsa hesaplanır (çağrılabilir değerler şablonda çağrılır)
+        'fragment_cache_key': lambda: f'{get_settings_version()}:{fragment_user_state(request.user)}',
+        'fragment_cache_timeout': getattr(django_settings, 'FRAGMENT_CACHE_TIMEOUT', 3600),
     }
@@ -1,6 +1,12 @@
+from functools import wraps
+
 from django.shortcuts import redirect
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from django.contrib import messages
 
+from .services import page_cache
+
 def user_is_superuser(function=None, redirect_url='/'):
     """
     Decorator for views that checks that the user is superuser, redirecting
@@ -19,4 +25,59 @@ def user_is_superuser(function=None, redirect_url='/'):
     if function:
         return decorator(function)
 
-    return decorator
\ No newline at end of file
+    return decorator
+
+
+def cache_anonymous_page(*tags, on_hit=None):
+    """
+    Görünümün anonim ziyaretçilere giden yanıtını önbelleğe alır
+    tags: Sayfanın bağlı olduğu etiketler; ilgili model kaydedilince sayfa yenilenir
+    on_hit: Önbellekten sunulurken çağrılır (örn. görüntülenme sayacı), bkz. page_cache
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            return page_cache.cached_response(
+                request, lambda: view_func(request, *args, **kwargs), tags, on_hit=on_hit
+            )
+
+        return _wrapped_view
+
+    return decorator
+
+
+def conditional_page(validators, on_not_modified=None):
+    """
+    ETag / Last-Modified ile koşullu GET; içerik değişmediyse görünüm çalışmadan 304 döner
+    validators: validators(request, *args, **kwargs) -> ((etag, last_modified), meta) ya da
+                sayfa bulunamadıysa None (görünüm normal çalışır); last_modified None olabilir
+    on_not_modified: 304 dönülürken çağrılır: on_not_modified(request, meta)
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+            found = validators(request, *args, **kwargs)
+            if found is None:
+                return view_func(request, *args, **kwargs)
+
+            (etag, last_modified), meta = found
+            response = get_conditional_response(
+                request, etag=etag, last_modified=int(last_modified.timestamp()) if last_modified else None,
+            )
+            if response is not None:
+                if response.status_code == 304 and on_not_modified is not None:
+                    on_not_modified(request, meta)
+                return response
+
+            response = view_func(request, *args, **kwargs)
+            if response.status_code == 200:
+                response.headers.setdefault('ETag', etag)
+                if last_modified:
+                    response.headers.setdefault('Last-Modified', http_date(last_modified.timestamp()))
+            return response
+
+        return _wrapped_view
+
+    return decorator
@@ -0,0 +1,49 @@
+"""
+Kitap özeti token kullanımı testi (yerel sahte sağlayıcı ile)
+Kullanım: python manage.py benchmark_book_summary --chars 6000 --latency 0.1
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from main.services import ai_service
+from main.services.fake_provider import FakeProviderServer
+
+
+class Command(BaseCommand):
+    help = 'Kitap özetlerini (kısa, orta, detaylı) üretme yöntemlerinin istek ve token sayılarını karşılaştırır'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chars', type=int, default=6000, help='Kitap metni uzunluğu (karakter)')
+        parser.add_argument('--latency', type=float, default=0.1, help='Sahte sağlayıcı gecikmesi (sn)')
+
+    def handle(self, *args, **options):
+        try:
+            import openai  # noqa: F401
+        except ImportError:
+            raise CommandError('openai paketi yüklü değil. pip install openai')
+
+        sentence = 'Lorem ipsum dolor sit amet. '
+        book_text = sentence * (options['chars'] // len(sentence))
+        reply = 'Sahte özet cümlesi. ' * 20
+
+        with FakeProviderServer(latency=options['latency'], reply=reply) as server, \
+                override_settings(OPENAI_BASE_URL=server.base_url, OPENAI_API_KEY='benchmark',
+                                  AI_RESPONSE_CACHE_ENABLED=False):
+            ai_service.reset_provider_clients()
+            baseline = None
+            for mode in ['separate', 'derived', 'combined']:
+                server.requests.clear()
+                started = time.perf_counter()
+                summaries = ai_service.generate_book_summary(book_text, mode=mode)
+                elapsed = time.perf_counter() - started
+
+                tokens = sum(result.get('token_count') or 0 for result in summaries.values())
+                errors = [t for t, result in summaries.items() if result.get('error')]
+                baseline = baseline or tokens
+                self.stdout.write(
+                    f"{mode:<10} istek: {len(server.requests)}  token: {tokens:6d} "
+                    f"({tokens / baseline:6.1%})  {elapsed:6.2f} sn  hata: {len(errors)}"
+                )
+            ai_service.reset_provider_clients()
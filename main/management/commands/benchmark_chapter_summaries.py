@@ -0,0 +1,53 @@
+"""
+Bölüm özetleme performans testi (yerel sahte sağlayıcı ile)
+Kullanım: python manage.py benchmark_chapter_summaries --chapters 40 --latency 0.3 --concurrency 8
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from main.services import ai_service
+from main.services.fake_provider import FakeProviderServer
+from main.services.rate_limit import reset_rate_limiters
+
+
+class Command(BaseCommand):
+    help = 'Bölüm özetlerini seri ve paralel üretme sürelerini sahte sağlayıcı üzerinde karşılaştırır'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chapters', type=int, default=40, help='Bölüm sayısı')
+        parser.add_argument('--latency', type=float, default=0.3, help='Sahte sağlayıcı gecikmesi (sn)')
+        parser.add_argument('--concurrency', type=int, default=8, help='Paralel istek sayısı')
+        parser.add_argument('--tokens-per-minute', type=int, default=0, help='Dakikalık token bütçesi (0: sınırsız)')
+
+    def handle(self, *args, **options):
+        try:
+            import openai  # noqa: F401
+        except ImportError:
+            raise CommandError('openai paketi yüklü değil. pip install openai')
+
+        chapters = [
+            {'order': i + 1, 'title': f'Bölüm {i + 1}', 'content': 'Lorem ipsum dolor sit amet. ' * 200}
+            for i in range(options['chapters'])
+        ]
+
+        with FakeProviderServer(latency=options['latency']) as server, \
+                override_settings(OPENAI_BASE_URL=server.base_url, OPENAI_API_KEY='benchmark',
+                                  AI_RESPONSE_CACHE_ENABLED=False,
+                                  AI_TOKENS_PER_MINUTE=options['tokens_per_minute']):
+            ai_service.reset_provider_clients()
+            runs = [('seri', 1), (f"paralel ({options['concurrency']})", options['concurrency'])]
+            for name, concurrency in runs:
+                started = time.perf_counter()
+                reset_rate_limiters()
+                results = ai_service.generate_all_chapter_summaries(chapters, concurrency=concurrency)
+                elapsed = time.perf_counter() - started
+
+                errors = [r for r in results if r['error']]
+                in_order = [r['chapter_order'] for r in results] == [c['order'] for c in chapters]
+                self.stdout.write(
+                    f"{name:<16} {elapsed:7.2f} sn  {len(chapters) / elapsed:7.1f} bölüm/sn  "
+                    f"hata: {len(errors)}  sıra korundu: {'evet' if in_order else 'HAYIR'}"
+                )
+            ai_service.reset_provider_clients()
@@ -0,0 +1,113 @@
+"""
+PDF metin çıkarma performans testi
+Kullanım: python manage.py benchmark_pdf_extraction --pages 400 --workers 4
+"""
+import os
+import tempfile
+import time
+from typing import List, Optional
+
+from django.core.management.base import BaseCommand
+
+from main.services.document_processor import DocumentProcessor
+
+
+def build_sample_pdf(file_path: str, page_count: int, lines_per_page: int = 40,
+                     pages: Optional[List[List[str]]] = None) -> None:
+    """
+    Her sayfasında metin olan basit bir PDF dosyası oluşturur
+    pages verilirse sayfa satırları (ASCII) buradan alınır, page_count yok sayılır.
+    """
+    if pages is None:
+        pages = [
+            [f"Sayfa {page_no} satir {line_no}: Lorem ipsum dolor sit amet consectetur"
+             for line_no in range(1, lines_per_page + 1)]
+            for page_no in range(1, page_count + 1)
+        ]
+    page_count = len(pages)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Sayfa listesi en sonda doldurulur
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for page in pages:
+        lines = [b"BT /F1 10 Tf 40 800 Td 12 TL"]
+        for line in page:
+            escaped = line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+            lines.append(b"(%s) '" % escaped.encode('latin-1'))
+        lines.append(b"ET")
+        stream = b"\n".join(lines)
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, page_count)
+
+    with open(file_path, 'wb') as pdf:
+        pdf.write(b"%PDF-1.4\n")
+        offsets = []
+        for obj_id, body in enumerate(objects, start=1):
+            offsets.append(pdf.tell())
+            pdf.write(b"%d 0 obj\n%s\nendobj\n" % (obj_id, body))
+        xref_offset = pdf.tell()
+        pdf.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            pdf.write(b"%010d 00000 n \n" % offset)
+        pdf.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset))
+
+
+def legacy_extract_text_from_pdf(file_path: str) -> str:
+    """Eski seri çıkarma (karşılaştırma için)"""
+    import PyPDF2
+
+    text = ""
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        for page in pdf_reader.pages:
+            text += page.extract_text() + "\n"
+    return text
+
+
+class Command(BaseCommand):
+    help = 'PDF metin çıkarma hızını (sayfa/saniye) eski ve paralel yöntemle karşılaştırır'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=400, help='Oluşturulacak PDF sayfa sayısı')
+        parser.add_argument('--workers', type=int, default=None, help='Paralel mod için süreç sayısı')
+        parser.add_argument('--repeat', type=int, default=1, help='Her ölçümün tekrar sayısı')
+
+    def handle(self, *args, **options):
+        pages = options['pages']
+        workers = options['workers'] or DocumentProcessor.get_pdf_workers()
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, 'benchmark.pdf')
+            build_sample_pdf(file_path, pages)
+            self.stdout.write(f"{pages} sayfalık PDF oluşturuldu ({os.path.getsize(file_path)} bytes)")
+
+            runs = [
+                ('eski (text +=)', lambda: legacy_extract_text_from_pdf(file_path)),
+                ('seri', lambda: DocumentProcessor.extract_text_from_pdf(file_path, workers=1)),
+                (f'paralel ({workers} süreç)', lambda: DocumentProcessor.extract_text_from_pdf(file_path, workers=workers)),
+            ]
+
+            reference = None
+            for name, run in runs:
+                best = None
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    text = run()
+                    elapsed = time.perf_counter() - started
+                    best = elapsed if best is None else min(best, elapsed)
+
+                if reference is None:
+                    reference = text
+                elif text != reference:
+                    self.stderr.write(self.style.ERROR(f"{name}: çıktı eski yöntemle aynı değil!"))
+
+                self.stdout.write(f"{name:<24} {best:8.3f} sn  {pages / best:10.1f} sayfa/sn")
@@ -0,0 +1,71 @@
+"""
+Header, footer ve slider şablon parçalarının önbellekli/önbelleksiz render süresi
+Geçici bir test veritabanında her kullanıcı durumu için parçaları tekrar tekrar render eder.
+Kullanım: python manage.py benchmark_template_fragments --requests 500
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.template.loader import get_template
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from main.models import SiteSettings
+
+FRAGMENTS = ['includes/header.html', 'includes/slider.html', 'includes/footer.html']
+
+
+class Command(BaseCommand):
+    help = 'Şablon parçası önbelleğinin istek başına render süresine etkisini ölçer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Durum başına istek sayısı')
+
+    def handle(self, *args, **options):
+        # Asıl veritabanına dokunmamak için geçici test veritabanı
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.run_benchmark(options['requests'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def run_benchmark(self, requests):
+        site_settings = SiteSettings.get_settings()
+        site_settings.enable_banner = True
+        site_settings.contact_email = 'iletisim@example.com'
+        site_settings.save()
+
+        User = get_user_model()
+        users = {
+            'anonymous': AnonymousUser(),
+            'reader': User.objects.create_user('okur', 'okur@example.com', 'parola'),
+            'author': User.objects.create_user('yazar', 'yazar@example.com', 'parola', user_role='author'),
+            'staff': User.objects.create_user('yonetici', 'yonetici@example.com', 'parola', is_staff=True),
+        }
+        templates = [get_template(name) for name in FRAGMENTS]
+
+        self.stdout.write(f"{'durum':<12}{'önbelleksiz':>14}{'önbellekli':>14}{'kazanç':>10}")
+        for state, user in users.items():
+            request = RequestFactory().get('/')
+            request.user = user
+            with override_settings(FRAGMENT_CACHE_TIMEOUT=0):
+                uncached = self.measure(templates, request, requests)
+            cache.clear()
+            cached = self.measure(templates, request, requests)
+            self.stdout.write(
+                f"{state:<12}{uncached * 1000:>11.3f} ms{cached * 1000:>11.3f} ms{uncached / cached:>9.1f}x"
+            )
+
+    def measure(self, templates, request, requests):
+        """İstek başına ortalama süre (saniye); ilk (ısınma) render sayılmaz"""
+        for template in templates:
+            template.render(request=request)
+        started = time.perf_counter()
+        for _ in range(requests):
+            for template in templates:
+                template.render(request=request)
+        return (time.perf_counter() - started) / requests
@@ -0,0 +1,115 @@
+"""
+İçindekiler tespiti ve bölümlere ayırma performans testi
+Kullanım: python manage.py benchmark_toc_detection --lines 50000
+"""
+import random
+import re
+import time
+
+from django.core.management.base import BaseCommand
+
+from main.services.document_processor import ChapterExtractor, TableOfContentsExtractor
+
+
+def build_sample_text(line_count: int, chapter_every: int = 250, seed: int = 42) -> str:
+    """Aralarda farklı başlık kalıpları olan sentetik bir kitap metni üretir"""
+    rng = random.Random(seed)
+    words = ['kitap', 'bölüm', 'okuma', 'yazar', 'veri', 'model', 'sistem', 'analiz', 'Lorem', 'ipsum']
+    headings = [
+        lambda n: f"BÖLÜM {n}: Başlık {n}",
+        lambda n: f"Chapter {n}. Title",
+        lambda n: f"{n}. Alt Başlık",
+        lambda n: f"  GİRİŞ VE TEMEL KAVRAMLAR {n}  ",
+    ]
+    lines = []
+    for i in range(line_count):
+        if i % chapter_every == 0:
+            lines.append(headings[(i // chapter_every) % len(headings)](i // chapter_every + 1))
+        elif i % 17 == 0:
+            lines.append('')
+        else:
+            lines.append(' '.join(rng.choice(words) for _ in range(rng.randint(6, 14))))
+    return '\n'.join(lines)
+
+
+def legacy_extract_toc_patterns(text: str):
+    """Eski satır satır, üç re.match'li içindekiler tespiti (karşılaştırma için)"""
+    chapters = []
+    lines = text.split('\n')
+    patterns = [
+        r'^(BÖLÜM|Bölüm|CHAPTER|Chapter)\s+(\d+|[IVXLCDM]+)[:\.\s]+(.+)$',
+        r'^(\d+)\.\s+(.+)$',
+        r'^([A-Z][A-ZÜĞŞIÖÇ\s]{10,})$',
+    ]
+    order = 0
+    for i, line in enumerate(lines):
+        line = line.strip()
+        if not line:
+            continue
+        for pattern in patterns:
+            if re.match(pattern, line):
+                order += 1
+                chapters.append({'order': order, 'title': line, 'line_number': i, 'level': 1})
+                break
+    return chapters
+
+
+def legacy_split_into_chapters(text: str, toc):
+    """Eski satır listesi birleştirerek bölümlere ayırma (karşılaştırma için)"""
+    if not toc:
+        return [{'order': 1, 'title': 'Tüm İçerik', 'content': text, 'level': 1}]
+    lines = text.split('\n')
+    chapters = []
+    for i, chapter_info in enumerate(toc):
+        start_line = chapter_info['line_number']
+        end_line = toc[i + 1]['line_number'] if i + 1 < len(toc) else len(lines)
+        chapters.append({
+            'order': chapter_info['order'],
+            'title': chapter_info['title'],
+            'content': '\n'.join(lines[start_line:end_line]),
+            'level': chapter_info.get('level', 1),
+        })
+    return chapters
+
+
+class Command(BaseCommand):
+    help = 'İçindekiler tespiti ve bölümlere ayırmayı eski ve tek regex\'li yöntemle karşılaştırır'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lines', type=int, default=50000, help='Sentetik kitabın satır sayısı')
+        parser.add_argument('--repeat', type=int, default=5, help='Her ölçümün tekrar sayısı')
+
+    def _best_of(self, func, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def handle(self, *args, **options):
+        text = build_sample_text(options['lines'])
+        repeat = options['repeat']
+        self.stdout.write(f"{options['lines']} satırlık metin ({len(text)} karakter)")
+
+        def legacy():
+            toc = legacy_extract_toc_patterns(text)
+            return toc, legacy_split_into_chapters(text, toc)
+
+        def current():
+            toc = TableOfContentsExtractor.extract_toc_patterns(text)
+            return toc, ChapterExtractor.split_into_chapters(text, toc)
+
+        legacy_time, (legacy_toc, legacy_chapters) = self._best_of(legacy, repeat)
+        current_time, (current_toc, current_chapters) = self._best_of(current, repeat)
+
+        same_toc = [(e['title'], e['line_number']) for e in legacy_toc] == \
+                   [(e['title'], e['line_number']) for e in current_toc]
+        if not same_toc or legacy_chapters != current_chapters:
+            self.stderr.write(self.style.ERROR("Sonuçlar eski yöntemle aynı değil!"))
+
+        self.stdout.write(f"{len(current_toc)} başlık, {len(current_chapters)} bölüm")
+        self.stdout.write(f"{'eski (satır + 3x re.match)':<30} {legacy_time * 1000:8.1f} ms")
+        self.stdout.write(f"{'tek regex + offset kesme':<30} {current_time * 1000:8.1f} ms")
+        self.stdout.write(f"{'hızlanma':<30} {legacy_time / current_time:8.1f}x")
@@ -0,0 +1,27 @@
+"""
+Tamponlanmış görüntülenme sayılarını veritabanına yazar
+Kullanım: python manage.py flush_view_counts [--wait 10]
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from main.services.view_counter import flush_all, is_process_local
+
+
+class Command(BaseCommand):
+    help = 'Önbellekte bekleyen tüm görüntülenme artışlarını F() ifadeli toplu UPDATE ile yazar'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--wait', type=float, default=10, help='Başka süreç boşaltıyorsa beklenecek süre (sn)')
+
+    def handle(self, *args, **options):
+        if is_process_local():
+            # Bu komutun süreci web süreçlerinin artışlarını göremez; boşaltma "başarılı" görünürdü
+            raise CommandError(
+                "VIEW_COUNTER_CACHE süreç içi bir önbellek; artışlar her sürecin zamanlayıcısıyla yazılır. "
+                "Bu komut için ortak bir önbellek (Redis, Memcached) yapılandırın."
+            )
+        for label, written in flush_all(all_rows=True, wait=options['wait']).items():
+            if written is None:
+                self.stderr.write(self.style.WARNING(f"{label}: başka bir süreç boşaltıyor, atlandı"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"{label}: {written} görüntülenme yazıldı"))
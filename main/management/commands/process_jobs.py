@@ -0,0 +1,51 @@
+"""
+Kitap işleme kuyruğu işçisi
+Kullanım: python manage.py process_jobs --concurrency 2
+"""
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from main.services.job_queue import make_worker_id, work
+
+
+class Command(BaseCommand):
+    help = 'Sıradaki kitap işleme görevlerini (metin, içindekiler, bölümler, özetler) çalıştırır'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int,
+            default=getattr(settings, 'PROCESSING_WORKER_CONCURRENCY', 1),
+            help='Aynı anda çalışacak görev sayısı',
+        )
+        parser.add_argument('--poll-interval', type=float, default=5.0, help='Kuyruk boşken bekleme süresi (sn)')
+        parser.add_argument('--once', action='store_true', help='Kuyruk boşalınca çık')
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options['concurrency'])
+        stop = threading.Event()
+        results = []
+
+        def run(worker_id):
+            results.append(work(worker_id, stop, options['poll_interval'], options['once']))
+
+        threads = [
+            threading.Thread(target=run, args=(make_worker_id(),), daemon=True)
+            for _ in range(concurrency)
+        ]
+        self.stdout.write(f"{concurrency} işçi başlatılıyor...")
+        for thread in threads:
+            thread.start()
+
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=1)
+        except KeyboardInterrupt:
+            self.stdout.write("Durduruluyor, çalışan görevler bitiriliyor...")
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+        self.stdout.write(self.style.SUCCESS(f"{sum(results)} görev işlendi."))
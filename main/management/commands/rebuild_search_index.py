@@ -0,0 +1,25 @@
+"""
+Kitap ve bölüm arama indekslerini (FTS5) sıfırdan kurar
+Kullanım: python manage.py rebuild_search_index
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from main.services import search
+
+
+class Command(BaseCommand):
+    help = 'Kitap ve bölüm arama indekslerini tüm kayıtlardan yeniden oluşturur'
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            raise CommandError('Arama indeksi tablosu yok (FTS5 destekli SQLite ve migrate gerekli).')
+
+        started = time.perf_counter()
+        count = search.rebuild_index()
+        chapter_count = search.rebuild_chapter_index()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{count} kitap ve {chapter_count} bölüm indekslendi ({elapsed:.2f} sn)"
+        ))
@@ -0,0 +1,28 @@
+"""
+Kitap etiketlerini TF-IDF anahtar kelimeleriyle doldurur
+Kullanım: python manage.py update_book_tags --count 10 [--overwrite] [--rebuild]
+"""
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from main.services.keywords import fill_book_tags, get_index_path
+
+
+class Command(BaseCommand):
+    help = 'Tüm kitapların bölümlerinden TF-IDF modeli kurar ve boş etiketleri tek seferde doldurur'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=10, help='Kitap başına anahtar kelime sayısı')
+        parser.add_argument('--overwrite', action='store_true', help='Mevcut etiketlerin üzerine yaz')
+        parser.add_argument('--rebuild', action='store_true', help='Modeli sıfırdan kur')
+
+    def handle(self, *args, **options):
+        if options['rebuild'] and os.path.exists(get_index_path()):
+            os.remove(get_index_path())
+
+        started = time.perf_counter()
+        updated = fill_book_tags(count=options['count'], overwrite=options['overwrite'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"{updated} kitabın etiketi güncellendi ({elapsed:.2f} sn)"))
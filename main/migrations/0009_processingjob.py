@@ -0,0 +1,134 @@
+# Generated by Django 4.2.13 on 2026-10-18 01:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0008_bookcategory_alter_book_category"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProcessingJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "provider",
+                    models.CharField(
+                        default="openai", max_length=20, verbose_name="AI Sağlayıcı"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("queued", "Sırada"),
+                            ("running", "Çalışıyor"),
+                            ("done", "Tamamlandı"),
+                            ("failed", "Başarısız"),
+                        ],
+                        db_index=True,
+                        default="queued",
+                        max_length=20,
+                        verbose_name="Durum",
+                    ),
+                ),
+                (
+                    "stage",
+                    models.CharField(
+                        choices=[
+                            ("queued", "Sırada"),
+                            ("extracting", "Metin Çıkarılıyor"),
+                            ("chapters", "Bölümler Oluşturuluyor"),
+                            ("summarizing", "Özetleniyor"),
+                            ("done", "Tamamlandı"),
+                        ],
+                        default="queued",
+                        max_length=20,
+                        verbose_name="Aşama",
+                    ),
+                ),
+                (
+                    "progress",
+                    models.PositiveSmallIntegerField(
+                        default=0, verbose_name="İlerleme (%)"
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveSmallIntegerField(
+                        default=0, verbose_name="Deneme Sayısı"
+                    ),
+                ),
+                (
+                    "max_attempts",
+                    models.PositiveSmallIntegerField(
+                        default=3, verbose_name="En Fazla Deneme"
+                    ),
+                ),
+                (
+                    "run_after",
+                    models.DateTimeField(
+                        db_index=True,
+                        default=django.utils.timezone.now,
+                        verbose_name="Çalışma Zamanı",
+                    ),
+                ),
+                ("last_error", models.TextField(blank=True, verbose_name="Son Hata")),
+                (
+                    "locked_by",
+                    models.CharField(blank=True, max_length=100, verbose_name="İşçi"),
+                ),
+                (
+                    "lease_expires_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Kira Bitişi"
+                    ),
+                ),
+                (
+                    "heartbeat_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Son Sinyal"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Oluşturulma"),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="Başlama"),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="Bitiş"),
+                ),
+                (
+                    "book",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="processing_jobs",
+                        to="main.book",
+                        verbose_name="Kitap",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "İşleme Görevi",
+                "verbose_name_plural": "İşleme Görevleri",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
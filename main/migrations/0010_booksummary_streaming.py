@@ -0,0 +1,27 @@
+# Generated by Django 4.2.13 on 2026-10-18 01:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0009_processingjob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="booksummary",
+            name="is_complete",
+            field=models.BooleanField(
+                default=True,
+                help_text="Akış halinde üretilen özetler bitene kadar False kalır",
+                verbose_name="Tamamlandı",
+            ),
+        ),
+        migrations.AddField(
+            model_name="booksummary",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, verbose_name="Güncellenme"),
+        ),
+    ]
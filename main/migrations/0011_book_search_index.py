@@ -0,0 +1,75 @@
+from django.db import OperationalError, migrations
+
+# Tanımlar main.services.search'ten kopyalanmıştır; migration o modüldeki
+# sonraki değişikliklerden etkilenmemelidir.
+FTS_TABLE = "main_book_fts"
+
+CREATE_TABLE_SQL = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+    title, description, tags, authors,
+    tokenize = "unicode61 remove_diacritics 2"
+)
+"""
+
+BATCH_SIZE = 500
+
+_ASCII_FOLD = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+
+
+def fold(text):
+    text = (text or "").replace("I", "ı").replace("İ", "i").lower()
+    return text.translate(_ASCII_FOLD)
+
+
+def book_row(book):
+    authors = [book.author, *book.co_authors.all()]
+    names = " ".join(
+        f"{author.username} {author.first_name} {author.last_name}" for author in authors if author
+    )
+    return (book.pk, fold(book.title), fold(book.description), fold(book.tags), fold(names))
+
+
+def insert_rows(cursor, rows):
+    cursor.executemany(
+        f"INSERT INTO {FTS_TABLE} (rowid, title, description, tags, authors) VALUES (%s, %s, %s, %s, %s)",
+        rows,
+    )
+
+
+def create_search_index(apps, schema_editor):
+    # FTS5 yalnızca SQLite'ta; desteklenmiyorsa arama LIKE sorgusuyla çalışmaya devam eder
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    try:
+        schema_editor.execute(CREATE_TABLE_SQL)
+    except OperationalError:
+        return
+
+    Book = apps.get_model("main", "Book")
+    books = Book.objects.select_related("author").prefetch_related("co_authors").order_by("pk")
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        rows = []
+        for book in books.iterator(chunk_size=BATCH_SIZE):
+            rows.append(book_row(book))
+            if len(rows) >= BATCH_SIZE:
+                insert_rows(cursor, rows)
+                rows = []
+        if rows:
+            insert_rows(cursor, rows)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0010_booksummary_streaming"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,96 @@
+import html
+import re
+
+from django.db import OperationalError, migrations
+
+# Tanımlar main.services.search'ten kopyalanmıştır; migration o modüldeki
+# sonraki değişikliklerden etkilenmemelidir.
+CHAPTER_FTS_TABLE = "main_chapter_fts"
+CHAPTER_TEXT_TABLE = "main_chapter_text"
+
+CREATE_CHAPTER_TABLES_SQL = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {CHAPTER_TEXT_TABLE} (
+        id INTEGER PRIMARY KEY, book_id INTEGER NOT NULL, title TEXT NOT NULL, body TEXT NOT NULL
+    )
+    """,
+    f"CREATE INDEX IF NOT EXISTS {CHAPTER_TEXT_TABLE}_book_id ON {CHAPTER_TEXT_TABLE} (book_id)",
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {CHAPTER_FTS_TABLE} USING fts5(
+        book_id, title, body,
+        content = '{CHAPTER_TEXT_TABLE}', content_rowid = 'id',
+        tokenize = "unicode61 remove_diacritics 2"
+    )
+    """,
+]
+
+BATCH_SIZE = 200
+
+_ASCII_FOLD = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+_SKIPPED_ELEMENTS = re.compile(r"<(script|style)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_TAG_PATTERN = re.compile(r"<[^>]*>")
+_SPACE_PATTERN = re.compile(r"\s+")
+
+
+def fold(text):
+    text = (text or "").replace("I", "ı").replace("İ", "i").lower()
+    return text.translate(_ASCII_FOLD)
+
+
+def html_to_text(content):
+    text = _TAG_PATTERN.sub(" ", _SKIPPED_ELEMENTS.sub(" ", content or ""))
+    return _SPACE_PATTERN.sub(" ", html.unescape(text)).strip()
+
+
+def insert_rows(cursor, chapters):
+    rows = [(chapter.pk, chapter.book_id, chapter.title, html_to_text(chapter.content)) for chapter in chapters]
+    cursor.executemany(
+        f"INSERT INTO {CHAPTER_TEXT_TABLE} (id, book_id, title, body) VALUES (%s, %s, %s, %s)", rows,
+    )
+    # İndekse katlanmış metin, içerik tablosuna özgün metin yazılır
+    cursor.executemany(
+        f"INSERT INTO {CHAPTER_FTS_TABLE} (rowid, book_id, title, body) VALUES (%s, %s, %s, %s)",
+        [(pk, str(book_id), fold(title), fold(body)) for pk, book_id, title, body in rows],
+    )
+
+
+def create_chapter_index(apps, schema_editor):
+    # FTS5 yalnızca SQLite'ta; desteklenmiyorsa kitap içi arama kapalı kalır
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    try:
+        for sql in CREATE_CHAPTER_TABLES_SQL:
+            schema_editor.execute(sql)
+    except OperationalError:
+        return
+
+    Chapter = apps.get_model("main", "Chapter")
+    chapters = Chapter.objects.only("id", "book_id", "title", "content").order_by("pk")
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {CHAPTER_TEXT_TABLE}")
+        cursor.execute(f"INSERT INTO {CHAPTER_FTS_TABLE} ({CHAPTER_FTS_TABLE}) VALUES ('delete-all')")
+        batch = []
+        for chapter in chapters.iterator(chunk_size=BATCH_SIZE):
+            batch.append(chapter)
+            if len(batch) >= BATCH_SIZE:
+                insert_rows(cursor, batch)
+                batch = []
+        if batch:
+            insert_rows(cursor, batch)
+
+
+def drop_chapter_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {CHAPTER_FTS_TABLE}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {CHAPTER_TEXT_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0011_book_search_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_chapter_index, drop_chapter_index),
+    ]
@@ -50,6 +50,11 @@ class Article(models.Model):
     def slug(self):
         return self.series.slug + "/" + self.article_slug
 
+    def save(self, *args, **kwargs):
+        # Koşullu isteklerin (ETag/Last-Modified) doğrulayıcısı bu alandan üretilir
+        self.modified = timezone.now()
+        super().save(*args, **kwargs)
+
     class Meta:
         verbose_name_plural = "Article"
         ordering = ['-published']
@@ -150,7 +155,13 @@ class SiteSettings(models.Model):
 
     @classmethod
     def get_settings(cls):
-        """Singleton pattern - tek bir ayar kaydı döndürür"""
+        """Singleton pattern - tek bir ayar kaydı döndürür (önbellekten, bkz. services/site_settings_cache.py)"""
+        from .services.site_settings_cache import get_site_settings
+        return get_site_settings()
+
+    @classmethod
+    def load(cls):
+        """Ayar kaydını veritabanından okur, yoksa oluşturur"""
         settings, created = cls.objects.get_or_create(pk=1)
         return settings
 
@@ -365,7 +376,9 @@ class BookSummary(models.Model):
     # AI bilgileri
     generated_by = models.CharField("Oluşturan AI", max_length=50, default='OpenAI', help_text="OpenAI, Gemini, vb.")
     generated_at = models.DateTimeField("Oluşturulma", auto_now_add=True)
+    updated_at = models.DateTimeField("Güncellenme", auto_now=True)
     token_count = models.IntegerField("Token Sayısı", default=0, blank=True)
+    is_complete = models.BooleanField("Tamamlandı", default=True, help_text="Akış halinde üretilen özetler bitene kadar False kalır")
     
     # Erişim kontrolü
     is_premium_only = models.BooleanField("Sadece Premium", default=True)
@@ -387,4 +400,57 @@ class BookSummary(models.Model):
         # Kelime sayısını hesapla
         if self.content:
             self.word_count = len(self.content.split())
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+
+class ProcessingJob(models.Model):
+    """
+    Kitap işleme kuyruğu - `manage.py process_jobs` işçisi tarafından çalıştırılır
+    Metin çıkarma, içindekiler, bölüm oluşturma ve özetleme istek döngüsü dışında yapılır.
+    """
+    STATUS_CHOICES = (
+        ('queued', 'Sırada'),
+        ('running', 'Çalışıyor'),
+        ('done', 'Tamamlandı'),
+        ('failed', 'Başarısız'),
+    )
+    
+    STAGE_CHOICES = (
+        ('queued', 'Sırada'),
+        ('extracting', 'Metin Çıkarılıyor'),
+        ('chapters', 'Bölümler Oluşturuluyor'),
+        ('summarizing', 'Özetleniyor'),
+        ('done', 'Tamamlandı'),
+    )
+    
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='processing_jobs', verbose_name="Kitap")
+    provider = models.CharField("AI Sağlayıcı", max_length=20, default='openai')
+    
+    # Durum ve ilerleme
+    status = models.CharField("Durum", max_length=20, choices=STATUS_CHOICES, default='queued', db_index=True)
+    stage = models.CharField("Aşama", max_length=20, choices=STAGE_CHOICES, default='queued')
+    progress = models.PositiveSmallIntegerField("İlerleme (%)", default=0)
+    
+    # Deneme / yeniden deneme
+    attempts = models.PositiveSmallIntegerField("Deneme Sayısı", default=0)
+    max_attempts = models.PositiveSmallIntegerField("En Fazla Deneme", default=3)
+    run_after = models.DateTimeField("Çalışma Zamanı", default=timezone.now, db_index=True)
+    last_error = models.TextField("Son Hata", blank=True)
+    
+    # Kiralama (lease) - işçi düşerse iş süre dolunca tekrar alınır
+    locked_by = models.CharField("İşçi", max_length=100, blank=True)
+    lease_expires_at = models.DateTimeField("Kira Bitişi", null=True, blank=True)
+    heartbeat_at = models.DateTimeField("Son Sinyal", null=True, blank=True)
+    
+    # Tarihler
+    created_at = models.DateTimeField("Oluşturulma", auto_now_add=True)
+    started_at = models.DateTimeField("Başlama", null=True, blank=True)
+    finished_at = models.DateTimeField("Bitiş", null=True, blank=True)
+    
+    class Meta:
+        verbose_name = "İşleme Görevi"
+        verbose_name_plural = "İşleme Görevleri"
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.book.title} - {self.get_status_display()} (%{self.progress})"
@@ -0,0 +1,184 @@
+"""
+İmleçli (keyset) sayfalama
+Paginator her sayfada COUNT(*) ve OFFSET sorgusu çalıştırır; derin sayfalar
+giderek yavaşlar. CursorPaginator bir sonraki sayfayı son kaydın sıralama
+değerlerinden devam ederek (WHERE (published, id) < (...)) okur, bu yüzden
+her sayfa aynı hızdadır. İmleçler imzalıdır; kullanıcı değiştiremez.
+"""
+import hashlib
+from typing import List, Optional, Sequence
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.http import QueryDict
+
+CURSOR_SALT = 'main.pagination.cursor'
+
+
+def get_pagination_mode() -> str:
+    """'cursor' (varsayılan) ya da klasik sayfa numaralı 'page'"""
+    return getattr(settings, 'PAGINATION_MODE', 'cursor')
+
+
+class CursorPage:
+    """
+    İmleçli sayfa; şablonlarda Paginator'ın Page nesnesi gibi gezilebilir
+    previous_url / next_url mevcut sorgu parametrelerini (kategori, arama) korur.
+    """
+    is_cursor = True
+
+    def __init__(self, object_list: List, paginator: 'CursorPaginator', next_cursor: Optional[str],
+                 previous_cursor: Optional[str], query_params=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.query_params = query_params
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+    def _url(self, cursor: Optional[str]) -> str:
+        params = self.query_params.copy() if self.query_params is not None else QueryDict(mutable=True)
+        for key in ('cursor', 'page'):
+            params.pop(key, None)
+        if cursor:
+            params['cursor'] = cursor
+        return f'?{params.urlencode()}'
+
+    @property
+    def next_url(self) -> Optional[str]:
+        return self._url(self.next_cursor) if self.has_next() else None
+
+    @property
+    def previous_url(self) -> Optional[str]:
+        return self._url(self.previous_cursor) if self.has_previous() else None
+
+    @property
+    def count(self) -> Optional[int]:
+        """Yaklaşık toplam kayıt sayısı (önbellekten); sayım kapalıysa None"""
+        return self.paginator.count
+
+
+class CursorPaginator:
+    """
+    (alan, id) çiftine göre sıralı sorgu için imleçli sayfalayıcı
+
+    Args:
+        queryset: Sayfalanacak sorgu (sıralaması ordering ile değiştirilir)
+        per_page: Sayfa başına kayıt
+        ordering: Sıralama, son eleman benzersiz olmalı (örn. ('-published', '-id'))
+        count: True ise toplam sayı COUNT(*) ile hesaplanıp
+               PAGINATION_COUNT_CACHE_TIMEOUT saniye önbellekte tutulur
+    """
+
+    def __init__(self, queryset, per_page: int, ordering: Sequence[str] = ('-created_at', '-id'),
+                 count: bool = False):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.fields = [name.lstrip('-') for name in self.ordering]
+        self.descending = [name.startswith('-') for name in self.ordering]
+        self.with_count = count
+        self._count = None
+
+    @property
+    def count(self) -> Optional[int]:
+        if not self.with_count:
+            return None
+        if self._count is None:
+            digest = hashlib.md5(str(self.queryset.order_by().query).encode()).hexdigest()
+            timeout = getattr(settings, 'PAGINATION_COUNT_CACHE_TIMEOUT', 300)
+            self._count = cache.get_or_set(f'pagination-count:{digest}', self.queryset.count, timeout)
+        return self._count
+
+    def _encode(self, obj, backwards: bool) -> str:
+        values = []
+        for name in self.fields:
+            value = getattr(obj, name)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return signing.dumps({'v': values, 'b': backwards}, salt=CURSOR_SALT, compress=True)
+
+    def _decode(self, cursor: str):
+        """İmleci (değerler, geri_mi) olarak çözer; geçersizse None"""
+        try:
+            data = signing.loads(cursor, salt=CURSOR_SALT)
+            model = self.queryset.model
+            values = [
+                model._meta.get_field(name).to_python(value) for name, value in zip(self.fields, data['v'])
+            ]
+        except Exception:
+            return None
+        if len(values) != len(self.fields):
+            return None
+        return values, bool(data.get('b'))
+
+    def _after(self, values: List, backwards: bool) -> Q:
+        """Sıralamada verilen değerlerden sonra (backwards ise önce) gelen kayıtlar"""
+        # (a, b) < (x, y)  =>  a < x OR (a = x AND b < y)
+        condition = None
+        for index in reversed(range(len(self.fields))):
+            name = self.fields[index]
+            # Azalan sıralamada "sonra" küçük değerdir
+            lookup = 'lt' if self.descending[index] != backwards else 'gt'
+            strict = Q(**{f'{name}__{lookup}': values[index]})
+            condition = strict if condition is None else strict | (Q(**{name: values[index]}) & condition)
+        return condition
+
+    def get_page(self, cursor: Optional[str] = None, query_params=None) -> CursorPage:
+        decoded = self._decode(cursor) if cursor else None
+        queryset = self.queryset
+        backwards = False
+        if decoded:
+            values, backwards = decoded
+            queryset = queryset.filter(self._after(values, backwards))
+
+        ordering = self.ordering
+        if backwards:
+            ordering = tuple(name[1:] if name.startswith('-') else f'-{name}' for name in ordering)
+        rows = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        if backwards and not has_more:
+            # Başa ulaşıldı; eksik kalmasın diye tam ilk sayfa gösterilir
+            return self.get_page(None, query_params)
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or backwards:
+                next_cursor = self._encode(rows[-1], backwards=False)
+            if decoded:
+                previous_cursor = self._encode(rows[0], backwards=True)
+        return CursorPage(rows, self, next_cursor, previous_cursor, query_params)
+
+
+def paginate(request, queryset, per_page: int, ordering: Sequence[str], count: bool = True):
+    """
+    Listeleme görünümleri için sayfalama
+    PAGINATION_MODE 'cursor' ise ?cursor= imleciyle CursorPage, 'page' ise
+    ?page= numarasıyla klasik Paginator sayfası döner.
+    """
+    if get_pagination_mode() == 'page':
+        return Paginator(queryset.order_by(*ordering), per_page).get_page(request.GET.get('page'))
+    paginator = CursorPaginator(queryset, per_page, ordering, count=count)
+    return paginator.get_page(request.GET.get('cursor'), query_params=request.GET)
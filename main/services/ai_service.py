@@ -1,95 +1,315 @@
 """
 AI Servis Entegrasyonu
-OpenAI ve Google Gemini API ile özet üretimi ve içerik analizi
+OpenAI, Google Gemini ve yerel özetleyici ile özet üretimi ve içerik analizi
 """
+import json
 import os
-from typing import Dict, List, Optional
+import re
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
 from django.conf import settings
 
+from .local_provider import SENTENCE_COUNTS, LocalSummarizer
+from .rate_limit import call_with_retry, get_rate_limiter
+from .response_cache import get_response_cache, make_cache_key
 
-class AIService:
+
+# BookSummary.generated_by alanında gösterilen sağlayıcı adları (register_provider doldurur)
+PROVIDER_LABELS = {}
+
+OPENAI_MODEL = 'gpt-4o-mini'  # veya "gpt-3.5-turbo"
+GEMINI_MODEL = 'gemini-pro'
+
+# İstem metinleri değiştiğinde artırılır; eski önbellek kayıtları kullanılmaz
+PROMPT_TEMPLATE_VERSION = 1
+
+SUMMARY_TYPES = ['short', 'medium', 'detailed']
+
+# Özet uzunluğu
+LENGTH_INSTRUCTIONS = {
+    'short': 'Çok kısa bir özet (2-3 cümle)',
+    'medium': 'Orta uzunlukta bir özet (1 paragraf)',
+    'detailed': 'Detaylı bir özet (2-3 paragraf)',
+}
+
+# Tek istekte gönderilen en fazla metin uzunluğu (karakter, register_provider doldurur)
+PROMPT_CHAR_LIMITS = {}
+
+# Bölüm özeti isteminde başlığa ayrılan en fazla karakter
+CHAPTER_TITLE_PROMPT_LIMIT = 200
+
+
+def chapter_prompt_text(chapter_title: str, chapter_content: str) -> str:
+    """Bölüm özeti için sağlayıcıya gönderilen metin"""
+    return f"Bölüm Başlığı: {chapter_title[:CHAPTER_TITLE_PROMPT_LIMIT]}\n\nİçerik:\n{chapter_content}"
+
+
+# Bölüm içeriğine eklenen başlık ön ekinin en fazla uzunluğu; map-reduce
+# parçaları istek penceresinden bu kadar kısa tutulur ki sonları kesilmesin
+CHAPTER_PROMPT_OVERHEAD = len(chapter_prompt_text('x' * CHAPTER_TITLE_PROMPT_LIMIT, ''))
+
+
+def _build_openai_client(api_key: str, base_url: Optional[str]):
     """
-    AI servisleri için temel sınıf
+    Bağlantı havuzlu OpenAI istemcisi oluşturur
+    Gerekli: pip install openai
     """
+    from openai import OpenAI
     
-    def __init__(self, provider: str = 'openai'):
-        """
-        Args:
-            provider: 'openai' veya 'gemini'
-        """
-        self.provider = provider
-        self.api_key = self._get_api_key()
+    pool_size = getattr(settings, 'AI_HTTP_POOL_SIZE', 10)
+    http_client = None
+    try:
+        import httpx
+        from openai import DefaultHttpxClient
+        http_client = DefaultHttpxClient(limits=httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+        ))
+    except ImportError:
+        pass  # SDK'nın varsayılan (yine keep-alive'lı) havuzu kullanılır
     
-    def _get_api_key(self) -> str:
-        """API anahtarını settings'ten alır"""
-        if self.provider == 'openai':
-            return getattr(settings, 'OPENAI_API_KEY', os.getenv('OPENAI_API_KEY', ''))
-        elif self.provider == 'gemini':
-            return getattr(settings, 'GEMINI_API_KEY', os.getenv('GEMINI_API_KEY', ''))
-        return ''
+    return OpenAI(
+        api_key=api_key,
+        base_url=base_url or None,
+        timeout=getattr(settings, 'AI_HTTP_TIMEOUT', 120),
+        max_retries=0,  # Yeniden denemeler rate_limit.call_with_retry ile yapılır
+        http_client=http_client,
+    )
+
+
+def _build_gemini_client(api_key: str, base_url: Optional[str]):
+    """
+    Gemini modeli oluşturur; genai.configure süreç genelinde bir kez çağrılır
+    Gerekli: pip install google-generativeai
+    """
+    import google.generativeai as genai
     
-    def generate_summary(self, text: str, summary_type: str = 'medium') -> Dict[str, any]:
+    if base_url:
+        genai.configure(api_key=api_key, transport='rest', client_options={'api_endpoint': base_url})
+    else:
+        genai.configure(api_key=api_key)
+    return genai.GenerativeModel(GEMINI_MODEL)
+
+
+_CLIENT_FACTORIES = {
+    'openai': _build_openai_client,
+    'gemini': _build_gemini_client,
+}
+
+_clients: Dict[Tuple[str, str, str], object] = {}
+_clients_lock = threading.Lock()
+
+
+def get_provider_client(provider: str, api_key: str):
+    """
+    Sağlayıcı istemcisini süreç genelinde paylaşır
+    İlk çağrıda oluşturulur, sonraki çağrılar aynı istemciyi (ve açık
+    HTTP/TLS bağlantılarını) kullanır. İstemciler thread-safe'dir.
+    """
+    base_url = getattr(settings, f'{provider.upper()}_BASE_URL', '') or ''
+    key = (provider, api_key, base_url)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _CLIENT_FACTORIES[provider](api_key, base_url)
+                _clients[key] = client
+    return client
+
+
+def estimate_tokens(text: str, max_tokens: int = 500) -> int:
+    """İstek için kaba token tahmini (~4 karakter = 1 token) + yanıt payı"""
+    return len(text) // 4 + max_tokens
+
+
+def parse_multi_level_summary(text: str) -> Optional[Dict[str, str]]:
+    """
+    Tek istekte üretilen üç seviyeli özet yanıtını çözümler
+    Yanıt ```json ... ``` bloğu içinde de gelebilir. Eksik anahtar varsa None döner.
+    """
+    text = (text or '').strip()
+    if text.startswith('```'):
+        text = text.strip('`')
+        if text.startswith('json'):
+            text = text[4:]
+    start, end = text.find('{'), text.rfind('}')
+    if start == -1 or end == -1:
+        return None
+    try:
+        data = json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    summaries = {key: str(data.get(key) or '').strip() for key in SUMMARY_TYPES}
+    if not all(summaries.values()):
+        return None
+    return summaries
+
+
+def reset_provider_clients() -> None:
+    """Paylaşılan istemcileri kapatır (testler ve ayar değişiklikleri için)"""
+    with _clients_lock:
+        for client in _clients.values():
+            close = getattr(client, 'close', None)
+            if close:
+                close()
+        _clients.clear()
+
+
+class SummaryProvider(ABC):
+    """
+    Özet sağlayıcı arayüzü
+    Yeni sağlayıcılar bu sınıftan türetilip register_provider ile eklenir.
+    İstem tabanlı sağlayıcıların yalnızca complete() yazması yeterlidir.
+    """
+    name = ''
+    label = ''
+    model = ''
+    char_limit = 8000
+    
+    def __init__(self, api_key: str = ''):
+        self.api_key = api_key
+    
+    @abstractmethod
+    def complete(self, prompt: str, max_tokens: int, json_mode: bool = False) -> Dict:
         """
-        Metin için özet üretir
-        
-        Args:
-            text: Özetlenecek metin
-            summary_type: 'short', 'medium', 'detailed'
-        
+        Sağlayıcıya tek bir istek gönderir
         Returns:
-            Dict: {'summary': str, 'token_count': int, 'error': str}
+            Dict: {'text': str, 'token_count': int, 'error': str}
         """
-        if self.provider == 'openai':
-            return self._generate_summary_openai(text, summary_type)
-        elif self.provider == 'gemini':
-            return self._generate_summary_gemini(text, summary_type)
-        else:
-            return {'error': f'Desteklenmeyen provider: {self.provider}'}
     
-    def _generate_summary_openai(self, text: str, summary_type: str) -> Dict:
+    @staticmethod
+    def summary_prompt(text: str, summary_type: str) -> str:
+        return f"""
+Aşağıdaki metni Türkçe olarak özetle.
+{LENGTH_INSTRUCTIONS.get(summary_type, 'Orta uzunlukta bir özet')} yap.
+
+Metin:
+{text}
+"""
+    
+    @staticmethod
+    def multi_level_prompt(text: str) -> str:
+        levels = '\n'.join(f'- "{key}": {LENGTH_INSTRUCTIONS[key]}' for key in SUMMARY_TYPES)
+        return f"""
+Aşağıdaki metni Türkçe olarak üç farklı uzunlukta özetle.
+Yanıtı yalnızca şu anahtarları içeren bir JSON nesnesi olarak ver:
+{levels}
+
+Metin:
+{text}
+"""
+    
+    def summarize(self, text: str, summary_type: str) -> Dict:
+        """Returns: {'summary': str, 'token_count': int, 'error': str}"""
+        prompt = self.summary_prompt(text[:self.char_limit], summary_type)
+        max_tokens = 1000 if summary_type == 'detailed' else 500
+        result = self.complete(prompt, max_tokens)
+        if result.get('error'):
+            return {'error': result['error']}
+        return {'summary': result['text'], 'token_count': result['token_count'], 'error': None}
+    
+    def summarize_levels(self, text: str) -> Dict:
+        """Returns: {'summaries': {...}, 'token_count': int, 'error': str}"""
+        result = self.complete(self.multi_level_prompt(text[:self.char_limit]), max_tokens=1800, json_mode=True)
+        if result.get('error'):
+            return {'error': result['error']}
+        
+        summaries = parse_multi_level_summary(result['text'])
+        if summaries is None:
+            return {'error': 'Özet yanıtı beklenen JSON biçiminde değil', 'token_count': result['token_count']}
+        return {'summaries': summaries, 'token_count': result['token_count'], 'error': None}
+    
+    def extract_keywords(self, text: str, count: int = 10) -> List[str]:
+        return []
+    
+    def stream(self, prompt: str, max_tokens: int) -> Iterator[str]:
         """
-        OpenAI ile özet üretir
-        Gerekli: pip install openai
+        Yanıtı parça parça üretir; bittiğinde token sayısını döndürür (StopIteration.value)
+        Akışı desteklemeyen sağlayıcılarda yanıt tek parça gelir. Hata durumunda
+        istisna yükseltilir, böylece o ana kadar gelen parçalar korunabilir.
         """
-        try:
-            from openai import OpenAI
-            
-            if not self.api_key:
-                return {'error': 'OpenAI API anahtarı bulunamadı'}
-            
-            client = OpenAI(api_key=self.api_key)
-            
-            # Özet uzunluğu
-            length_instructions = {
-                'short': 'Çok kısa bir özet (2-3 cümle)',
-                'medium': 'Orta uzunlukta bir özet (1 paragraf)',
-                'detailed': 'Detaylı bir özet (2-3 paragraf)',
-            }
-            
-            prompt = f"""
-Aşağıdaki metni Türkçe olarak özetle.
-{length_instructions.get(summary_type, 'Orta uzunlukta bir özet')} yap.
+        result = self.complete(prompt, max_tokens)
+        if result.get('error'):
+            raise RuntimeError(result['error'])
+        yield result['text']
+        return result['token_count']
+    
+    @staticmethod
+    def continuation_prompt(text: str, summary_type: str, partial: str) -> str:
+        return f"""
+Aşağıdaki metnin Türkçe özeti yazılırken yarıda kesildi.
+{LENGTH_INSTRUCTIONS.get(summary_type, 'Orta uzunlukta bir özet')} olacak şekilde kaldığı yerden devam et.
+Yazılmış kısmı tekrarlama, yalnızca devamını yaz.
+
+Yazılmış kısım:
+{partial}
 
 Metin:
-{text[:8000]}  # Token limitine dikkat et
+{text}
 """
+    
+    def stream_summary(self, text: str, summary_type: str, partial: str = '') -> Iterator[str]:
+        """Özeti akış halinde üretir; partial verilirse kaldığı yerden devam eder"""
+        text = text[:self.char_limit]
+        if partial:
+            prompt = self.continuation_prompt(text, summary_type, partial)
+        else:
+            prompt = self.summary_prompt(text, summary_type)
+        max_tokens = 1000 if summary_type == 'detailed' else 500
+        return (yield from self.stream(prompt, max_tokens))
+
+
+class OpenAIProvider(SummaryProvider):
+    """
+    OpenAI chat completions
+    Gerekli: pip install openai
+    """
+    name = 'openai'
+    label = 'OpenAI'
+    model = OPENAI_MODEL
+    char_limit = 8000
+    
+    def _create(self, messages: List[Dict], max_tokens: int, temperature: float, **extra):
+        client = get_provider_client('openai', self.api_key)
+        prompt_length = sum(len(message['content']) for message in messages)
+        return call_with_retry(
+            lambda: client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **extra
+            ),
+            limiter=get_rate_limiter('openai'),
+            tokens=prompt_length // 4 + max_tokens,
+        )
+    
+    def complete(self, prompt: str, max_tokens: int, json_mode: bool = False) -> Dict:
+        try:
+            if not self.api_key:
+                return {'error': 'OpenAI API anahtarı bulunamadı'}
             
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",  # veya "gpt-3.5-turbo"
-                messages=[
+            extra = {'response_format': {'type': 'json_object'}} if json_mode else {}
+            response = self._create(
+                [
                     {"role": "system", "content": "Sen profesyonel bir kitap özeti yazarısın."},
                     {"role": "user", "content": prompt}
                 ],
+                max_tokens=max_tokens,
                 temperature=0.7,
-                max_tokens=1000 if summary_type == 'detailed' else 500,
+                **extra
             )
             
-            summary = response.choices[0].message.content
-            token_count = response.usage.total_tokens
-            
             return {
-                'summary': summary,
-                'token_count': token_count,
+                'text': response.choices[0].message.content,
+                'token_count': response.usage.total_tokens,
                 'error': None
             }
         
@@ -98,41 +318,78 @@ Metin:
         except Exception as e:
             return {'error': f'OpenAI hatası: {str(e)}'}
     
-    def _generate_summary_gemini(self, text: str, summary_type: str) -> Dict:
-        """
-        Google Gemini ile özet üretir
-        Gerekli: pip install google-generativeai
-        """
+    def stream(self, prompt: str, max_tokens: int) -> Iterator[str]:
+        if not self.api_key:
+            raise RuntimeError('OpenAI API anahtarı bulunamadı')
+        
+        response = self._create(
+            [
+                {"role": "system", "content": "Sen profesyonel bir kitap özeti yazarısın."},
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=max_tokens,
+            temperature=0.7,
+            stream=True,
+            stream_options={'include_usage': True},
+        )
+        token_count = 0
+        for chunk in response:
+            if chunk.usage:
+                token_count = chunk.usage.total_tokens
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+        return token_count
+    
+    def extract_keywords(self, text: str, count: int = 10) -> List[str]:
         try:
-            import google.generativeai as genai
-            
             if not self.api_key:
-                return {'error': 'Gemini API anahtarı bulunamadı'}
-            
-            genai.configure(api_key=self.api_key)
-            model = genai.GenerativeModel('gemini-pro')
-            
-            # Özet uzunluğu
-            length_instructions = {
-                'short': 'Çok kısa bir özet (2-3 cümle)',
-                'medium': 'Orta uzunlukta bir özet (1 paragraf)',
-                'detailed': 'Detaylı bir özet (2-3 paragraf)',
-            }
+                return []
             
             prompt = f"""
-Aşağıdaki metni Türkçe olarak özetle.
-{length_instructions.get(summary_type, 'Orta uzunlukta bir özet')} yap.
+Aşağıdaki metinden en önemli {count} anahtar kelimeyi Türkçe olarak çıkar.
+Sadece kelimeleri virgülle ayırarak ver, başka bir şey yazma.
 
 Metin:
-{text[:30000]}
+{text[:4000]}
 """
             
-            response = model.generate_content(prompt)
-            summary = response.text
+            response = self._create([{"role": "user", "content": prompt}], max_tokens=200, temperature=0.5)
+            
+            keywords_text = response.choices[0].message.content
+            keywords = [k.strip() for k in keywords_text.split(',')]
+            return keywords[:count]
+        
+        except Exception as e:
+            print(f"Anahtar kelime çıkarma hatası: {e}")
+            return []
+
+
+class GeminiProvider(SummaryProvider):
+    """
+    Google Gemini
+    Gerekli: pip install google-generativeai
+    """
+    name = 'gemini'
+    label = 'Gemini'
+    model = GEMINI_MODEL
+    char_limit = 30000
+    
+    def complete(self, prompt: str, max_tokens: int, json_mode: bool = False) -> Dict:
+        try:
+            if not self.api_key:
+                return {'error': 'Gemini API anahtarı bulunamadı'}
+            
+            model = get_provider_client('gemini', self.api_key)
+            response = call_with_retry(
+                lambda: model.generate_content(prompt),
+                limiter=get_rate_limiter('gemini'),
+                tokens=estimate_tokens(prompt),
+            )
             
+            usage = getattr(response, 'usage_metadata', None)
             return {
-                'summary': summary,
-                'token_count': 0,  # Gemini token bilgisi farklı
+                'text': response.text,
+                'token_count': getattr(usage, 'total_token_count', 0) or 0,
                 'error': None
             }
         
@@ -141,79 +398,462 @@ Metin:
         except Exception as e:
             return {'error': f'Gemini hatası: {str(e)}'}
     
+    def stream(self, prompt: str, max_tokens: int) -> Iterator[str]:
+        if not self.api_key:
+            raise RuntimeError('Gemini API anahtarı bulunamadı')
+        
+        model = get_provider_client('gemini', self.api_key)
+        response = call_with_retry(
+            lambda: model.generate_content(prompt, stream=True),
+            limiter=get_rate_limiter('gemini'),
+            tokens=estimate_tokens(prompt),
+        )
+        for chunk in response:
+            if chunk.text:
+                yield chunk.text
+        usage = getattr(response, 'usage_metadata', None)
+        return getattr(usage, 'total_token_count', 0) or 0
+
+
+class LocalProvider(SummaryProvider):
+    """
+    Ağ gerektirmeyen çıkarımsal özetleyici (bkz. local_provider.LocalSummarizer)
+    Yük testleri ve uzak sağlayıcı çalışmadığında yedek olarak kullanılır.
+    AI_LOCAL_PROVIDER_LATENCY ile her isteğe yapay gecikme eklenebilir.
+    """
+    name = 'local'
+    label = 'Yerel'
+    model = 'extractive-v1'
+    char_limit = 200000
+    
+    def _wait(self) -> None:
+        latency = getattr(settings, 'AI_LOCAL_PROVIDER_LATENCY', 0)
+        if latency:
+            time.sleep(latency)
+    
+    def complete(self, prompt: str, max_tokens: int, json_mode: bool = False) -> Dict:
+        return {'error': 'Yerel sağlayıcı serbest istemleri desteklemiyor'}
+    
+    def summarize(self, text: str, summary_type: str) -> Dict:
+        self._wait()
+        count = SENTENCE_COUNTS.get(summary_type, SENTENCE_COUNTS['medium'])
+        summary = LocalSummarizer(text[:self.char_limit]).summarize(count)
+        if not summary:
+            return {'error': 'Özetlenecek cümle bulunamadı'}
+        return {'summary': summary, 'token_count': 0, 'error': None}
+    
+    def summarize_levels(self, text: str) -> Dict:
+        self._wait()
+        summaries = LocalSummarizer(text[:self.char_limit]).summarize_levels()
+        if not summaries['short']:
+            return {'error': 'Özetlenecek cümle bulunamadı'}
+        return {'summaries': summaries, 'token_count': 0, 'error': None}
+    
+    def stream_summary(self, text: str, summary_type: str, partial: str = '') -> Iterator[str]:
+        """Cümleleri tek tek üretir; özet deterministik olduğundan partial kadarı atlanır"""
+        summary = self.summarize(text, summary_type)
+        if summary.get('error'):
+            raise RuntimeError(summary['error'])
+        remaining = summary['summary']
+        if partial and remaining.startswith(partial):
+            remaining = remaining[len(partial):]
+        for sentence in re.findall(r'[^.!?…]+[.!?…]*\s*', remaining):
+            yield sentence
+        return 0
+    
+    def extract_keywords(self, text: str, count: int = 10) -> List[str]:
+        return LocalSummarizer(text).keywords(count)
+
+
+PROVIDERS: Dict[str, type] = {}
+
+
+def register_provider(provider_class: type) -> type:
+    """
+    Sağlayıcıyı adıyla kaydeder; sınıf dekoratörü olarak da kullanılabilir
+    Etiket ve istek penceresi PROVIDER_LABELS / PROMPT_CHAR_LIMITS'e eklenir.
+    """
+    PROVIDERS[provider_class.name] = provider_class
+    PROVIDER_LABELS[provider_class.name] = provider_class.label
+    PROMPT_CHAR_LIMITS[provider_class.name] = provider_class.char_limit
+    return provider_class
+
+
+for _provider_class in (OpenAIProvider, GeminiProvider, LocalProvider):
+    register_provider(_provider_class)
+
+
+class AIService:
+    """
+    AI servisleri için temel sınıf
+    """
+    
+    def __init__(self, provider: str = 'openai'):
+        """
+        Args:
+            provider: Kayıtlı sağlayıcı adı ('openai', 'gemini', 'local', ...)
+        """
+        self.provider = provider
+        self.api_key = self._get_api_key()
+        provider_class = PROVIDERS.get(provider)
+        self.backend = provider_class(self.api_key) if provider_class else None
+    
+    def _get_api_key(self) -> str:
+        """API anahtarını settings'ten (yoksa ortam değişkeninden) alır"""
+        name = f'{self.provider.upper()}_API_KEY'
+        return getattr(settings, name, os.getenv(name, ''))
+    
+    def generate_summary(self, text: str, summary_type: str = 'medium') -> Dict[str, any]:
+        """
+        Metin için özet üretir
+        
+        Args:
+            text: Özetlenecek metin
+            summary_type: 'short', 'medium', 'detailed'
+        
+        Returns:
+            Dict: {'summary': str, 'token_count': int, 'error': str}
+                  Yedek sağlayıcı kullanıldıysa 'provider' anahtarı da bulunur.
+        """
+        if self.backend is None:
+            return {'error': f'Desteklenmeyen provider: {self.provider}'}
+        result = self._cached(summary_type, text, lambda: self.backend.summarize(text, summary_type))
+        return self._with_fallback(result, lambda service: service.generate_summary(text, summary_type))
+    
+    def _with_fallback(self, result: Dict, retry) -> Dict:
+        """
+        Sağlayıcı hata verirse AI_FALLBACK_PROVIDER ile yeniden dener
+        Yedek de başarısız olursa asıl hata döndürülür.
+        """
+        fallback = getattr(settings, 'AI_FALLBACK_PROVIDER', '')
+        if not result.get('error') or not fallback or fallback == self.provider or fallback not in PROVIDERS:
+            return result
+        fallback_result = retry(AIService(fallback))
+        if fallback_result.get('error'):
+            return result
+        return dict(fallback_result, provider=fallback_result.get('provider', fallback))
+    
+    def _cached(self, summary_type: str, text: str, produce) -> Dict:
+        """
+        Yanıtı önbellekten döndürür, yoksa produce() ile üretip saklar
+        Önbellekten gelen yanıtlar için token harcanmaz (token_count=0, cached=True).
+        """
+        cache = get_response_cache()
+        if cache is None:
+            return produce()
+        
+        key = make_cache_key(self.provider, self.backend.model, PROMPT_TEMPLATE_VERSION, summary_type, text)
+        try:
+            cached = cache.get(key)
+        except sqlite3.Error:
+            cached = None
+        if cached is not None:
+            return dict(cached, token_count=0, cached=True)
+        
+        result = produce()
+        if not result.get('error'):
+            try:
+                cache.set(key, result)
+            except sqlite3.Error:
+                pass
+        return result
+    
+    def generate_multi_level_summary(self, text: str) -> Dict:
+        """
+        Kısa, orta ve detaylı özeti tek istekte JSON olarak üretir
+        
+        Returns:
+            Dict: {'summaries': {'short': str, 'medium': str, 'detailed': str},
+                   'token_count': int, 'error': str}
+        """
+        if self.backend is None:
+            return {'error': f'Desteklenmeyen provider: {self.provider}'}
+        result = self._cached('multi', text, lambda: self.backend.summarize_levels(text))
+        return self._with_fallback(result, lambda service: service.generate_multi_level_summary(text))
+    
+    def stream_summary(self, text: str, summary_type: str = 'medium', partial: str = '') -> Iterator[str]:
+        """
+        Özeti parça parça üretir (bkz. summary_stream.stream_book_summary)
+        
+        Args:
+            partial: Daha önce kaydedilmiş yarım özet; verilirse devamı üretilir
+        
+        Returns:
+            Iterator[str]: Metin parçaları; üretici bittiğinde token sayısını döndürür
+        """
+        if self.backend is None:
+            raise ValueError(f'Desteklenmeyen provider: {self.provider}')
+        return self.backend.stream_summary(text, summary_type, partial)
+    
     def generate_chapter_summary(self, chapter_title: str, chapter_content: str) -> Dict:
         """Bölüm özeti üretir"""
-        prompt_text = f"Bölüm Başlığı: {chapter_title}\n\nİçerik:\n{chapter_content}"
-        return self.generate_summary(prompt_text, 'short')
+        return self.generate_summary(chapter_prompt_text(chapter_title, chapter_content), 'short')
     
     def extract_keywords(self, text: str, count: int = 10) -> List[str]:
         """
         Metinden anahtar kelimeler çıkarır
         """
-        try:
-            from openai import OpenAI
-            
-            if not self.api_key or self.provider != 'openai':
-                return []
-            
-            client = OpenAI(api_key=self.api_key)
-            
-            prompt = f"""
-Aşağıdaki metinden en önemli {count} anahtar kelimeyi Türkçe olarak çıkar.
-Sadece kelimeleri virgülle ayırarak ver, başka bir şey yazma.
-
-Metin:
-{text[:4000]}
-"""
-            
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.5,
-                max_tokens=200,
-            )
-            
-            keywords_text = response.choices[0].message.content
-            keywords = [k.strip() for k in keywords_text.split(',')]
-            return keywords[:count]
-        
-        except Exception as e:
-            print(f"Anahtar kelime çıkarma hatası: {e}")
+        if self.backend is None:
             return []
+        return self.backend.extract_keywords(text, count)
 
 
 # Yardımcı fonksiyonlar
-def generate_book_summary(book_text: str, provider: str = 'openai') -> Dict:
+def get_book_summary_mode() -> str:
+    return getattr(settings, 'AI_BOOK_SUMMARY_MODE', 'combined')
+
+
+def _summaries_from_detailed(ai_service: 'AIService', book_text: str) -> Dict:
+    """
+    Önce detaylı özeti üretir, kısa ve orta özeti bu özetten türetir
+    Kitap metni yalnızca bir kez gönderilir; diğer iki istek kısa özet metnini taşır.
+    """
+    detailed = ai_service.generate_summary(book_text, 'detailed')
+    if detailed.get('error'):
+        return {summary_type: detailed for summary_type in SUMMARY_TYPES}
+    summaries = {'detailed': detailed}
+    for summary_type in ['short', 'medium']:
+        summaries[summary_type] = ai_service.generate_summary(detailed['summary'], summary_type)
+    return summaries
+
+
+def prepare_book_text(book_text: Optional[str], provider: str = 'openai',
+                      chapters: Optional[List[Dict]] = None) -> Tuple[str, int, Optional[str]]:
+    """
+    Kitap özeti isteğine gönderilecek metni hazırlar
+    Metin istek penceresine sığmıyorsa ve bölümler verildiyse bölüm özetleri
+    üzerinden map-reduce ile indirgenir. book_text None ise metin bölüm
+    içeriklerinden oluşturulur; pencereye sığmayan kitap hiç birleştirilmez.
+    
+    Returns:
+        Tuple: (metin, harcanan token, hata mesajı veya None)
+    """
+    limit = PROMPT_CHAR_LIMITS.get(provider, PROMPT_CHAR_LIMITS['openai'])
+    if book_text is None:
+        chapters = chapters or []
+        length = sum(len(chapter['content']) for chapter in chapters) + max(0, len(chapters) - 1)
+        if length <= limit:
+            return '\n'.join(chapter['content'] for chapter in chapters), 0, None
+    elif not chapters or len(book_text) <= limit:
+        return book_text, 0, None
+    
+    condensed, usage = condense_chapters(chapters, provider)
+    if not condensed:
+        return '', usage['token_count'], 'Hiçbir bölüm özetlenemedi: ' + '; '.join(usage['errors'][:5])
+    return condensed, usage['token_count'], None
+
+
+def generate_book_summary(book_text: Optional[str], provider: str = 'openai',
+                          chapters: Optional[List[Dict]] = None,
+                          mode: Optional[str] = None) -> Dict:
     """
     Kitap metni için kısa, orta ve detaylı özetler üretir
+    Metin istek penceresine sığmıyorsa ve bölümler verildiyse kesilmek yerine
+    bölümler üzerinden map-reduce ile özetlenir.
+    
+    Args:
+        book_text: Kitap metni; None ise bölümlerden oluşturulur (bkz. prepare_book_text)
+        mode: 'combined' üç özet tek istekte JSON olarak istenir (yanıt
+              çözümlenemezse 'derived' ile devam edilir),
+              'derived' kısa ve orta özet detaylı özetten türetilir,
+              'separate' her özet tipi için kitap metni ayrı gönderilir
+              (varsayılan: AI_BOOK_SUMMARY_MODE; 'stream' kipi kayıt gerektirdiğinden
+              job_queue.stream_book_summaries ile çalışır, burada 'separate' gibi davranır)
+    
+    Returns:
+        Dict: {'short': {...}, 'medium': {...}, 'detailed': {...}}; toplam token
+              maliyeti ilk başarılı özetin token_count değerine yazılır
     """
     ai_service = AIService(provider=provider)
+    mode = mode or get_book_summary_mode()
+    
+    # Bölüm özetleri bir kez çıkarılır, üç özet tipi aynı indirgenmiş metni kullanır
+    book_text, extra_token_count, error = prepare_book_text(book_text, provider, chapters)
+    if error:
+        return {summary_type: {'error': error} for summary_type in SUMMARY_TYPES}
     
-    summaries = {}
-    for summary_type in ['short', 'medium', 'detailed']:
-        result = ai_service.generate_summary(book_text, summary_type)
-        summaries[summary_type] = result
+    summaries = None
+    if mode == 'combined':
+        result = ai_service.generate_multi_level_summary(book_text)
+        if not result.get('error'):
+            # Yedek sağlayıcı kullanıldıysa 'provider' bilgisi korunur
+            extra = {'provider': result['provider']} if 'provider' in result else {}
+            summaries = {
+                summary_type: dict(extra, summary=text, token_count=0, error=None)
+                for summary_type, text in result['summaries'].items()
+            }
+        extra_token_count += result.get('token_count') or 0
+        if summaries is None:
+            mode = 'derived'
+    
+    if summaries is None and mode == 'derived':
+        summaries = _summaries_from_detailed(ai_service, book_text)
+    elif summaries is None:
+        summaries = {
+            summary_type: ai_service.generate_summary(book_text, summary_type)
+            for summary_type in SUMMARY_TYPES
+        }
+    
+    for summary_type in SUMMARY_TYPES:
+        result = summaries[summary_type]
+        if extra_token_count and not result.get('error'):
+            # Ara isteklerin maliyeti ilk başarılı özete yazılır
+            summaries[summary_type] = dict(result, token_count=(result.get('token_count') or 0) + extra_token_count)
+            extra_token_count = 0
     
     return summaries
 
 
-def generate_all_chapter_summaries(chapters: List[Dict], provider: str = 'openai') -> List[Dict]:
+def generate_all_chapter_summaries(chapters: List[Dict], provider: str = 'openai',
+                                   concurrency: Optional[int] = None) -> List[Dict]:
     """
     Tüm bölümler için özet üretir
+    İstekler en fazla `concurrency` iş parçacığıyla paralel gönderilir;
+    sonuçlar bölüm sırasıyla döner ve bir bölümün hatası diğerlerini durdurmaz.
+    
+    Args:
+        concurrency: Aynı anda gönderilecek istek sayısı (varsayılan: AI_SUMMARY_CONCURRENCY)
+    
+    Dakikalık istek ve token sınırları sağlayıcının paylaşılan sınırlayıcısıyla
+    (rate_limit.get_rate_limiter) her istekte uygulanır.
     """
     ai_service = AIService(provider=provider)
+    if concurrency is None:
+        concurrency = getattr(settings, 'AI_SUMMARY_CONCURRENCY', 4)
     
-    chapter_summaries = []
-    for chapter in chapters:
-        result = ai_service.generate_chapter_summary(
-            chapter['title'],
-            chapter['content']
-        )
-        chapter_summaries.append({
+    def summarize(chapter):
+        try:
+            result = ai_service.generate_chapter_summary(
+                chapter['title'],
+                chapter['content']
+            )
+        except Exception as e:
+            result = {'error': f'Beklenmeyen hata: {str(e)}'}
+        return {
             'chapter_title': chapter['title'],
             'chapter_order': chapter['order'],
             'summary': result.get('summary', ''),
+            'token_count': result.get('token_count', 0),
             'error': result.get('error'),
-        })
+            'provider': result.get('provider', provider),
+        }
+    
+    if concurrency <= 1 or len(chapters) <= 1:
+        return [summarize(chapter) for chapter in chapters]
+    
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(chapters))) as executor:
+        # map sonuçları giriş sırasıyla döndürür
+        return list(executor.map(summarize, chapters))
+
+
+def _chunk_chapters(chapters: List[Dict], limit: int) -> Iterator[Dict]:
+    """
+    Bölümleri sınır uzunluğunu aşmayan parçalara gruplar
+    Ardışık kısa bölümler birleştirilir, sınırdan uzun bölümler bölünür.
+    Hazır özeti olan bölümler ('summary' anahtarı) özet metniyle yer alır.
+    """
+    group = []
+    group_length = 0
+    
+    def flush():
+        titles = [chapter['title'] for chapter in group]
+        title = titles[0] if len(titles) == 1 else f"{titles[0]} - {titles[-1]}"
+        return {
+            'order': group[0]['order'],
+            'title': title,
+            'content': '\n\n'.join(chapter['content'] for chapter in group),
+        }
+    
+    for chapter in chapters:
+        content = chapter.get('summary') or chapter['content']
+        if len(content) > limit:
+            if group:
+                yield flush()
+                group, group_length = [], 0
+            parts = range(0, len(content), limit)
+            for index, start in enumerate(parts, start=1):
+                yield {
+                    'order': chapter['order'],
+                    'title': f"{chapter['title']} ({index}/{len(parts)})",
+                    'content': content[start:start + limit],
+                }
+            continue
+        
+        if group and group_length + len(content) > limit:
+            yield flush()
+            group, group_length = [], 0
+        group.append({'order': chapter['order'], 'title': chapter['title'], 'content': content})
+        group_length += len(content)
+    
+    if group:
+        yield flush()
+
+
+def _summarize_in_windows(chunks: Iterator[Dict], provider: str, concurrency: int,
+                          usage: Dict) -> List[str]:
+    """
+    Parçaları `concurrency` boyutlu pencerelerle paralel özetler
+    Bellekte aynı anda yalnızca bir pencerelik parça tutulur.
+    """
+    summaries = []
+    window = []
+    
+    def run():
+        for result in generate_all_chapter_summaries(window, provider=provider, concurrency=concurrency):
+            usage['token_count'] += result['token_count'] or 0
+            if result['error']:
+                usage['errors'].append(f"{result['chapter_title']}: {result['error']}")
+            else:
+                summaries.append(result['summary'])
+    
+    for chunk in chunks:
+        window.append(chunk)
+        if len(window) >= max(1, concurrency) * 2:
+            run()
+            window = []
+    if window:
+        run()
+    return summaries
+
+
+def condense_chapters(chapters: List[Dict], provider: str = 'openai',
+                      concurrency: Optional[int] = None, max_rounds: int = 5) -> Tuple[str, Dict]:
+    """
+    Bölümleri istek penceresine sığan tek bir metne indirger (map-reduce)
+    1. Bölümler, başlık ön ekiyle birlikte sınırı aşmayan parçalara gruplanıp
+       paralel özetlenir (hazır bölüm özeti olanlar - 'summary' anahtarı -
+       yeniden özetlenmez)
+    2. Ara özetler sığana kadar tekrar gruplanıp özetlenir
+    
+    Args:
+        chapters: [{'order', 'title', 'content', 'summary' (opsiyonel)}]
+    
+    Returns:
+        Tuple[str, Dict]: (metin, {'token_count': int, 'errors': List[str]})
+    """
+    limit = PROMPT_CHAR_LIMITS.get(provider, PROMPT_CHAR_LIMITS['openai'])
+    chunk_limit = limit - CHAPTER_PROMPT_OVERHEAD
+    if concurrency is None:
+        concurrency = getattr(settings, 'AI_SUMMARY_CONCURRENCY', 4)
+    usage = {'token_count': 0, 'errors': []}
+    
+    def fits(pieces):
+        return sum(len(piece) for piece in pieces) + 2 * len(pieces) <= limit
+    
+    # Hazır özetler ve kısa bölümler tek istekte sığıyorsa özetlemeye gerek yok
+    pieces = [chapter.get('summary') or chapter['content'] for chapter in chapters]
+    if fits(pieces):
+        return '\n\n'.join(pieces), usage
+    
+    # Map
+    partials = _summarize_in_windows(_chunk_chapters(chapters, chunk_limit), provider, concurrency, usage)
+    
+    # Reduce
+    for _ in range(max_rounds):
+        if not partials or fits(partials):
+            break
+        groups = [{'order': i, 'title': f'Bölüm özetleri {i}', 'content': partial}
+                  for i, partial in enumerate(partials, start=1)]
+        partials = _summarize_in_windows(_chunk_chapters(groups, chunk_limit), provider, concurrency, usage)
     
-    return chapter_summaries
+    return '\n\n'.join(partials), usage
@@ -0,0 +1,140 @@
+"""
+Bölüm Kaydetme Servisi
+ChapterExtractor çıktısını toplu INSERT ile Chapter kayıtlarına dönüştürür.
+Bölümler akıştan BATCH_SIZE'lık gruplar halinde alınır; bellekte aynı anda
+bir grup tutulur.
+"""
+from itertools import islice
+from typing import Dict, Iterable, List, Set
+
+from django.db import transaction
+from django.utils.text import slugify
+
+from main.models import Book, Chapter
+
+from . import search
+
+
+TITLE_MAX_LENGTH = Chapter._meta.get_field('title').max_length
+SLUG_MAX_LENGTH = Chapter._meta.get_field('slug').max_length
+BATCH_SIZE = 500
+
+
+def build_chapters(book: Book, chapters: List[Dict], used_orders: Set[int]) -> List[Chapter]:
+    """
+    Bölüm sözlüklerinden kaydedilmemiş Chapter nesneleri üretir
+    Slug ve kelime sayısı burada hesaplanır, çünkü bulk_create save() çağırmaz.
+    used_orders önceki gruplarda kullanılan sıra numaralarıdır; tekrar eden
+    numara unique_together = ['book', 'order'] bozulmasın diye en büyüğün
+    ardına alınır.
+    """
+    slugs = {}
+    objects = []
+    for chapter in chapters:
+        order = chapter['order']
+        if order in used_orders:
+            order = max(used_orders) + 1
+        used_orders.add(order)
+        title = (chapter['title'] or '').strip()[:TITLE_MAX_LENGTH]
+        if title not in slugs:
+            slugs[title] = slugify(title)[:SLUG_MAX_LENGTH]
+        content = chapter['content']
+        objects.append(Chapter(
+            book=book,
+            title=title,
+            slug=slugs[title],
+            order=order,
+            content=content,
+            level=chapter.get('level', 1),
+            page_start=chapter.get('page_start') or 0,
+            page_end=chapter.get('page_end') or 0,
+            word_count=len(content.split()),
+        ))
+    return objects
+
+
+def link_parents(chapters: List[Chapter], stack: List[Chapter]) -> List[Chapter]:
+    """
+    Seviyeye göre her bölümü kendinden önceki, daha üst seviyeli bölüme bağlar
+    stack önceki gruplardan kalan açık üst bölümlerdir ve yerinde güncellenir.
+    Returns:
+        List[Chapter]: parent alanı atanan bölümler
+    """
+    linked = []
+    for chapter in chapters:
+        while stack and stack[-1].level >= chapter.level:
+            stack.pop()
+        if stack:
+            chapter.parent = stack[-1]
+            linked.append(chapter)
+        stack.append(chapter)
+    return linked
+
+
+def _same_chapters(existing: List[Chapter], objects: List[Chapter]) -> bool:
+    if len(existing) != len(objects):
+        return False
+    return all(
+        (old.order, old.title, old.level, old.content) == (new.order, new.title, new.level, new.content)
+        for old, new in zip(existing, objects)
+    )
+
+
+def _delete_from(book: Book, position: int) -> None:
+    """Kitabın sıradaki `position`. bölümünden sonrakileri (dahil) ve indeks kayıtlarını siler"""
+    first = book.chapters.order_by('order').values_list('order', flat=True)[position:position + 1].first()
+    if first is None:
+        return
+    stale = book.chapters.filter(order__gte=first)
+    search.remove_chapter_ids(list(stale.values_list('pk', flat=True)))
+    stale.delete()
+
+
+def ingest_chapters(book: Book, chapters: Iterable[Dict]) -> int:
+    """
+    Kitabın bölümlerini tek transaction içinde yenileriyle değiştirir
+    Bölümler gruplar halinde mevcut kayıtlarla karşılaştırılır: baştan
+    itibaren aynı kalan bölümler ve bağlı özetleri korunur, ilk farklı
+    gruptan sonrası silinip bulk_create ile eklenir. Üst bölüm bağlantıları
+    grup başına bir bulk_update ile kurulur; bölüm arama indeksi de aynı
+    transaction içinde güncellenir. Hata olursa eski bölümler olduğu gibi kalır.
+    Returns:
+        int: Kitabın bölüm sayısı
+    """
+    chapters = iter(chapters)
+    used_orders = set()
+    stack = []
+    position = 0
+    unchanged = True
+
+    with transaction.atomic():
+        for batch in iter(lambda: list(islice(chapters, BATCH_SIZE)), []):
+            objects = build_chapters(book, batch, used_orders)
+
+            if unchanged:
+                existing = list(book.chapters.order_by('order')[position:position + len(objects)])
+                if _same_chapters(existing, objects):
+                    link_parents(existing, stack)
+                    position += len(existing)
+                    continue
+                unchanged = False
+                _delete_from(book, position)
+
+            created = Chapter.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+            if created and created[0].pk is None:
+                # Veritabanı toplu INSERT'te id döndürmüyorsa (örn. MySQL) tekrar oku
+                created = list(book.chapters.filter(order__in=[c.order for c in objects]).order_by('order'))
+
+            linked = link_parents(created, stack)
+            if linked:
+                Chapter.objects.bulk_update(linked, ['parent'], batch_size=BATCH_SIZE)
+
+            # bulk_create sinyal göndermez; bölüm arama indeksi burada güncellenir
+            search.index_chapters(created)
+            position += len(created)
+
+        if unchanged:
+            # Yeni dosyada daha az bölüm varsa fazlası silinir
+            _delete_from(book, position)
+
+    return position
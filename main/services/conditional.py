@@ -0,0 +1,38 @@
+"""
+Koşullu İstekler (ETag / Last-Modified)
+Detay sayfaları için doğrulayıcılar içeriğin değişme zamanından, site
+ayarlarının sürümünden ve ziyaretçinin oturum durumundan üretilir. Tarayıcı ya
+da tarayıcı olmayan istemci (arama motoru) sayfayı daha önce aldıysa görünüm
+hiç çalıştırılmadan 304 döner.
+
+Last-Modified yalnızca zaman taşıyabildiğinden içerik ile site ayarlarının son
+değişme zamanlarının büyüğü kullanılır; ETag her ikisini de kapsar ve
+If-None-Match gönderildiğinde If-Modified-Since dikkate alınmaz. Last-Modified
+oturum durumunu taşıyamadığından giriş yapmış kullanıcılara gönderilmez;
+aksi halde giriş öncesi alınan sayfa giriş sonrasında da 304 ile dönerdi.
+"""
+from datetime import datetime
+from typing import Optional, Tuple
+
+from .site_settings_cache import get_settings_version
+
+
+def page_validators(request, name: str, modified: datetime) -> Tuple[str, Optional[datetime]]:
+    """
+    Sayfanın (ETag, Last-Modified) değerleri; giriş yapmış kullanıcıda Last-Modified None
+    Args:
+        name: Sayfanın kimliği (örn. 'book-12')
+        modified: İçeriğin son değişme zamanı
+    """
+    from main.models import SiteSettings
+
+    # Giriş yapan kullanıcının menüsü farklıdır; ETag kullanıcıya göre değişir
+    user_state = request.user.pk if request.user.is_authenticated else 0
+    etag = f'W/"{name}-{int(modified.timestamp() * 1000)}-{get_settings_version()}-{user_state}"'
+
+    if request.user.is_authenticated:
+        return etag, None
+
+    settings_modified = SiteSettings.get_settings().updated_at
+    last_modified = max(modified, settings_modified) if settings_modified else modified
+    return etag, last_modified
@@ -2,11 +2,45 @@
 Dosya İşleme Servisleri
 PDF ve Word dosyalarını okuma, içindekiler çıkarma, bölümlere ayırma
 """
+import logging
 import os
 import re
-from typing import List, Dict, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Tuple, Optional, Iterable, Iterator
+from django.conf import settings
 from django.core.files.uploadedfile import UploadedFile
 
+logger = logging.getLogger(__name__)
+
+# Paralel çıkarma için bir işçiye düşen minimum sayfa sayısı.
+# Bundan küçük belgelerde süreç havuzu açmanın maliyeti kazançtan büyük.
+MIN_PAGES_PER_WORKER = 16
+
+
+def _extract_pdf_page_range(file_path: str, start: int, end: int) -> List[str]:
+    """
+    [start, end) aralığındaki PDF sayfalarının metnini döndürür.
+    Süreç havuzunda çalıştırıldığı için modül seviyesinde tanımlıdır.
+    """
+    import PyPDF2
+
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [pdf_reader.pages[i].extract_text() for i in range(start, end)]
+
+
+def _split_page_range(page_count: int, chunk_count: int) -> List[Tuple[int, int]]:
+    """Sayfa aralığını sıralı ve neredeyse eşit parçalara böler"""
+    chunk_count = max(1, min(chunk_count, page_count))
+    size, remainder = divmod(page_count, chunk_count)
+    ranges = []
+    start = 0
+    for i in range(chunk_count):
+        end = start + size + (1 if i < remainder else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
 
 class DocumentProcessor:
     """
@@ -20,25 +54,126 @@ class DocumentProcessor:
         return ext
     
     @staticmethod
-    def extract_text_from_pdf(file_path: str) -> str:
+    def get_pdf_workers() -> int:
+        """PDF çıkarma için işçi sayısını settings'ten alır (varsayılan: CPU sayısı)"""
+        workers = getattr(settings, 'PDF_EXTRACTION_WORKERS', None)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        return max(1, int(workers))
+    
+    @staticmethod
+    def iter_pages_from_pdf(file_path: str, workers: Optional[int] = None) -> Iterator[str]:
+        """
+        PDF sayfalarının metnini sırayla üretir
+        Büyük belgelerde sayfalar MIN_PAGES_PER_WORKER sayfalık parçalar halinde
+        paralel çıkarılır; aynı anda yalnızca bir pencerelik (işçi sayısının iki
+        katı parça) sayfa bellekte tutulur.
+        
+        Args:
+            file_path: PDF dosya yolu
+            workers: Süreç sayısı. 1 veya belge küçükse seri çalışır.
+        """
+        import PyPDF2
+        
+        if workers is None:
+            workers = DocumentProcessor.get_pdf_workers()
+        
+        with open(file_path, 'rb') as file:
+            page_count = len(PyPDF2.PdfReader(file).pages)
+        
+        workers = min(workers, page_count // MIN_PAGES_PER_WORKER)
+        done = 0
+        if workers > 1:
+            ranges = _split_page_range(page_count, page_count // MIN_PAGES_PER_WORKER)
+            # Her işçiye birden fazla parça vererek dengesiz sayfaları dağıt
+            window = workers * 2
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    for i in range(0, len(ranges), window):
+                        batch = ranges[i:i + window]
+                        chunks = executor.map(
+                            _extract_pdf_page_range,
+                            [file_path] * len(batch),
+                            [start for start, _ in batch],
+                            [end for _, end in batch],
+                        )
+                        for chunk in chunks:
+                            yield from chunk
+                            done += len(chunk)
+                return
+            except (OSError, RuntimeError) as e:
+                # Süreç havuzu açılamazsa (kısıtlı ortam vb.) kalan sayfalar seri okunur
+                logger.warning("Paralel PDF çıkarma başarısız, seri moda geçiliyor: %s", e)
+        
+        with open(file_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            for i in range(done, page_count):
+                yield pdf_reader.pages[i].extract_text()
+    
+    @staticmethod
+    def extract_pages_from_pdf(file_path: str, workers: Optional[int] = None) -> List[str]:
+        """PDF sayfalarının metnini sıralı liste olarak döndürür, bkz. iter_pages_from_pdf"""
+        return list(DocumentProcessor.iter_pages_from_pdf(file_path, workers))
+    
+    @staticmethod
+    def extract_text_from_pdf(file_path: str, workers: Optional[int] = None) -> str:
         """
         PDF dosyasından metin çıkarır
+        Sayfalar paralel çıkarılır ve tek seferde birleştirilir.
         Gerekli: pip install PyPDF2
         """
         try:
-            import PyPDF2
-            
-            text = ""
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-            return text
+            pages = DocumentProcessor.extract_pages_from_pdf(file_path, workers)
+            return "".join(page + "\n" for page in pages)
         except ImportError:
             return "PyPDF2 yüklü değil. Lütfen: pip install PyPDF2"
         except Exception as e:
             return f"PDF okuma hatası: {str(e)}"
     
+    @staticmethod
+    def get_heading_level(paragraph) -> Optional[int]:
+        """Paragraf bir Heading stiliyse seviyesini, değilse None döndürür"""
+        style_name = paragraph.style.name if paragraph.style is not None else ''
+        if not style_name.startswith('Heading'):
+            return None
+        return int(style_name[-1]) if style_name[-1].isdigit() else 1
+    
+    @staticmethod
+    def parse_docx(file_path: str) -> Tuple[str, List[Dict[str, any]]]:
+        """
+        Word (docx) belgesini tek geçişte okuyup metni ve başlıkları döndürür
+        Başlıklar metin içindeki satır numarası ve karakter konumu (offset)
+        ile birlikte döner; paragraf içinde satır sonu olsa da doğrudur.
+        
+        Returns:
+            Tuple[str, List[Dict]]: (metin, içindekiler)
+        """
+        from docx import Document
+        
+        doc = Document(file_path)
+        parts = []
+        toc = []
+        offset = 0
+        line_number = 0
+        
+        for paragraph in doc.paragraphs:
+            paragraph_text = paragraph.text
+            level = DocumentProcessor.get_heading_level(paragraph)
+            if level is not None:
+                toc.append({
+                    'order': len(toc) + 1,
+                    'title': paragraph_text,
+                    'line_number': line_number,
+                    'level': level,
+                    'offset': offset,
+                })
+            parts.append(paragraph_text)
+            parts.append("\n")
+            offset += len(paragraph_text) + 1
+            line_number += paragraph_text.count("\n") + 1
+        
+        return "".join(parts), toc
+    
     @staticmethod
     def extract_text_from_docx(file_path: str) -> str:
         """
@@ -46,12 +181,7 @@ class DocumentProcessor:
         Gerekli: pip install python-docx
         """
         try:
-            from docx import Document
-            
-            doc = Document(file_path)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
+            text, _ = DocumentProcessor.parse_docx(file_path)
             return text
         except ImportError:
             return "python-docx yüklü değil. Lütfen: pip install python-docx"
@@ -83,6 +213,78 @@ class DocumentProcessor:
             return self.extract_text_from_doc(file_path)
         else:
             return f"Desteklenmeyen dosya tipi: {file_type}"
+    
+    @staticmethod
+    def iter_lines_from_pdf(file_path: str) -> Iterator[Tuple[int, int, str]]:
+        """PDF sayfalarını sırayla okuyup (sayfa_no, satır_no, satır) üretir"""
+        line_no = 0
+        for page_no, page in enumerate(DocumentProcessor.iter_pages_from_pdf(file_path), start=1):
+            for line in page.split('\n'):
+                yield page_no, line_no, line
+                line_no += 1
+    
+    @staticmethod
+    def iter_lines_from_docx(file_path: str,
+                             headings: Optional[Dict[int, Dict[str, any]]] = None) -> Iterator[Tuple[int, int, str]]:
+        """
+        Word (docx) paragraflarından (sayfa_no, satır_no, satır) üretir
+        DOCX'te sayfa bilgisi olmadığından sayfa_no her zaman 1'dir.
+        
+        Args:
+            headings: Verilirse Heading stilli paragraflar, ilk satırları
+                      üretilmeden önce satır numarasıyla bu sözlüğe eklenir
+                      (ChapterExtractor.iter_chapters toc olarak kullanır)
+        """
+        from docx import Document
+        
+        doc = Document(file_path)
+        line_no = 0
+        for paragraph in doc.paragraphs:
+            paragraph_text = paragraph.text
+            if headings is not None:
+                level = DocumentProcessor.get_heading_level(paragraph)
+                if level is not None:
+                    headings[line_no] = {
+                        'order': len(headings) + 1,
+                        'title': paragraph_text,
+                        'line_number': line_no,
+                        'level': level,
+                    }
+            for line in paragraph_text.split('\n'):
+                yield 1, line_no, line
+                line_no += 1
+    
+    @staticmethod
+    def iter_lines_from_doc(file_path: str) -> Iterator[Tuple[int, int, str]]:
+        """
+        Eski Word (doc) dosyasından (sayfa_no, satır_no, satır) üretir
+        Sayfalar form feed (\\f) karakterinden ayrılır.
+        """
+        import textract
+        
+        text = textract.process(file_path).decode('utf-8')
+        line_no = 0
+        for page_no, page in enumerate(text.split('\f'), start=1):
+            for line in page.split('\n'):
+                yield page_no, line_no, line
+                line_no += 1
+    
+    def iter_lines(self, file_path: str, file_type: str) -> Iterator[Tuple[int, int, str]]:
+        """
+        Dosya tipine göre metni satır satır üretir
+        Tüm kitabı belleğe almadan işlemek için extract_text yerine kullanılır.
+        
+        Yields:
+            Tuple[int, int, str]: (sayfa_no, satır_no, satır)
+        """
+        if file_type == 'pdf':
+            return self.iter_lines_from_pdf(file_path)
+        elif file_type == 'docx':
+            return self.iter_lines_from_docx(file_path)
+        elif file_type == 'doc':
+            return self.iter_lines_from_doc(file_path)
+        else:
+            raise ValueError(f"Desteklenmeyen dosya tipi: {file_type}")
 
 
 class TableOfContentsExtractor:
@@ -90,8 +292,36 @@ class TableOfContentsExtractor:
     Belgeden içindekiler (Table of Contents) çıkarır
     """
     
-    @staticmethod
-    def extract_toc_patterns(text: str) -> List[Dict[str, any]]:
+    # Satır içi boşluk; \s yerine kullanılır ki kalıplar satır sonunu aşmasın
+    _WS = r'[^\S\n]'
+    
+    # Kalıplar, tek bir alternation olarak:
+    # - Bölüm 1, BÖLÜM II, Chapter 3: ...
+    # - 1. Başlık
+    # - Büyük harfle yazılmış uzun satırlar
+    # Başlık boşluk olmayan bir karakterle biter, böylece kırpılmış satırla aynı sonucu verir.
+    HEADING_PATTERN = re.compile(
+        rf'^{_WS}*(?P<title>'
+        rf'(?:BÖLÜM|Bölüm|CHAPTER|Chapter){_WS}+(?:\d+|[IVXLCDM]+)(?:[:.]|{_WS})+.*\S'
+        rf'|\d+\.{_WS}+.*\S'
+        rf'|[A-Z](?:[A-ZÜĞŞIÖÇ]|{_WS}){{9,}}[A-ZÜĞŞIÖÇ]'
+        rf'){_WS}*$',
+        re.MULTILINE,
+    )
+    
+    @classmethod
+    def is_heading(cls, line: str) -> bool:
+        """Kırpılmış satırın başlık kalıplarından birine uyup uymadığını döndürür"""
+        return cls.HEADING_PATTERN.match(line) is not None
+    
+    @classmethod
+    def iter_headings(cls, text: str) -> Iterator[Tuple[int, str]]:
+        """Metindeki başlıkları (satır başı konumu, başlık) olarak tek taramada üretir"""
+        for match in cls.HEADING_PATTERN.finditer(text):
+            yield match.start(), match.group('title')
+    
+    @classmethod
+    def extract_toc_patterns(cls, text: str) -> List[Dict[str, any]]:
         """
         Metin içinden başlıkları tespit eder
         Şu kalıpları arar:
@@ -99,34 +329,24 @@ class TableOfContentsExtractor:
         - BÖLÜM I, BÖLÜM II, ...
         - 1. Başlık, 2. Başlık, ...
         - Büyük harfle yazılmış başlıklar
+        
+        Girdiler satır numarasının yanında başlığın satır başı konumunu
+        ('offset') da içerir.
         """
         chapters = []
-        lines = text.split('\n')
+        line_number = 0
+        position = 0
         
-        # Kalıplar
-        patterns = [
-            r'^(BÖLÜM|Bölüm|CHAPTER|Chapter)\s+(\d+|[IVXLCDM]+)[:\.\s]+(.+)$',
-            r'^(\d+)\.\s+(.+)$',
-            r'^([A-Z][A-ZÜĞŞIÖÇ\s]{10,})$',  # Büyük harfle yazılmış uzun satırlar
-        ]
-        
-        order = 0
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if not line:
-                continue
-            
-            for pattern in patterns:
-                match = re.match(pattern, line)
-                if match:
-                    order += 1
-                    chapters.append({
-                        'order': order,
-                        'title': line,
-                        'line_number': i,
-                        'level': 1,
-                    })
-                    break
+        for offset, title in cls.iter_headings(text):
+            line_number += text.count('\n', position, offset)
+            position = offset
+            chapters.append({
+                'order': len(chapters) + 1,
+                'title': title,
+                'line_number': line_number,
+                'level': 1,
+                'offset': offset,
+            })
         
         return chapters
     
@@ -134,29 +354,14 @@ class TableOfContentsExtractor:
     def extract_toc_from_docx(file_path: str) -> List[Dict[str, any]]:
         """
         Word belgesinden heading stilleri kullanarak içindekiler çıkarır
+        Metin de gerekiyorsa belgeyi iki kez açmamak için
+        DocumentProcessor.parse_docx kullanılmalıdır.
         """
         try:
-            from docx import Document
-            
-            doc = Document(file_path)
-            chapters = []
-            order = 0
-            
-            for i, paragraph in enumerate(doc.paragraphs):
-                # Heading stillerini kontrol et
-                if paragraph.style.name.startswith('Heading'):
-                    level = int(paragraph.style.name[-1]) if paragraph.style.name[-1].isdigit() else 1
-                    order += 1
-                    chapters.append({
-                        'order': order,
-                        'title': paragraph.text,
-                        'line_number': i,
-                        'level': level,
-                    })
-            
+            _, chapters = DocumentProcessor.parse_docx(file_path)
             return chapters
         except Exception as e:
-            print(f"DOCX TOC çıkarma hatası: {e}")
+            logger.warning("DOCX TOC çıkarma hatası: %s", e)
             return []
 
 
@@ -166,9 +371,42 @@ class ChapterExtractor:
     """
     
     @staticmethod
-    def split_into_chapters(text: str, toc: List[Dict[str, any]]) -> List[Dict[str, any]]:
+    def line_offsets(text: str) -> List[int]:
+        """text.split('\\n') satırlarının metin içindeki başlangıç konumları"""
+        offsets = [0]
+        position = text.find('\n')
+        while position != -1:
+            offsets.append(position + 1)
+            position = text.find('\n', position + 1)
+        return offsets
+    
+    @classmethod
+    def chapter_boundaries(cls, text: str, toc: List[Dict[str, any]]) -> List[Tuple[int, int]]:
+        """
+        İçindekiler girdilerinin metin içindeki (başlangıç, bitiş) aralıkları
+        Girdide 'offset' yoksa konum satır numarasından hesaplanır.
+        Sonraki başlıktan önceki satır sonu bölüme dahil edilmez.
+        """
+        if all('offset' in entry for entry in toc):
+            starts = [entry['offset'] for entry in toc]
+        else:
+            offsets = cls.line_offsets(text)
+            starts = [
+                offsets[entry['line_number']] if entry['line_number'] < len(offsets) else len(text)
+                for entry in toc
+            ]
+        
+        boundaries = []
+        for i, start in enumerate(starts):
+            end = starts[i + 1] - 1 if i + 1 < len(starts) else len(text)
+            boundaries.append((start, max(start, end)))
+        return boundaries
+    
+    @classmethod
+    def split_into_chapters(cls, text: str, toc: List[Dict[str, any]]) -> List[Dict[str, any]]:
         """
         İçindekiler bilgisini kullanarak metni bölümlere ayırır
+        Bölümler satır listesi birleştirilmeden doğrudan text[start:end] ile kesilir.
         """
         if not toc:
             # Eğer içindekiler yoksa, tüm metni tek bölüm olarak döndür
@@ -179,47 +417,157 @@ class ChapterExtractor:
                 'level': 1,
             }]
         
-        lines = text.split('\n')
         chapters = []
-        
-        for i, chapter_info in enumerate(toc):
-            start_line = chapter_info['line_number']
-            end_line = toc[i + 1]['line_number'] if i + 1 < len(toc) else len(lines)
-            
-            chapter_content = '\n'.join(lines[start_line:end_line])
-            
+        for chapter_info, (start, end) in zip(toc, cls.chapter_boundaries(text, toc)):
             chapters.append({
                 'order': chapter_info['order'],
                 'title': chapter_info['title'],
-                'content': chapter_content,
+                'content': text[start:end],
                 'level': chapter_info.get('level', 1),
             })
         
         return chapters
+    
+    @staticmethod
+    def iter_chapters(records: Iterable[Tuple[int, int, str]],
+                      toc=None) -> Iterator[Dict[str, any]]:
+        """
+        (sayfa_no, satır_no, satır) akışını tek geçişte bölümlere ayırır
+        Bellekte aynı anda yalnızca bir bölümün satırları tutulur.
+        
+        Args:
+            records: DocumentProcessor.iter_lines çıktısı
+            toc: Verilirse başlıklar satır numarasına göre buradan alınır,
+                 verilmezse kalıplarla akış üzerinde tespit edilir. Liste ya da
+                 satır numarası -> girdi sözlüğü olabilir; sözlük akış okunurken
+                 doldurulabilir (bkz. DocumentProcessor.iter_lines_from_docx)
+        
+        Yields:
+            Dict: order, title, line_number, level, page_start, page_end, content
+                  Hiç başlık bulunmazsa tüm metin line_number'ı None olan tek bölümdür.
+        """
+        if isinstance(toc, dict) or toc is None:
+            toc_by_line = toc
+        else:
+            toc_by_line = {entry['line_number']: entry for entry in toc}
+        current = None
+        # İlk başlıktan önceki satırlar; başlık bulunmazsa tek bölüm olur
+        preamble = {'order': 1, 'title': 'Tüm İçerik', 'line_number': None, 'level': 1,
+                    'page_start': None, 'page_end': None, 'lines': []}
+        order = 0
+        
+        def finish(chapter):
+            chapter['content'] = '\n'.join(chapter.pop('lines'))
+            return chapter
+        
+        for page_no, line_no, line in records:
+            if toc_by_line is not None:
+                entry = toc_by_line.get(line_no)
+            else:
+                entry = None
+                title = line.strip()
+                if title and TableOfContentsExtractor.is_heading(title):
+                    order += 1
+                    entry = {'order': order, 'title': title, 'level': 1}
+            
+            if entry is not None:
+                if current is not None:
+                    yield finish(current)
+                preamble = None
+                current = {
+                    'order': entry['order'],
+                    'title': entry['title'],
+                    'line_number': line_no,
+                    'level': entry.get('level', 1),
+                    'page_start': page_no,
+                    'page_end': page_no,
+                    'lines': [line],
+                }
+            elif current is not None:
+                current['lines'].append(line)
+                current['page_end'] = page_no
+            elif preamble is not None:
+                preamble['lines'].append(line)
+                if preamble['page_start'] is None:
+                    preamble['page_start'] = page_no
+                preamble['page_end'] = page_no
+        
+        if current is not None:
+            yield finish(current)
+        elif preamble is not None:
+            preamble['page_start'] = preamble['page_start'] or 0
+            preamble['page_end'] = preamble['page_end'] or 0
+            yield finish(preamble)
 
 
-# Kullanım örneği
-def process_book_file(file_path: str, file_type: str) -> Tuple[str, List[Dict], List[Dict]]:
+def iter_book_chapters(file_path: str, file_type: str) -> Iterator[Dict]:
     """
-    Kitap dosyasını işler ve metin, içindekiler ve bölümleri döndürür
+    Kitap dosyasını akış olarak işler ve bölümleri sırayla üretir
+    Tüm metin belleğe alınmaz; DOCX başlıkları da aynı okuma sırasında
+    paragraf stillerinden alınır.
     
-    Returns:
-        Tuple[str, List[Dict], List[Dict]]: (metin, içindekiler, bölümler)
+    Yields:
+        Dict: order, title, line_number, level, page_start, page_end, content
     """
     processor = DocumentProcessor()
-    toc_extractor = TableOfContentsExtractor()
-    chapter_extractor = ChapterExtractor()
-    
-    # 1. Metni çıkar
-    text = processor.extract_text(file_path, file_type)
     
-    # 2. İçindekiler çıkar
     if file_type == 'docx':
-        toc = toc_extractor.extract_toc_from_docx(file_path)
+        headings = {}
+        records = processor.iter_lines_from_docx(file_path, headings)
+        yield from ChapterExtractor.iter_chapters(records, headings)
     else:
-        toc = toc_extractor.extract_toc_patterns(text)
+        # Diğer türlerde başlıklar akış üzerinde kalıplarla aranır
+        yield from ChapterExtractor.iter_chapters(processor.iter_lines(file_path, file_type))
+
+
+def iter_book_file(file_path: str, file_type: str, use_cache: bool = True) -> Iterator[Dict]:
+    """
+    Kitap dosyasının bölümlerini sırayla üretir
+    Aynı içerikli dosya daha önce işlendiyse bölümler önbellekten okunur;
+    değilse iter_book_chapters ile akıştan üretilirken önbelleğe de bölüm bölüm
+    yazılır. Kayıt yalnızca akış sonuna kadar tüketildiğinde tamamlanır.
+    Bellekte aynı anda bir bölüm tutulur. Okuma hataları (eksik paket, bozuk
+    dosya, desteklenmeyen tip) ilk bölüm istenirken istisna olarak yükselir.
+    
+    Yields:
+        Dict: order, title, line_number, level, page_start, page_end, content
+    """
+    from .extraction_cache import ExtractionCache, file_sha256
+    
+    if not use_cache:
+        yield from iter_book_chapters(file_path, file_type)
+        return
+    
+    cache = ExtractionCache()
+    digest = file_sha256(file_path)
+    cached = cache.get(digest)
+    if cached is not None:
+        yield from cached
+        return
     
-    # 3. Bölümlere ayır
-    chapters = chapter_extractor.split_into_chapters(text, toc)
+    writer = None
+    try:
+        writer = cache.writer(digest)
+    except OSError as e:
+        logger.warning("Çıkarma önbelleği yazılamadı: %s", e)
     
-    return text, toc, chapters
+    completed = False
+    try:
+        for chapter in iter_book_chapters(file_path, file_type):
+            if writer is not None:
+                try:
+                    writer.add(chapter)
+                except OSError as e:
+                    logger.warning("Çıkarma önbelleği yazılamadı: %s", e)
+                    writer = None
+            yield chapter
+        completed = True
+    finally:
+        if writer is not None:
+            if completed:
+                try:
+                    writer.commit()
+                except OSError as e:
+                    logger.warning("Çıkarma önbelleği yazılamadı: %s", e)
+            else:
+                writer.discard()
@@ -0,0 +1,233 @@
+"""
+Dosya Çıkarma Önbelleği
+Kitap dosyalarından çıkarılan bölümleri dosya içeriğinin SHA-256 özetine göre
+diskte saklar. Kayıt bölüm bölüm yazılır ve okunur; bellekte aynı anda
+yalnızca bir bölüm (ve bir okuma parçası) tutulur.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+
+
+# Kayıt biçimi (bölüm alanları ya da dosya düzeni) her değiştiğinde artırılır;
+# sürümü farklı kayıtlar ıska sayılıp yeniden üretilir.
+# 1: metin ve bölüm aralıkları, 2: içindekiler ve bölüm içerikleri (tek JSON),
+# 3: başlık satırı + satır başına bir bölüm (akış halinde sıkıştırılmış JSON satırları)
+CACHE_FORMAT_VERSION = 3
+CACHE_FILE_SUFFIX = '.json.z'
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def file_sha256(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Dosyanın SHA-256 özetini parça parça okuyarak hesaplar"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _encode(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+def _iter_lines(file) -> Iterator[bytes]:
+    """Sıkıştırılmış dosyayı parça parça açar ve satırları sırayla üretir"""
+    decompressor = zlib.decompressobj()
+    pending = b''
+    for chunk in iter(lambda: file.read(READ_CHUNK_SIZE), b''):
+        pending += decompressor.decompress(chunk)
+        *lines, pending = pending.split(b'\n')
+        yield from lines
+    if not decompressor.eof:
+        raise zlib.error('Kayıt eksik')
+    pending += decompressor.flush()
+    if pending:
+        yield pending
+
+
+class CacheWriter:
+    """
+    Bir kaydı bölüm bölüm geçici dosyaya yazar
+    commit() ile kayıt yerine taşınır; discard() ya da yarıda kalan yazım
+    önceki kaydı bozmaz.
+    """
+
+    def __init__(self, cache: 'ExtractionCache', digest: str):
+        self.cache = cache
+        self.path = cache._path(digest)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd, self.tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix='.tmp')
+        self.file = os.fdopen(fd, 'wb')
+        self.compressor = zlib.compressobj()
+        self._write({'version': CACHE_FORMAT_VERSION})
+
+    def _write(self, value) -> None:
+        try:
+            self.file.write(self.compressor.compress(_encode(value)))
+        except OSError:
+            self.discard()
+            raise
+
+    def add(self, chapter: Dict) -> None:
+        self._write(chapter)
+
+    def commit(self) -> None:
+        """Kaydı tamamlar ve yerine taşır"""
+        try:
+            self.file.write(self.compressor.flush())
+            self.file.close()
+            os.replace(self.tmp_path, self.path)
+        except OSError:
+            self.discard()
+            raise
+        self.cache.evict()
+
+    def discard(self) -> None:
+        self.file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+class ExtractionCache:
+    """
+    İçerik özetine göre anahtarlanan, boyut sınırlı (LRU) disk önbelleği
+
+    Her kayıt zlib ile akış halinde sıkıştırılmış JSON satırlarıdır: ilk satır
+    biçim sürümü, sonrakiler iter_book_chapters'ın ürettiği bölümler.
+    Kullanılan kayıtların değişiklik zamanı güncellenir ve boyut aşıldığında
+    en eski kayıtlar silinir.
+    """
+
+    _lock = threading.Lock()
+    hits = 0
+    misses = 0
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.cache_dir = str(cache_dir or getattr(
+            settings, 'EXTRACTION_CACHE_DIR', os.path.join(settings.BASE_DIR, 'cache', 'extraction')
+        ))
+        self.max_bytes = max_bytes if max_bytes is not None else getattr(
+            settings, 'EXTRACTION_CACHE_MAX_BYTES', 512 * 1024 * 1024
+        )
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, digest[:2], digest + CACHE_FILE_SUFFIX)
+
+    @classmethod
+    def _count(cls, hit: bool) -> None:
+        with cls._lock:
+            if hit:
+                cls.hits += 1
+            else:
+                cls.misses += 1
+
+    def get(self, digest: str) -> Optional[Iterator[Dict]]:
+        """
+        Kayıt varsa bölümlerini sırayla üreten bir iterator, yoksa None
+        Kayıt okunurken bozuk çıkarsa silinir ve OSError yükselir (yeniden
+        denemede dosyadan çıkarılır).
+        """
+        path = self._path(digest)
+        try:
+            file = open(path, 'rb')
+        except OSError:
+            self._count(hit=False)
+            return None
+
+        lines = _iter_lines(file)
+        try:
+            header = json.loads(next(lines))
+        except (StopIteration, ValueError, zlib.error):
+            header = None
+        if not isinstance(header, dict) or header.get('version') != CACHE_FORMAT_VERSION:
+            file.close()
+            self._count(hit=False)
+            return None
+
+        # LRU için son kullanım zamanını güncelle
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._count(hit=True)
+        return self._read(path, file, lines)
+
+    def _read(self, path: str, file, lines: Iterator[bytes]) -> Iterator[Dict]:
+        with file:
+            try:
+                for line in lines:
+                    yield json.loads(line)
+            except (ValueError, zlib.error) as e:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                raise OSError(f"Bozuk çıkarma önbelleği kaydı silindi: {e}")
+
+    def writer(self, digest: str) -> CacheWriter:
+        """Kaydı bölüm bölüm yazmak için; bkz. CacheWriter"""
+        return CacheWriter(self, digest)
+
+    def set(self, digest: str, chapters: List[Dict]) -> None:
+        """Bölümleri tek seferde önbelleğe yazar"""
+        writer = self.writer(digest)
+        for chapter in chapters:
+            writer.add(chapter)
+        writer.commit()
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """(son kullanım, boyut, yol) listesi"""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(CACHE_FILE_SUFFIX):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self) -> int:
+        """Toplam boyut sınırı aşılırsa en eski kayıtları siler, silinen sayısını döndürür"""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        """Tüm kayıtları siler"""
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        """İsabet/ıska sayaçları ve önbellek boyutu"""
+        entries = self._entries()
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(entries),
+            'size_bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes,
+        }
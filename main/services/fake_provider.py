@@ -0,0 +1,178 @@
+"""
+Sahte AI Sağlayıcı
+OpenAI chat completions API'sini taklit eden yerel HTTP sunucusu.
+Ağ erişimi ve ücret olmadan testler ve performans ölçümleri için kullanılır:
+    with FakeProviderServer(latency=0.2) as server:
+        settings.OPENAI_BASE_URL = server.base_url
+"""
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+class FakeProviderHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with self.server.lock:
+            self.server.requests.append((self.client_address, body))
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        with self.server.lock:
+            status = self.server.statuses.pop(0) if self.server.statuses else 200
+        if status == 429:
+            headers = {'Retry-After': str(self.server.retry_after)} if self.server.retry_after is not None else {}
+            self._send_json(429, {'error': {'message': 'Rate limit reached', 'type': 'rate_limit_error'}}, headers)
+            return
+        if status != 200:
+            self._send_json(status, {'error': {'message': 'Sunucu hatası', 'type': 'server_error'}})
+            return
+
+        prompt = ''.join(message['content'] for message in body.get('messages', []))
+        if body.get('stream'):
+            self._send_stream(body, prompt)
+            return
+
+        reply = self._reply(body)
+        if not callable(self.server.reply) and (body.get('response_format') or {}).get('type') == 'json_object':
+            # Çok seviyeli özet isteği: her seviye için aynı sahte metin
+            reply = json.dumps({key: reply for key in ('short', 'medium', 'detailed')}, ensure_ascii=False)
+        prompt_tokens = max(1, len(prompt) // 4)
+        completion_tokens = max(1, len(reply) // 4)
+        self._send_json(200, {
+            'id': 'chatcmpl-fake',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', ''),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': reply},
+                'finish_reason': 'stop',
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+            },
+        })
+
+    def _reply(self, body: dict) -> str:
+        reply = self.server.reply
+        if callable(reply):
+            messages = body.get('messages', [])
+            reply = reply(messages[-1]['content'] if messages else '')
+        return reply
+
+    def _send_stream(self, body: dict, prompt: str):
+        """Yanıtı kelime kelime server-sent events olarak gönderir"""
+        with self.server.lock:
+            cut_after = self.server.stream_cuts.pop(0) if self.server.stream_cuts else None
+        reply = self._reply(body)
+        words = re.findall(r'\S+\s*', reply)
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        def write_chunk(data: bytes):
+            self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+            self.wfile.flush()
+
+        def event(payload):
+            write_chunk(b'data: ' + json.dumps(payload).encode('utf-8') + b'\n\n')
+
+        base = {'id': 'chatcmpl-fake', 'object': 'chat.completion.chunk',
+                'created': int(time.time()), 'model': body.get('model', '')}
+        for index, word in enumerate(words):
+            if cut_after is not None and index >= cut_after:
+                self.close_connection = True  # Bağlantı yanıt bitmeden kopar
+                return
+            event(dict(base, choices=[{'index': 0, 'delta': {'content': word}, 'finish_reason': None}]))
+            if self.server.chunk_delay:
+                time.sleep(self.server.chunk_delay)
+
+        event(dict(base, choices=[{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]))
+        prompt_tokens = max(1, len(prompt) // 4)
+        completion_tokens = max(1, len(reply) // 4)
+        event(dict(base, choices=[], usage={
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens,
+        }))
+        write_chunk(b'data: [DONE]\n\n')
+        self.wfile.write(b'0\r\n\r\n')
+
+    def _send_json(self, status: int, payload: dict, headers: Optional[dict] = None):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeProviderServer:
+    """
+    Arka planda çalışan sahte sağlayıcı sunucusu
+    Args:
+        latency: Her isteğe eklenecek yapay gecikme (saniye)
+        reply: Döndürülecek özet metni (JSON yanıt istenirse her seviye için) ya da
+               kullanıcı istemini alıp yanıtı döndüren fonksiyon (JSON istekleri
+               dahil yanıt olduğu gibi gönderilir)
+        statuses: Sırayla dönülecek HTTP durum kodları (örn. [429, 429]); bitince 200
+        retry_after: 429 yanıtlarındaki Retry-After başlığı (saniye), None ise gönderilmez
+        stream_cuts: Akış isteklerinde sırayla uygulanacak kopma noktaları
+                     (örn. [3]: ilk akış 3 kelimeden sonra kesilir); bitince akış tamamlanır
+        chunk_delay: Akıştaki her parça arasına eklenecek gecikme (saniye)
+    """
+
+    def __init__(self, latency: float = 0.0, reply='Sahte özet',
+                 statuses: Optional[list] = None, retry_after: Optional[float] = None,
+                 stream_cuts: Optional[list] = None, chunk_delay: float = 0.0):
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), FakeProviderHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.latency = latency
+        self.httpd.reply = reply
+        self.httpd.requests = []
+        self.httpd.statuses = list(statuses or [])
+        self.httpd.retry_after = retry_after
+        self.httpd.stream_cuts = list(stream_cuts or [])
+        self.httpd.chunk_delay = chunk_delay
+        self.httpd.lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self.httpd.server_address[1]}/v1'
+
+    @property
+    def requests(self) -> list:
+        """(istemci adresi, istek gövdesi) listesi"""
+        return self.httpd.requests
+
+    def start(self) -> 'FakeProviderServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
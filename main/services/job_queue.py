@@ -0,0 +1,378 @@
+"""
+Kitap İşleme Kuyruğu
+Veritabanı tabanlı görev kuyruğu: kiralama (lease), sinyal (heartbeat),
+geri çekilmeli yeniden deneme ve ilerleme takibi. Harici bir broker gerektirmez.
+"""
+import os
+import socket
+import threading
+import uuid
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from main.models import Book, BookSummary, ProcessingJob, SiteSettings
+
+from .chapter_ingest import ingest_chapters
+from .keywords import fill_book_tags
+
+
+class LeaseLost(Exception):
+    """Görevin kirası başka bir işçiye geçti, iş bırakılmalı"""
+
+
+class PermanentJobError(Exception):
+    """Yeniden denemenin anlamı olmayan hata (örn. dosya yok)"""
+
+
+def get_lease_seconds() -> int:
+    return getattr(settings, 'PROCESSING_JOB_LEASE_SECONDS', 300)
+
+
+def get_retry_backoff_seconds() -> int:
+    return getattr(settings, 'PROCESSING_JOB_RETRY_BACKOFF', 30)
+
+
+def make_worker_id() -> str:
+    """host:pid:rastgele biçiminde işçi kimliği"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def enqueue_book_processing(book: Book, provider: Optional[str] = None) -> ProcessingJob:
+    """
+    Kitap için işleme görevi oluşturur
+    Kitabın sırada veya çalışmakta olan bir görevi varsa onu döndürür.
+    """
+    active = book.processing_jobs.filter(status__in=['queued', 'running']).first()
+    if active:
+        return active
+    return ProcessingJob.objects.create(
+        book=book,
+        provider=provider or getattr(settings, 'AI_PROVIDER', 'openai'),
+        max_attempts=getattr(settings, 'PROCESSING_JOB_MAX_ATTEMPTS', 3),
+    )
+
+
+def claim_job(worker_id: str) -> Optional[ProcessingJob]:
+    """
+    Çalıştırılabilir ilk görevi kiralar
+    Sıradaki görevler ve kirası dolmuş (işçisi düşmüş) görevler alınabilir.
+    SQLite'ta SELECT ... FOR UPDATE olmadığından koşullu UPDATE ile alınır:
+    aynı görevi yalnızca bir işçi güncelleyebilir.
+    """
+    now = timezone.now()
+    
+    # Deneme hakkı bitmiş ve işçisi düşmüş görevleri kapat; hata fail_job'daki gibi kitaba da yazılır
+    abandoned = ProcessingJob.objects.filter(
+        status='running', lease_expires_at__lt=now, attempts__gte=F('max_attempts'),
+    )
+    for job_id, book_id in abandoned.values_list('id', 'book_id'):
+        error = 'İşçi yanıt vermedi (kira süresi doldu)'
+        if abandoned.filter(pk=job_id).update(
+            status='failed', last_error=error, locked_by='', lease_expires_at=None, finished_at=now,
+        ):
+            Book.objects.filter(pk=book_id).update(processing_error=error)
+
+    candidates = ProcessingJob.objects.filter(
+        Q(status='queued', run_after__lte=now) |
+        Q(status='running', lease_expires_at__lt=now)
+    ).order_by('run_after', 'id').values_list('id', flat=True)[:10]
+
+    for job_id in candidates:
+        claimed = ProcessingJob.objects.filter(
+            Q(status='queued', run_after__lte=now) |
+            Q(status='running', lease_expires_at__lt=now),
+            pk=job_id,
+        ).update(
+            status='running',
+            attempts=F('attempts') + 1,
+            locked_by=worker_id,
+            lease_expires_at=now + timedelta(seconds=get_lease_seconds()),
+            heartbeat_at=now,
+            started_at=now,
+        )
+        if claimed:
+            return ProcessingJob.objects.select_related('book').get(pk=job_id)
+    return None
+
+
+def heartbeat(job: ProcessingJob, worker_id: str) -> bool:
+    """Kirayı uzatır; görev artık bu işçide değilse False döner"""
+    now = timezone.now()
+    return bool(ProcessingJob.objects.filter(pk=job.pk, status='running', locked_by=worker_id).update(
+        lease_expires_at=now + timedelta(seconds=get_lease_seconds()),
+        heartbeat_at=now,
+    ))
+
+
+def update_progress(job: ProcessingJob, worker_id: str, stage: str, progress: int) -> None:
+    """Görevin aşamasını ve yüzdesini kaydeder"""
+    updated = ProcessingJob.objects.filter(pk=job.pk, status='running', locked_by=worker_id).update(
+        stage=stage,
+        progress=progress,
+    )
+    if not updated:
+        raise LeaseLost(f"Görev #{job.pk} artık {worker_id} işçisinde değil")
+    job.stage = stage
+    job.progress = progress
+
+
+def complete_job(job: ProcessingJob, worker_id: str, error: str = '') -> None:
+    ProcessingJob.objects.filter(pk=job.pk, locked_by=worker_id).update(
+        status='done',
+        stage='done',
+        progress=100,
+        last_error=error,
+        locked_by='',
+        lease_expires_at=None,
+        finished_at=timezone.now(),
+    )
+
+
+def fail_job(job: ProcessingJob, worker_id: str, error: str, permanent: bool = False) -> None:
+    """
+    Hatayı kaydeder; deneme hakkı varsa görevi üstel geri çekilmeyle sıraya geri koyar
+    """
+    attempts = job.attempts  # claim_job sırasında artırıldı
+    now = timezone.now()
+    fields = {
+        'last_error': error,
+        'locked_by': '',
+        'lease_expires_at': None,
+    }
+    if permanent or attempts >= job.max_attempts:
+        fields.update(status='failed', finished_at=now)
+    else:
+        delay = get_retry_backoff_seconds() * (2 ** (attempts - 1))
+        fields.update(status='queued', stage='queued', progress=0, run_after=now + timedelta(seconds=delay))
+    ProcessingJob.objects.filter(pk=job.pk, locked_by=worker_id).update(**fields)
+
+    if fields['status'] == 'failed':
+        Book.objects.filter(pk=job.book_id).update(processing_error=error)
+
+
+def provider_label(provider: str) -> str:
+    """BookSummary.generated_by alanına yazılan sağlayıcı adı"""
+    from .ai_service import PROVIDER_LABELS
+    return PROVIDER_LABELS.get(provider, provider)
+
+
+def save_book_summaries(book: Book, summaries: Dict, provider: str) -> List[str]:
+    """
+    Kitap düzeyindeki özetleri tek transaction içinde kaydeder
+    Yedek sağlayıcıyla üretilen özetler o sağlayıcının adıyla işaretlenir.
+    Returns:
+        List[str]: Üretilemeyen özet tiplerinin hataları
+    """
+    errors = []
+    with transaction.atomic():
+        for summary_type, result in summaries.items():
+            if result.get('error'):
+                errors.append(f"{summary_type}: {result['error']}")
+                continue
+            BookSummary.objects.update_or_create(
+                book=book, chapter=None, summary_type=summary_type,
+                defaults={
+                    'content': result['summary'],
+                    'generated_by': provider_label(result.get('provider', provider)),
+                    'token_count': result.get('token_count', 0),
+                },
+            )
+    return errors
+
+
+def stream_book_summaries(job: ProcessingJob, worker_id: str, text: Optional[str], chapters: List[Dict]) -> None:
+    """
+    Kitap özetlerini akış halinde üretir ve parça parça kaydeder
+    Görevin ilk denemesinde özetler baştan üretilir; yeniden denemelerde
+    tamamlanmış özetler atlanır, yarım kalan özet kaldığı yerden sürdürülür.
+    Akış koparsa görev yeniden denenmek üzere hata verir.
+    text None ise kitap metni bölümlerden oluşturulur (bkz. prepare_book_text).
+    """
+    from .ai_service import SUMMARY_TYPES, prepare_book_text
+    from .summary_stream import stream_book_summary
+
+    book_text, _, error = prepare_book_text(text, job.provider, chapters)
+    if error:
+        raise RuntimeError(error)
+
+    # Kısa özet önce: okuyucu sayfası ilk sonucu en erken görsün
+    for step, summary_type in enumerate(SUMMARY_TYPES):
+        update_progress(job, worker_id, 'summarizing', 80 + step * 6)
+        result = stream_book_summary(book=job.book, summary_type=summary_type, text=book_text,
+                                     provider=job.provider, restart=job.attempts <= 1)
+        if result['error']:
+            raise RuntimeError(f"{summary_type}: {result['error']}")
+
+
+def process_book(job: ProcessingJob, worker_id: str) -> str:
+    """
+    Kitabı işler: metin çıkarma, içindekiler, bölümler ve (açıksa) özetler
+    Returns:
+        str: Özetleme sırasında oluşan, görevi düşürmeyen hatalar
+    """
+    from .ai_service import generate_all_chapter_summaries, generate_book_summary, get_book_summary_mode
+    from .document_processor import iter_book_file
+
+    book = job.book
+    if not book.file:
+        raise PermanentJobError("Kitap dosyası yüklenmemiş")
+    file_path = book.file.path
+    if not os.path.exists(file_path):
+        raise PermanentJobError(f"Kitap dosyası bulunamadı: {file_path}")
+
+    # 1-2. Bölümler dosyadan (ya da önbellekten) okunurken gruplar halinde kaydedilir;
+    # bellekte bir bölüm grubundan fazlası tutulmaz
+    update_progress(job, worker_id, 'extracting', 5)
+    file_type = book.file_type or book.file.name.split('.')[-1].lower()
+    headings = []
+
+    def track_headings(chapters):
+        for chapter in chapters:
+            if chapter['line_number'] is not None and not headings:
+                headings.append(chapter['title'])
+            yield chapter
+
+    try:
+        ingest_chapters(book, track_headings(iter_book_file(file_path, file_type)))
+    except (ValueError, ImportError) as e:
+        # Desteklenmeyen dosya tipi ya da eksik okuma paketi; yeniden denemek düzeltmez
+        raise PermanentJobError(f"Dosya okunamadı: {e}")
+
+    update_progress(job, worker_id, 'chapters', 40)
+    book.has_toc = bool(headings)
+    book.is_processed = True
+    book.processing_error = ''
+    # updated_at kitap sayfasının Last-Modified/ETag değeridir; birlikte yazılmalı
+    book.save(update_fields=['has_toc', 'is_processed', 'processing_error', 'updated_at'])
+
+    # 3. Özetler (site ayarlarında AI işleme açıksa)
+    if not SiteSettings.get_settings().enable_ai_processing:
+        return ''
+
+    update_progress(job, worker_id, 'summarizing', 60)
+    errors = []
+
+    # Özetleme bölüm metinlerinin hepsini ister (kitap pencereye sığıyor mu, map-reduce
+    # parçaları); bu aşamada kitabın tüm bölüm içerikleri bellekte olur
+    saved_chapters = list(book.chapters.order_by('order'))
+
+    # Bölüm özetleri; daha önce üretilmiş olanlar yeniden üretilmez
+    existing = dict(
+        BookSummary.objects.filter(book=book, summary_type='chapter', chapter__isnull=False, is_complete=True)
+        .values_list('chapter_id', 'content')
+    )
+    chapter_dicts = [
+        {'order': chapter.order, 'title': chapter.title, 'content': chapter.content,
+         'summary': existing.get(chapter.pk, '')}
+        for chapter in saved_chapters
+    ]
+    chapters_by_order = {chapter.order: chapter for chapter in saved_chapters}
+    missing = [chapter for chapter in chapter_dicts if not chapter['summary']]
+    for chapter, result in zip(missing, generate_all_chapter_summaries(missing, provider=job.provider)):
+        if result.get('error'):
+            errors.append(f"{result['chapter_title']}: {result['error']}")
+            continue
+        chapter['summary'] = result['summary']
+        BookSummary.objects.update_or_create(
+            book=book, chapter=chapters_by_order[result['chapter_order']], summary_type='chapter',
+            defaults={
+                'content': result['summary'],
+                'generated_by': provider_label(result['provider']),
+                'token_count': result.get('token_count', 0),
+            },
+        )
+
+    # Kitap özetleri; uzun kitaplarda bölüm özetleri üzerinden map-reduce
+    update_progress(job, worker_id, 'summarizing', 80)
+    if get_book_summary_mode() == 'stream':
+        stream_book_summaries(job, worker_id, None, chapter_dicts)
+    else:
+        summaries = generate_book_summary(None, provider=job.provider, chapters=chapter_dicts)
+        errors.extend(save_book_summaries(book, summaries, job.provider))
+
+    book.has_summary = book.summaries.filter(is_complete=True).exists()
+    book.processing_error = '\n'.join(errors)
+    # save() sinyalleri sayfa önbelleğini de yeniler
+    book.save(update_fields=['has_summary', 'processing_error', 'updated_at'])
+    return book.processing_error
+
+
+class _Heartbeat(threading.Thread):
+    """Görev sürerken kirayı arka planda uzatan iş parçacığı"""
+
+    def __init__(self, job: ProcessingJob, worker_id: str):
+        super().__init__(daemon=True)
+        self.job = job
+        self.worker_id = worker_id
+        self.stopped = threading.Event()
+        self.lost = False
+
+    def run(self):
+        interval = max(1, get_lease_seconds() // 3)
+        try:
+            while not self.stopped.wait(interval):
+                if not heartbeat(self.job, self.worker_id):
+                    self.lost = True
+                    return
+        finally:
+            connection.close()
+
+
+def run_job(job: ProcessingJob, worker_id: str) -> None:
+    """Kiralanmış bir görevi sinyal göndererek çalıştırır ve sonucunu kaydeder"""
+    beat = _Heartbeat(job, worker_id)
+    beat.start()
+    try:
+        errors = process_book(job, worker_id)
+    except LeaseLost:
+        return
+    except PermanentJobError as e:
+        fail_job(job, worker_id, str(e), permanent=True)
+    except Exception as e:
+        fail_job(job, worker_id, f"{type(e).__name__}: {e}")
+    else:
+        if not beat.lost:
+            complete_job(job, worker_id, errors)
+    finally:
+        beat.stopped.set()
+        beat.join()
+
+
+def work(worker_id: str, stop: threading.Event, poll_interval: float = 5.0, once: bool = False) -> int:
+    """
+    İşçi döngüsü: görev kiralar ve çalıştırır
+    Yazar etiket girmediyse TF-IDF etiketleri her görevde değil, kuyruk
+    boşaldığında işlenen kitaplar için tek seferde doldurulur; model diskten
+    bir kez okunup yazılır.
+    Args:
+        once: True ise kuyrukta iş kalmayınca döner
+    Returns:
+        int: Çalıştırılan görev sayısı
+    """
+    processed = 0
+    untagged = []
+    try:
+        while not stop.is_set():
+            close_old_connections()
+            job = claim_job(worker_id)
+            if job is None:
+                if untagged:
+                    fill_book_tags(untagged)
+                    untagged = []
+                if once:
+                    break
+                stop.wait(poll_interval)
+                continue
+            run_job(job, worker_id)
+            untagged.append(job.book_id)
+            processed += 1
+        if untagged:
+            fill_book_tags(untagged)
+    finally:
+        connection.close()
+    return processed
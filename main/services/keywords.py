@@ -0,0 +1,234 @@
+"""
+Anahtar Kelime Çıkarma (TF-IDF)
+Tüm kitapların bölüm içerikleri üzerinde kurulan TF-IDF modeliyle, API çağrısı
+yapmadan kitap etiketleri üretir. Model her kitabın terim sayılarını (seyrek
+vektör) diskte saklar; yalnızca bölümleri değişen kitaplar yeniden sayılır.
+"""
+import json
+import math
+import os
+import tempfile
+import threading
+import zlib
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from main.models import Book, Chapter
+
+from . import page_cache, search
+from .local_provider import content_words
+
+
+# 1: parmak izi 'sayı:en büyük id'
+# 2: parmak izine en son güncellenme zamanı eklendi, terimler HTML ayıklanarak sayılır
+INDEX_FORMAT_VERSION = 2
+BATCH_SIZE = 500
+TAGS_MAX_LENGTH = Book._meta.get_field('tags').max_length
+
+_index_lock = threading.Lock()
+
+
+def get_index_path() -> str:
+    return str(getattr(
+        settings, 'KEYWORD_INDEX_PATH', os.path.join(settings.BASE_DIR, 'cache', 'keywords.json.z')
+    ))
+
+
+class KeywordIndex:
+    """
+    Kitap başına terim sayıları ve terimlerin geçtiği kitap sayıları (df)
+
+    Kitaplar bir "belge" kabul edilir. Bölüm panelden düzenlendiğinde id'si
+    değişmez; bu yüzden parmak izi bölüm sayısı, en büyük id ve en son
+    güncellenme zamanından oluşur.
+    """
+
+    def __init__(self):
+        self.documents: Dict[int, Dict] = {}  # book_id -> {'fingerprint': str, 'terms': {terim: sayı}}
+        self.df: Counter = Counter()
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def update(self, book_id: int, fingerprint: str, terms: Counter) -> None:
+        self.remove(book_id)
+        self.documents[book_id] = {'fingerprint': fingerprint, 'terms': dict(terms)}
+        self.df.update(terms.keys())
+
+    def remove(self, book_id: int) -> None:
+        old = self.documents.pop(book_id, None)
+        if old:
+            self.df.subtract(old['terms'].keys())
+            for term in old['terms']:
+                if self.df[term] <= 0:
+                    del self.df[term]
+
+    def keywords(self, book_id: int, count: int = 10) -> List[str]:
+        """
+        Kitabın en yüksek TF-IDF puanlı terimleri
+        tf = 1 + log(sayı), idf = log((1 + N) / (1 + df)) + 1
+        """
+        document = self.documents.get(book_id)
+        if not document:
+            return []
+        total = len(self.documents)
+        scores = {
+            term: (1 + math.log(frequency)) * (math.log((1 + total) / (1 + self.df[term])) + 1)
+            for term, frequency in document['terms'].items()
+        }
+        return sorted(scores, key=lambda term: (-scores[term], term))[:count]
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> 'KeywordIndex':
+        """Diskteki modeli yükler; yoksa veya bozuksa boş model döner"""
+        index = cls()
+        try:
+            with open(path or get_index_path(), 'rb') as file:
+                payload = json.loads(zlib.decompress(file.read()).decode('utf-8'))
+        except (OSError, ValueError, zlib.error):
+            return index
+        if payload.get('version') != INDEX_FORMAT_VERSION:
+            return index
+        for book_id, document in payload['documents'].items():
+            index.documents[int(book_id)] = document
+            index.df.update(document['terms'].keys())
+        return index
+
+    def save(self, path: Optional[str] = None) -> None:
+        path = path or get_index_path()
+        payload = {'version': INDEX_FORMAT_VERSION, 'documents': self.documents}
+        data = zlib.compress(json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+def book_fingerprints() -> Dict[int, str]:
+    """Bölümü olan her kitap için 'bölüm sayısı:en büyük id:en son güncellenme' (tek sorgu)"""
+    rows = (
+        Chapter.objects.values('book_id')
+        .annotate(count=Count('id'), last=Max('id'), updated=Max('updated_at'))
+        .order_by()
+    )
+    return {
+        row['book_id']: f"{row['count']}:{row['last']}:{row['updated'].timestamp():.6f}"
+        for row in rows
+    }
+
+
+def refresh_index(index: KeywordIndex) -> List[int]:
+    """
+    Modeli veritabanıyla eşitler: yeni ve değişen kitapları sayar, silinenleri çıkarır
+    Returns:
+        List[int]: Yeniden sayılan kitapların id'leri
+    """
+    fingerprints = book_fingerprints()
+    for book_id in set(index.documents) - set(fingerprints):
+        index.remove(book_id)
+
+    changed = [
+        book_id for book_id, fingerprint in fingerprints.items()
+        if index.documents.get(book_id, {}).get('fingerprint') != fingerprint
+    ]
+    if not changed:
+        return []
+
+    # Kitaplar gruplar halinde sayılır; IN listesi SQLite'ın parametre sınırını aşmaz
+    for start in range(0, len(changed), BATCH_SIZE):
+        batch = changed[start:start + BATCH_SIZE]
+        terms = {book_id: Counter() for book_id in batch}
+        contents = Chapter.objects.filter(book_id__in=batch).values_list('book_id', 'content')
+        for book_id, content in contents.iterator(chunk_size=200):
+            terms[book_id].update(content_words(search.html_to_text(content)))
+        for book_id in batch:
+            index.update(book_id, fingerprints[book_id], terms[book_id])
+    return changed
+
+
+def format_tags(keywords: Iterable[str]) -> str:
+    """Anahtar kelimeleri Book.tags alanına sığacak şekilde virgülle birleştirir"""
+    tags = ''
+    for keyword in keywords:
+        candidate = f'{tags}, {keyword}' if tags else keyword
+        if len(candidate) > TAGS_MAX_LENGTH:
+            break
+        tags = candidate
+    return tags
+
+
+def fill_book_tags(book_ids: Optional[List[int]] = None, count: int = 10, overwrite: bool = False) -> int:
+    """
+    Kitap etiketlerini TF-IDF anahtar kelimeleriyle toplu olarak doldurur
+    Args:
+        book_ids: Yalnızca bu kitaplar (None: tümü); model her durumda tüm kitaplarla eşitlenir
+        overwrite: False ise mevcut etiketlere dokunulmaz
+    Returns:
+        int: Etiketi güncellenen kitap sayısı
+    """
+    with _index_lock:
+        index = KeywordIndex.load()
+        if refresh_index(index):
+            index.save()
+
+    updated = 0
+    for books in _book_batches(book_ids, overwrite):
+        changed = []
+        now = timezone.now()
+        for book in books:
+            if book.pk not in index.documents:
+                continue
+            tags = format_tags(index.keywords(book.pk, count))
+            if tags and tags != book.tags:
+                book.tags = tags
+                book.updated_at = now  # Kitap sayfasının Last-Modified/ETag değeri
+                changed.append(book)
+        if not changed:
+            continue
+        Book.objects.bulk_update(changed, ['tags', 'updated_at'])
+        # bulk_update sinyal göndermez; arama indeksi burada güncellenir
+        search.index_books(
+            Book.objects.filter(pk__in=[book.pk for book in changed])
+            .select_related('author').prefetch_related('co_authors')
+        )
+        updated += len(changed)
+
+    # Sayfa önbelleği de sinyalsiz güncellendiği için burada bayatlatılır
+    if updated:
+        page_cache.invalidate_tags(page_cache.MODEL_TAGS['main.Book'])
+    return updated
+
+
+def _book_batches(book_ids: Optional[List[int]], overwrite: bool) -> Iterator[List[Book]]:
+    """
+    Etiketlenecek kitapları BATCH_SIZE'lık gruplar halinde üretir
+    Sorgular id sırasıyla sayfalanır; IN listesi hiçbir zaman SQLite'ın
+    parametre sınırını aşmaz.
+    """
+    books = Book.objects.only('pk', 'tags').order_by('pk')
+    if not overwrite:
+        books = books.filter(tags='')
+    if book_ids is not None:
+        book_ids = sorted(set(book_ids))
+        for start in range(0, len(book_ids), BATCH_SIZE):
+            yield list(books.filter(pk__in=book_ids[start:start + BATCH_SIZE]))
+        return
+
+    last = 0
+    while True:
+        batch = list(books.filter(pk__gt=last)[:BATCH_SIZE])
+        if not batch:
+            return
+        yield batch
+        last = batch[-1].pk
@@ -0,0 +1,87 @@
+"""
+Yerel Özetleyici
+Ağ erişimi gerektirmeyen, deterministik çıkarımsal (extractive) özetleyici.
+Cümleler kelime sıklığı ve metindeki konumlarına göre puanlanır; en yüksek
+puanlı cümleler metindeki sırasıyla döndürülür.
+"""
+import re
+from collections import Counter
+from typing import Dict, List
+
+
+SENTENCE_PATTERN = re.compile(r'[^.!?…\n]+(?:[.!?…]+|$)', re.MULTILINE)
+WORD_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+# Özet tipine göre seçilecek cümle sayısı
+SENTENCE_COUNTS = {
+    'short': 3,
+    'medium': 6,
+    'detailed': 15,
+}
+
+STOP_WORDS = frozenset("""
+acaba ama ancak artık aslında az bana bazen bazı belki ben beni benim bile bir biraz birçok biri birkaç
+birşey biz bize bizi bizim bu buna bunda bundan bunlar bunları bunların bunu bunun burada çok çünkü da
+daha dahi de defa değil diğer diye dolayı en gibi göre hem hep hepsi her herhangi hiç için ile ilgili
+ise işte kadar karşın kendi kendine ki kim kimse mı mi mu mü nasıl ne neden nerede nereye niçin niye o
+olan olarak oldu olduğu olduğunu olmak olması olup olur olursa on ona ondan onlar onları onların onu
+onun öyle oysa pek rağmen sadece sanki şey siz size sizi sizin şu şuna şunda şundan şunu tarafından
+tüm üzere var ve veya ya yani yine yoksa zaten
+the and of to in is it that for on with as was are be this by
+""".split())
+
+
+def turkish_lower(text: str) -> str:
+    """Türkçe büyük I/İ harflerini doğru küçültür"""
+    return text.replace('I', 'ı').replace('İ', 'i').lower()
+
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence.strip() for sentence in SENTENCE_PATTERN.findall(text) if sentence.strip()]
+
+
+def content_words(text: str) -> List[str]:
+    return [
+        word for word in WORD_PATTERN.findall(turkish_lower(text))
+        if len(word) > 2 and word not in STOP_WORDS and not word.isdigit()
+    ]
+
+
+class LocalSummarizer:
+    """
+    Cümle puanlamalı çıkarımsal özetleyici
+
+    Puan = cümledeki anlamlı kelimelerin ortalama sıklığı (en sık kelimeye
+    oranla) + metnin başındaki cümlelere küçük bir konum bonusu.
+    Aynı girdi için her zaman aynı özeti üretir.
+    """
+
+    def __init__(self, text: str):
+        self.sentences = split_sentences(text)
+        self.words = [content_words(sentence) for sentence in self.sentences]
+        self.frequencies = Counter(word for words in self.words for word in words)
+        self._ranking = None
+
+    def ranking(self) -> List[int]:
+        """Cümle indekslerini puana göre (eşitlikte metin sırasıyla) döndürür"""
+        if self._ranking is None:
+            top = max(self.frequencies.values(), default=1)
+            count = len(self.sentences)
+            scores = []
+            for index, words in enumerate(self.words):
+                score = sum(self.frequencies[word] for word in words) / (top * len(words)) if words else 0.0
+                score += 0.1 * (1 - index / count)
+                scores.append(score)
+            self._ranking = sorted(range(count), key=lambda index: (-scores[index], index))
+        return self._ranking
+
+    def summarize(self, sentence_count: int) -> str:
+        chosen = sorted(self.ranking()[:sentence_count])
+        return ' '.join(self.sentences[index] for index in chosen)
+
+    def summarize_levels(self) -> Dict[str, str]:
+        """Kısa, orta ve detaylı özeti tek puanlamayla üretir"""
+        return {summary_type: self.summarize(count) for summary_type, count in SENTENCE_COUNTS.items()}
+
+    def keywords(self, count: int = 10) -> List[str]:
+        return [word for word, _ in self.frequencies.most_common(count)]
@@ -0,0 +1,180 @@
+"""
+Sayfa Önbelleği
+Anonim ziyaretçilere giden liste ve detay sayfalarının tamamını önbellekte
+tutar. Anahtar alan adı, yol, sorgu parametreleri ve oturum durumundan oluşur;
+yalnızca anonim istekler önbelleğe alınır (giriş yapmış kullanıcının menüsü,
+mesajları kişiseldir).
+
+Geçersiz kılma etiketlerle yapılır: her kayıt üretildiği andaki etiket
+sürümlerini saklar. Bir model kaydedildiğinde ilgili etiketin sürümü artar ve
+o etikete bağlı tüm sayfalar bayatlar; tek tek anahtar silmek gerekmez. Sürüm
+anahtarı önbellekten düşerse (LocMemCache ayıklaması) etiket 0'dan değil
+time.time_ns() ile yeniden başlar; böylece eski sayfalar taze görünmez.
+
+Aynı sayfa aynı anda çok istek alırsa (stampede) yalnızca kilidi alan istek
+sayfayı üretir. Diğerleri varsa bayat kopyayı sunar, yoksa yeni kopyayı
+PAGE_CACHE_LOCK_WAIT saniyeye kadar bekler.
+"""
+import hashlib
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+# Model -> bu modelin değişince bayatlattığı sayfa etiketi
+MODEL_TAGS = {
+    'main.Book': 'books',
+    'main.Article': 'articles',
+    'main.ArticleSeries': 'series',
+    'main.BookCategory': 'categories',
+    'main.SiteSettings': 'site',
+}
+
+LOCK_TIMEOUT = 30
+POLL_INTERVAL = 0.05
+
+
+def get_cache():
+    return caches[getattr(settings, 'PAGE_CACHE', 'default')]
+
+
+def is_enabled() -> bool:
+    return getattr(settings, 'PAGE_CACHE_ENABLED', True)
+
+
+def get_timeout() -> int:
+    return getattr(settings, 'PAGE_CACHE_TIMEOUT', 300)
+
+
+def _tag_key(tag: str) -> str:
+    return f'page-tag:{tag}'
+
+
+def tag_versions(tags: Iterable[str]) -> Dict[str, int]:
+    """Etiketlerin güncel sürümleri; önbellekte olmayan etiket yeni bir sürümle başlatılır"""
+    tags = list(tags)
+    cache = get_cache()
+    values = cache.get_many([_tag_key(tag) for tag in tags])
+    missing = [_tag_key(tag) for tag in tags if _tag_key(tag) not in values]
+    if missing:
+        for key in missing:
+            cache.add(key, time.time_ns(), timeout=None)
+        # Aynı anda başka bir istek başlatmış olabilir; kazanan değer okunur
+        values.update(cache.get_many(missing))
+    return {tag: values.get(_tag_key(tag), 0) for tag in tags}
+
+
+def invalidate_tags(*tags: str) -> None:
+    """Etiketlere bağlı tüm sayfaları bayatlatır"""
+    cache = get_cache()
+    for tag in tags:
+        key = _tag_key(tag)
+        try:
+            cache.incr(key)
+        except ValueError:
+            if not cache.add(key, time.time_ns(), timeout=None):
+                cache.incr(key)
+
+
+def page_key(request, auth_state: str) -> str:
+    url = f'{request.get_host()}{request.get_full_path()}'
+    return f'page:{auth_state}:{hashlib.md5(url.encode()).hexdigest()}'
+
+
+def is_cacheable_request(request) -> bool:
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    # Bekleyen mesajı olan ziyaretçi sayfayı kişisel haliyle görmeli
+    if 'messages' in request.COOKIES:
+        return False
+    return not request.user.is_authenticated
+
+
+def is_cacheable_response(request, response) -> bool:
+    # Çerez ayarlayan ya da CSRF çerezi isteyen yanıt başka ziyaretçiye gösterilemez
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+    )
+
+
+def _store(key: str, response, versions: Dict[str, int]) -> None:
+    entry = {
+        'content': response.content,
+        'status': response.status_code,
+        'headers': dict(response.items()),
+        'versions': versions,
+        'meta': getattr(response, 'page_cache_meta', None),
+    }
+    get_cache().set(key, entry, get_timeout())
+
+
+def _build(entry: Dict) -> HttpResponse:
+    response = HttpResponse(entry['content'], status=entry['status'])
+    for header, value in entry['headers'].items():
+        response[header] = value
+    response['X-Page-Cache'] = 'hit'
+    return response
+
+
+def _is_fresh(entry: Optional[Dict], tags: Iterable[str]) -> bool:
+    return entry is not None and entry['versions'] == tag_versions(tags)
+
+
+def cached_response(request, view: Callable, tags: Iterable[str], on_hit: Optional[Callable] = None):
+    """
+    view() yanıtını önbellekten sunar ya da üretip önbelleğe alır
+    Args:
+        view: Argümansız çağrılan görünüm
+        tags: Sayfanın bağlı olduğu etiketler (MODEL_TAGS değerleri)
+        on_hit: Önbellekten sunulurken çağrılır: on_hit(request, meta). meta,
+                görünümün response.page_cache_meta olarak bıraktığı değerdir
+                (örn. görüntülenme sayacı için kitap id'si)
+    """
+    if not is_enabled() or not is_cacheable_request(request):
+        return view()
+
+    tags = tuple(tags)
+    cache = get_cache()
+    key = page_key(request, 'anonymous')
+    lock_key = f'{key}:lock'
+
+    entry = cache.get(key)
+    if _is_fresh(entry, tags):
+        return _serve(request, entry, on_hit)
+
+    deadline = time.monotonic() + getattr(settings, 'PAGE_CACHE_LOCK_WAIT', 5)
+    while not cache.add(lock_key, 1, LOCK_TIMEOUT):
+        # Başka bir istek üretiyor: bayat kopya varsa onu sun, yoksa bekle
+        if entry is not None:
+            return _serve(request, entry, on_hit)
+        if time.monotonic() >= deadline:
+            return view()
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if _is_fresh(entry, tags):
+            return _serve(request, entry, on_hit)
+
+    try:
+        # Sürümler üretimden önce okunur; üretim sırasında gelen değişiklik kaydı bayat bırakır
+        versions = tag_versions(tags)
+        response = view()
+        if is_cacheable_response(request, response):
+            _store(key, response, versions)
+        patch_vary_headers(response, ('Cookie',))
+        return response
+    finally:
+        cache.delete(lock_key)
+
+
+def _serve(request, entry: Dict, on_hit: Optional[Callable]) -> HttpResponse:
+    if on_hit is not None:
+        on_hit(request, entry['meta'])
+    response = _build(entry)
+    patch_vary_headers(response, ('Cookie',))
+    return response
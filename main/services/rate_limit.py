@@ -0,0 +1,198 @@
+"""
+AI Sağlayıcı Hız Sınırlama ve Yeniden Deneme
+Süreç genelinde paylaşılan dakikalık istek/token kovaları (token bucket) ve
+üstel geri çekilmeli, rastgele gecikmeli (jitter) yeniden deneme.
+Senkron ve asyncio çağıranlardan aynı sınırlayıcı kullanılabilir.
+"""
+import asyncio
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+RETRYABLE_ERROR_NAMES = {
+    'APIConnectionError', 'APITimeoutError',  # openai
+    'ResourceExhausted', 'ServiceUnavailable', 'DeadlineExceeded',  # google.api_core
+}
+
+
+class TokenBucket:
+    """
+    Dakikalık kapasitesi olan kova
+    reserve() miktarı hemen düşer ve beklenmesi gereken süreyi döndürür; bakiye
+    eksiye inebilir, böylece bekleyen çağıranlar sıralarını korur.
+    per_minute <= 0 ise sınırsızdır.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        if self.capacity <= 0:
+            return 0.0
+        amount = min(amount, self.capacity)
+        rate = self.capacity / 60.0
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * rate)
+            self.updated = now
+            self.tokens -= amount
+            return max(0.0, -self.tokens / rate)
+
+
+class RateLimiter:
+    """
+    İstek/dakika ve token/dakika sınırlarını birlikte uygulayan sınırlayıcı
+    Sağlayıcı 429 ile retry-after bildirirse defer() tüm çağıranları o süre bekletir.
+    """
+
+    def __init__(self, requests_per_minute: float = 0, tokens_per_minute: float = 0):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self, tokens: int = 0) -> float:
+        """Bir istek ve `tokens` kadar token ayırır, beklenecek süreyi döndürür"""
+        wait = max(self.requests.reserve(1), self.tokens.reserve(tokens) if tokens else 0.0)
+        with self.lock:
+            return max(wait, self.blocked_until - time.monotonic())
+
+    def acquire(self, tokens: int = 0) -> None:
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int = 0) -> None:
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def defer(self, seconds: float) -> None:
+        """Sonraki tüm istekleri en az `seconds` saniye erteler"""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+_limiters: Dict[Tuple, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> RateLimiter:
+    """
+    Sağlayıcının paylaşılan sınırlayıcısını döndürür
+    Sınırlar AI_REQUESTS_PER_MINUTE ve AI_TOKENS_PER_MINUTE ayarlarından okunur.
+    """
+    key = (
+        provider,
+        getattr(settings, 'AI_REQUESTS_PER_MINUTE', 0),
+        getattr(settings, 'AI_TOKENS_PER_MINUTE', 0),
+    )
+    with _limiters_lock:
+        if key not in _limiters:
+            _limiters[key] = RateLimiter(key[1], key[2])
+        return _limiters[key]
+
+
+def reset_rate_limiters() -> None:
+    """Paylaşılan sınırlayıcıları sıfırlar (testler için)"""
+    with _limiters_lock:
+        _limiters.clear()
+
+
+def _status_code(exc: Exception) -> Optional[int]:
+    code = getattr(exc, 'status_code', None) or getattr(exc, 'code', None)
+    return code if isinstance(code, int) else None
+
+
+def retry_after_seconds(exc: Exception) -> Optional[float]:
+    """
+    Hata yeniden denenebilirse sağlayıcının önerdiği bekleme süresini döndürür
+    Returns:
+        None: yeniden denenmemeli; 0: öneri yok; > 0: retry-after (saniye)
+    """
+    if _status_code(exc) not in RETRYABLE_STATUS_CODES and type(exc).__name__ not in RETRYABLE_ERROR_NAMES:
+        return None
+
+    response = getattr(exc, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    for name in ('retry-after-ms', 'retry-after'):
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            seconds = float(value)
+        except (TypeError, ValueError):
+            continue  # HTTP tarih biçimi desteklenmiyor, geri çekilme kullanılır
+        return seconds / 1000.0 if name == 'retry-after-ms' else seconds
+    return 0.0
+
+
+class RetryPolicy:
+    """
+    Üstel geri çekilme: deneme n için [0, min(max_delay, base_delay * 2**n)] aralığında
+    rastgele bekleme (full jitter). Sağlayıcı retry-after verdiyse en az o kadar beklenir.
+    """
+
+    def __init__(self, max_retries: Optional[int] = None, base_delay: Optional[float] = None,
+                 max_delay: Optional[float] = None):
+        self.max_retries = max_retries if max_retries is not None else getattr(settings, 'AI_MAX_RETRIES', 5)
+        self.base_delay = base_delay if base_delay is not None else getattr(settings, 'AI_RETRY_BASE_DELAY', 1.0)
+        self.max_delay = max_delay if max_delay is not None else getattr(settings, 'AI_RETRY_MAX_DELAY', 60.0)
+
+    def delay(self, attempt: int, retry_after: float = 0.0) -> float:
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        return max(retry_after, backoff)
+
+
+def _next_delay(exc: Exception, attempt: int, policy: RetryPolicy, limiter: Optional[RateLimiter]) -> float:
+    """Yeniden denenecekse bekleme süresini döndürür, denenmeyecekse hatayı yükseltir"""
+    retry_after = retry_after_seconds(exc)
+    if retry_after is None or attempt >= policy.max_retries:
+        raise exc
+    if retry_after and limiter is not None:
+        # Sınır aşıldı: aynı sınırlayıcıyı kullanan diğer çağıranlar da beklesin
+        limiter.defer(retry_after)
+    return policy.delay(attempt, retry_after)
+
+
+def call_with_retry(func: Callable, limiter: Optional[RateLimiter] = None, tokens: int = 0,
+                    policy: Optional[RetryPolicy] = None):
+    """
+    func() çağrısını hız sınırına uyarak yapar, geçici hatalarda yeniden dener
+    Yeniden denenemeyen hatalar ve son denemenin hatası çağırana yükseltilir.
+    """
+    policy = policy or RetryPolicy()
+    attempt = 0
+    while True:
+        if limiter is not None:
+            limiter.acquire(tokens)
+        try:
+            return func()
+        except Exception as e:
+            delay = _next_delay(e, attempt, policy, limiter)
+        attempt += 1
+        time.sleep(delay)
+
+
+async def call_with_retry_async(func: Callable, limiter: Optional[RateLimiter] = None, tokens: int = 0,
+                                policy: Optional[RetryPolicy] = None):
+    """call_with_retry'ın asyncio sürümü; func bir coroutine fonksiyonudur"""
+    policy = policy or RetryPolicy()
+    attempt = 0
+    while True:
+        if limiter is not None:
+            await limiter.acquire_async(tokens)
+        try:
+            return await func()
+        except Exception as e:
+            delay = _next_delay(e, attempt, policy, limiter)
+        attempt += 1
+        await asyncio.sleep(delay)
@@ -0,0 +1,161 @@
+"""
+AI Yanıt Önbelleği
+Sağlayıcı yanıtlarını (sağlayıcı, model, istem sürümü, özet tipi, metin özeti)
+anahtarıyla SQLite dosyasında saklar. Değişmemiş bölümlerin ve aynı dosyanın
+yeniden işlenmesi API çağrısı yapmadan sonuçlanır.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from django.conf import settings
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+
+def make_cache_key(provider: str, model: str, prompt_version: int, summary_type: str, text: str) -> str:
+    """İstek girdilerinden içerik adresli önbellek anahtarı üretir"""
+    text_digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    raw = f"{provider}\x00{model}\x00{prompt_version}\x00{summary_type}\x00{text_digest}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite tabanlı, süreli (TTL) ve boyut sınırlı (LRU) yanıt önbelleği
+
+    Her iş parçacığı kendi bağlantısını kullanır; veritabanı WAL kipinde
+    açıldığından işçi süreçleri aynı dosyayı paylaşabilir. Okunan kayıtların
+    son kullanım zamanı güncellenir ve boyut aşıldığında en eski kayıtlar silinir.
+    """
+
+    _lock = threading.Lock()
+    hits = 0
+    misses = 0
+
+    def __init__(self, path: Optional[str] = None, ttl: Optional[int] = None, max_bytes: Optional[int] = None):
+        self.path = str(path or getattr(
+            settings, 'AI_RESPONSE_CACHE_PATH', os.path.join(settings.BASE_DIR, 'cache', 'ai_responses.sqlite3')
+        ))
+        self.ttl = ttl if ttl is not None else getattr(settings, 'AI_RESPONSE_CACHE_TTL', 30 * 24 * 3600)
+        self.max_bytes = max_bytes if max_bytes is not None else getattr(
+            settings, 'AI_RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024
+        )
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    @classmethod
+    def _count(cls, hit: bool) -> None:
+        with cls._lock:
+            if hit:
+                cls.hits += 1
+            else:
+                cls.misses += 1
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Süresi dolmamış kaydı döndürür, yoksa None"""
+        conn = self._connection()
+        row = conn.execute('SELECT value, created_at FROM responses WHERE key = ?', (key,)).fetchone()
+        now = time.time()
+        if row is None:
+            self._count(hit=False)
+            return None
+        if self.ttl and row[1] + self.ttl < now:
+            conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+            self._count(hit=False)
+            return None
+
+        conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+        self._count(hit=True)
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Dict) -> None:
+        """Yanıtı kaydeder ve gerekirse eski kayıtları siler"""
+        data = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        self._connection().execute(
+            'INSERT OR REPLACE INTO responses (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)',
+            (key, data, len(data.encode('utf-8')), now, now),
+        )
+        self.evict()
+
+    def evict(self) -> int:
+        """Süresi dolan kayıtları ve boyut sınırını aşan en eski kayıtları siler"""
+        conn = self._connection()
+        removed = 0
+        if self.ttl:
+            removed += conn.execute('DELETE FROM responses WHERE created_at < ?', (time.time() - self.ttl,)).rowcount
+
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return removed
+
+        stale = []
+        for key, size in conn.execute('SELECT key, size FROM responses ORDER BY accessed_at'):
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        conn.executemany('DELETE FROM responses WHERE key = ?', stale)
+        return removed + len(stale)
+
+    def clear(self) -> None:
+        """Tüm kayıtları siler"""
+        self._connection().execute('DELETE FROM responses')
+
+    def stats(self) -> Dict[str, float]:
+        """İsabet/ıska sayaçları, isabet oranı ve önbellek boyutu"""
+        entries, size = self._connection().execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses'
+        ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries,
+            'size_bytes': size,
+            'max_bytes': self.max_bytes,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Süreç genelinde paylaşılan önbelleği döndürür
+    AI_RESPONSE_CACHE_ENABLED kapalıysa None döner.
+    """
+    global _cache
+    if not getattr(settings, 'AI_RESPONSE_CACHE_ENABLED', True):
+        return None
+    path = str(getattr(settings, 'AI_RESPONSE_CACHE_PATH', ''))
+    with _cache_lock:
+        if _cache is None or (path and _cache.path != path):
+            _cache = ResponseCache()
+        return _cache
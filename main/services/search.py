@@ -0,0 +1,305 @@
+"""
+Kitap Arama İndeksi
+SQLite FTS5 sanal tablosu (main_book_fts) üzerinde başlık, açıklama, etiket ve
+yazar adlarında tam metin arama. Sıralama BM25 ile yapılır, her kelime önek
+olarak eşleşir. Metin ve sorgu Türkçe kurallarıyla küçültülüp aksansız hale
+getirilir: "IŞIK", "ışık" ve "isik" aynı terimdir.
+
+Bölüm içerikleri ayrı bir indekste (main_chapter_fts) tutulur. HTML indekslerken
+ayıklanır; düz metin main_chapter_text tablosunda saklanır ve FTS5 bu tabloyu
+"external content" olarak kullanır. İndekse katlanmış metin, içerik tablosuna
+özgün metin yazıldığından snippet() vurguları okuyucunun gördüğü metin
+üzerinde çıkar (katlama kelime sınırlarını değiştirmez).
+
+FTS5 yoksa (başka veritabanı veya FTS5'siz SQLite) is_available() False döner
+ve book_list eski LIKE aramasını kullanır.
+"""
+import html
+import re
+from typing import Dict, Iterable, List, Optional
+
+from django.db import connection
+
+FTS_TABLE = 'main_book_fts'
+
+# Değiştiğinde indeksin güncellenmesi gereken alanlar (save(update_fields=...) için)
+BOOK_FIELDS = {'title', 'description', 'tags', 'author'}
+AUTHOR_FIELDS = {'username', 'first_name', 'last_name'}
+
+# bm25 sütun ağırlıkları: title, description, tags, authors
+BM25_WEIGHTS = (10.0, 1.0, 4.0, 6.0)
+RANK_SQL = f"bm25({FTS_TABLE}, {', '.join(str(weight) for weight in BM25_WEIGHTS)})"
+
+CHAPTER_FTS_TABLE = 'main_chapter_fts'
+CHAPTER_TEXT_TABLE = 'main_chapter_text'
+CHAPTER_FIELDS = {'title', 'content', 'book'}
+
+# book_id yalnızca kitaba göre süzmek içindir, puana katılmaz
+CHAPTER_RANK_SQL = f"bm25({CHAPTER_FTS_TABLE}, 0.0, 5.0, 1.0)"
+
+# snippet() işaretleri; HTML kaçışından sonra <mark> etiketine çevrilir
+SNIPPET_START, SNIPPET_END = '\x02', '\x03'
+SNIPPET_TOKENS = 24
+
+_ASCII_FOLD = str.maketrans('çğıöşüâîû', 'cgiosuaiu')
+_WORD_PATTERN = re.compile(r'\w+', re.UNICODE)
+_SKIPPED_ELEMENTS = re.compile(r'<(script|style)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_TAG_PATTERN = re.compile(r'<[^>]*>')
+_SPACE_PATTERN = re.compile(r'\s+')
+
+_available = {}
+
+
+def fold(text: str) -> str:
+    """Türkçe küçük harfe çevirir ve Türkçe karakterleri ASCII karşılıklarına indirger"""
+    text = (text or '').replace('I', 'ı').replace('İ', 'i').lower()
+    return text.translate(_ASCII_FOLD)
+
+
+def html_to_text(content: str) -> str:
+    """HTML etiketlerini kelimeleri birleştirmeden ayıklar ve varlıkları çözer"""
+    text = _TAG_PATTERN.sub(' ', _SKIPPED_ELEMENTS.sub(' ', content or ''))
+    return _SPACE_PATTERN.sub(' ', html.unescape(text)).strip()
+
+
+def is_available(table: str = FTS_TABLE) -> bool:
+    """Varsayılan veritabanında FTS tablosu var mı (veritabanı başına bir kez bakılır)"""
+    key = (connection.settings_dict['NAME'], table)
+    if key not in _available:
+        if connection.vendor != 'sqlite':
+            _available[key] = False
+        else:
+            _available[key] = table in connection.introspection.table_names(include_views=True)
+    return _available[key]
+
+
+def reset_availability() -> None:
+    _available.clear()
+
+
+def build_match_query(query: str) -> str:
+    """
+    Kullanıcı sorgusunu FTS5 MATCH ifadesine çevirir
+    Her kelime tırnaklı önek terimi olur ("kelime"*) ve hepsi aranır (AND).
+    FTS5 sözdizimi karakterleri \\w dışında kaldığından kullanıcı girdisi sorguyu bozamaz.
+    """
+    return ' '.join(f'"{word}"*' for word in _WORD_PATTERN.findall(fold(query)))
+
+
+def _author_names(book) -> str:
+    authors = [book.author, *book.co_authors.all()] if book.pk else [book.author]
+    return ' '.join(
+        f'{author.username} {author.first_name} {author.last_name}' for author in authors if author
+    )
+
+
+def _row(book) -> tuple:
+    return (
+        book.pk,
+        fold(book.title),
+        fold(book.description),
+        fold(book.tags),
+        fold(_author_names(book)),
+    )
+
+
+def index_books(books: Iterable) -> None:
+    """Kitapları indekse ekler ya da günceller"""
+    if not is_available():
+        return
+    rows = [_row(book) for book in books]
+    if not rows:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(row[0],) for row in rows])
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, title, description, tags, authors) VALUES (%s, %s, %s, %s, %s)",
+            rows,
+        )
+
+
+def remove_book(book_id: int) -> None:
+    if is_available():
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [book_id])
+    remove_chapters(book_id=book_id)
+
+
+def rebuild_index(batch_size: int = 500, book_model=None) -> int:
+    """
+    İndeksi tüm kitaplardan yeniden kurar; indekslenen kitap sayısını döndürür
+    book_model: Migration içinden çağrılırken geçmiş (historical) Book modeli
+    """
+    if book_model is None:
+        from main.models import Book as book_model
+
+    if not is_available():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+    books = book_model.objects.select_related('author').prefetch_related('co_authors').order_by('pk')
+    count = 0
+    batch = []
+    for book in books.iterator(chunk_size=batch_size):
+        batch.append(book)
+        if len(batch) >= batch_size:
+            index_books(batch)
+            count += len(batch)
+            batch = []
+    index_books(batch)
+    return count + len(batch)
+
+
+def search_books(queryset, query: str):
+    """
+    Kitap sorgusunu arama terimine göre süzer ve BM25 puanına göre sıralar
+    FTS5 yoksa None döner; çağıran eski aramaya geri dönmelidir.
+    """
+    if not is_available():
+        return None
+    match = build_match_query(query)
+    if not match:
+        return queryset.none()
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[f"{FTS_TABLE}.rowid = main_book.id", f"{FTS_TABLE} MATCH %s"],
+        params=[match],
+        select={'search_rank': RANK_SQL},
+        order_by=['search_rank'],
+    )
+
+
+def _delete_chapter_rows(cursor, where: str, params: list) -> None:
+    # External content tablosunda silme, indekslenen değerlerle 'delete' komutu ister
+    cursor.execute(f"SELECT id, book_id, title, body FROM {CHAPTER_TEXT_TABLE} WHERE {where}", params)
+    rows = [(pk, str(book_id), fold(title), fold(body)) for pk, book_id, title, body in cursor.fetchall()]
+    if not rows:
+        return
+    cursor.executemany(
+        f"INSERT INTO {CHAPTER_FTS_TABLE} ({CHAPTER_FTS_TABLE}, rowid, book_id, title, body) "
+        f"VALUES ('delete', %s, %s, %s, %s)",
+        rows,
+    )
+    cursor.execute(f"DELETE FROM {CHAPTER_TEXT_TABLE} WHERE {where}", params)
+
+
+def _insert_chapter_rows(cursor, chapters: Iterable) -> int:
+    rows = [(chapter.pk, chapter.book_id, chapter.title, html_to_text(chapter.content)) for chapter in chapters]
+    if not rows:
+        return 0
+    cursor.executemany(
+        f"INSERT INTO {CHAPTER_TEXT_TABLE} (id, book_id, title, body) VALUES (%s, %s, %s, %s)", rows,
+    )
+    cursor.executemany(
+        f"INSERT INTO {CHAPTER_FTS_TABLE} (rowid, book_id, title, body) VALUES (%s, %s, %s, %s)",
+        [(pk, str(book_id), fold(title), fold(body)) for pk, book_id, title, body in rows],
+    )
+    return len(rows)
+
+
+def index_chapters(chapters: Iterable) -> None:
+    """Bölümleri indekse ekler ya da günceller"""
+    if not is_available(CHAPTER_FTS_TABLE):
+        return
+    chapters = list(chapters)
+    if not chapters:
+        return
+    with connection.cursor() as cursor:
+        ids = [chapter.pk for chapter in chapters]
+        for start in range(0, len(ids), 500):
+            batch = ids[start:start + 500]
+            _delete_chapter_rows(cursor, f"id IN ({', '.join(['%s'] * len(batch))})", batch)
+        _insert_chapter_rows(cursor, chapters)
+
+
+def remove_chapters(book_id: Optional[int] = None, chapter_id: Optional[int] = None) -> None:
+    if not is_available(CHAPTER_FTS_TABLE):
+        return
+    with connection.cursor() as cursor:
+        if chapter_id is not None:
+            _delete_chapter_rows(cursor, "id = %s", [chapter_id])
+        else:
+            _delete_chapter_rows(cursor, "book_id = %s", [book_id])
+
+
+def remove_chapter_ids(ids: List[int]) -> None:
+    """Verilen bölümleri indeksten çıkarır (bölümler toplu silinirken)"""
+    if not is_available(CHAPTER_FTS_TABLE) or not ids:
+        return
+    with connection.cursor() as cursor:
+        for start in range(0, len(ids), 500):
+            batch = ids[start:start + 500]
+            _delete_chapter_rows(cursor, f"id IN ({', '.join(['%s'] * len(batch))})", batch)
+
+
+def rebuild_chapter_index(batch_size: int = 200, chapter_model=None) -> int:
+    """
+    Bölüm indeksini tüm bölümlerden yeniden kurar; indekslenen bölüm sayısını döndürür
+    chapter_model: Migration içinden çağrılırken geçmiş (historical) Chapter modeli
+    """
+    if chapter_model is None:
+        from main.models import Chapter as chapter_model
+
+    if not is_available(CHAPTER_FTS_TABLE):
+        return 0
+    count = 0
+    chapters = chapter_model.objects.only('id', 'book_id', 'title', 'content').order_by('pk')
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {CHAPTER_TEXT_TABLE}")
+        cursor.execute(f"INSERT INTO {CHAPTER_FTS_TABLE} ({CHAPTER_FTS_TABLE}) VALUES ('delete-all')")
+        batch = []
+        for chapter in chapters.iterator(chunk_size=batch_size):
+            batch.append(chapter)
+            if len(batch) >= batch_size:
+                count += _insert_chapter_rows(cursor, batch)
+                batch = []
+        count += _insert_chapter_rows(cursor, batch)
+    return count
+
+
+def _format_snippet(snippet: str) -> str:
+    return html.escape(snippet).replace(SNIPPET_START, '<mark>').replace(SNIPPET_END, '</mark>')
+
+
+def search_chapters(book_id: int, query: str, limit: int = 20) -> Optional[List[Dict]]:
+    """
+    Kitabın bölümlerinde arar, en alakalıdan başlayarak döndürür
+    Returns:
+        Optional[List[Dict]]: [{'id', 'title', 'slug', 'order', 'snippet'}]; snippet
+        HTML olarak güvenlidir ve eşleşmeler <mark> ile işaretlidir. İndeks yoksa None
+    """
+    if not is_available(CHAPTER_FTS_TABLE):
+        return None
+    match = build_match_query(query)
+    if not match:
+        return []
+    sql = (
+        f"SELECT c.id, c.title, c.slug, c.\"order\", "
+        f"snippet({CHAPTER_FTS_TABLE}, 2, %s, %s, '…', {SNIPPET_TOKENS}) "
+        f"FROM {CHAPTER_FTS_TABLE} JOIN main_chapter c ON c.id = {CHAPTER_FTS_TABLE}.rowid "
+        f"WHERE {CHAPTER_FTS_TABLE} MATCH %s ORDER BY {CHAPTER_RANK_SQL} LIMIT %s"
+    )
+    # Silinmiş bölümlerin kalıntıları JOIN ile elenir
+    params = [SNIPPET_START, SNIPPET_END, f'book_id : "{int(book_id)}" AND {{title body}} : ({match})', limit]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [
+            {'id': pk, 'title': title, 'slug': slug, 'order': order, 'snippet': _format_snippet(snippet)}
+            for pk, title, slug, order, snippet in cursor.fetchall()
+        ]
+
+
+def search_chapter_ids(query: str, limit: int = 1000) -> Optional[List[int]]:
+    """Tüm kitaplarda eşleşen bölüm id'leri (admin araması için); indeks yoksa None"""
+    if not is_available(CHAPTER_FTS_TABLE):
+        return None
+    match = build_match_query(query)
+    if not match:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {CHAPTER_FTS_TABLE} WHERE {CHAPTER_FTS_TABLE} MATCH %s "
+            f"ORDER BY {CHAPTER_RANK_SQL} LIMIT %s",
+            [f'{{title body}} : ({match})', limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
@@ -0,0 +1,71 @@
+"""
+Site Ayarları Önbelleği
+SiteSettings tek kayıtlık bir tablodur ve context processor her şablon
+yanıtında okur. Kayıt, süreç içi bir kopya ve ortak önbellek (SITE_SETTINGS_CACHE)
+üzerinden veritabanına gitmeden sunulur.
+
+Geçerlilik bir sürüm numarasıyla izlenir: SiteSettings kaydedildiğinde (post_save
+sinyali) ortak önbellekteki sürüm değişir, diğer süreçler bir sonraki okumada
+eski kopyalarını bırakır. Sürüm anahtarı önbellekten düşerse zaman damgasıyla
+yeniden başlatılır; eski sürümlerin kayıtları bu yüzden tekrar geçerli olmaz.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+VERSION_KEY = 'site-settings:version'
+
+_local = threading.local()
+
+
+def get_cache():
+    return caches[getattr(settings, 'SITE_SETTINGS_CACHE', 'default')]
+
+
+def get_settings_version() -> int:
+    """Ayarların güncel sürümü; ayarlara bağlı önbellek anahtarlarında kullanılabilir"""
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def get_site_settings():
+    """
+    SiteSettings kaydını önbellekten döndürür
+    Dönen nesne süreç içinde (iş parçacığı başına) paylaşılır; değiştirilecekse
+    değişiklikten sonra save() çağrılmalıdır.
+    """
+    from main.models import SiteSettings
+
+    version = get_settings_version()
+    cached = getattr(_local, 'entry', None)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    cache = get_cache()
+    key = f'site-settings:{version}'
+    site_settings = cache.get(key)
+    if site_settings is None:
+        site_settings = SiteSettings.load()
+        cache.set(key, site_settings, timeout=None)
+    _local.entry = (version, site_settings)
+    return site_settings
+
+
+def invalidate() -> None:
+    """Tüm süreçlerdeki kopyaları geçersiz kılar (SiteSettings kaydedildiğinde)"""
+    cache = get_cache()
+    old_version = cache.get(VERSION_KEY)
+    try:
+        version = cache.incr(VERSION_KEY)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(VERSION_KEY, version, timeout=None)
+    if old_version is not None:
+        cache.delete(f'site-settings:{old_version}')
+    _local.entry = None
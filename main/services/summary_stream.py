@@ -0,0 +1,83 @@
+"""
+Akış Halinde Özet Üretimi
+Sağlayıcıdan gelen parçaları BookSummary kaydına aralıklarla yazar. Bağlantı
+koparsa o ana kadar yazılan kısım kalır ve sonraki denemede kaldığı yerden
+devam edilir; okuyucu sayfası yarım özeti erkenden gösterebilir.
+"""
+import time
+from typing import Dict
+
+from django.conf import settings
+from django.utils import timezone
+
+from main.models import Book, BookSummary
+
+from .ai_service import AIService, PROVIDER_LABELS
+
+
+def get_flush_interval() -> float:
+    return getattr(settings, 'AI_SUMMARY_FLUSH_SECONDS', 1.0)
+
+
+def get_flush_chars() -> int:
+    return getattr(settings, 'AI_SUMMARY_FLUSH_CHARS', 400)
+
+
+def stream_book_summary(book: Book, summary_type: str, text: str, provider: str = 'openai',
+                        restart: bool = False) -> Dict:
+    """
+    Kitap özetini akış halinde üretip kaydeder
+    Yeni içerik AI_SUMMARY_FLUSH_SECONDS saniyede bir ya da AI_SUMMARY_FLUSH_CHARS
+    karakter biriktiğinde veritabanına yazılır.
+
+    Args:
+        restart: True ise mevcut (tamamlanmış ya da yarım) özet baştan üretilir;
+                 False ise tamamlanmış özete dokunulmaz, yarım özet tamamlanır
+
+    Returns:
+        Dict: {'summary': str, 'token_count': int, 'error': str, 'resumed': bool}
+    """
+    summary, _ = BookSummary.objects.get_or_create(
+        book=book, chapter=None, summary_type=summary_type,
+        defaults={'content': '', 'is_complete': False},
+    )
+    if restart:
+        summary.content = ''
+        summary.is_complete = False
+        summary.token_count = 0
+    elif summary.is_complete and summary.content:
+        return {'summary': summary.content, 'token_count': 0, 'error': None, 'resumed': False}
+
+    partial = summary.content
+    content = partial
+    saved_length = len(content)
+    saved_at = time.monotonic()
+
+    def flush(**fields):
+        nonlocal saved_length, saved_at
+        BookSummary.objects.filter(pk=summary.pk).update(content=content, updated_at=timezone.now(), **fields)
+        saved_length = len(content)
+        saved_at = time.monotonic()
+
+    flush(is_complete=False, generated_by=PROVIDER_LABELS.get(provider, provider))
+    stream = AIService(provider).stream_summary(text, summary_type, partial=partial)
+    try:
+        while True:
+            try:
+                content += next(stream)
+            except StopIteration as stop:
+                token_count = stop.value or 0
+                break
+            if len(content) - saved_length >= get_flush_chars() or time.monotonic() - saved_at >= get_flush_interval():
+                flush()
+    except Exception as e:
+        flush()
+        return {'summary': content, 'token_count': 0, 'error': f'{type(e).__name__}: {e}', 'resumed': bool(partial)}
+
+    content = content.strip()
+    flush(
+        is_complete=True,
+        token_count=summary.token_count + token_count,
+        word_count=len(content.split()),
+    )
+    return {'summary': content, 'token_count': token_count, 'error': None, 'resumed': bool(partial)}
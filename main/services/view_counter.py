@@ -0,0 +1,241 @@
+"""
+Tamponlu Görüntülenme Sayaçları
+Her sayfa görüntülemede UPDATE yapmak yerine artışlar önbellekte biriktirilir
+ve aralıklarla F() ifadeli toplu UPDATE'lerle veritabanına yazılır.
+
+Artışlar Django önbelleğinde (VIEW_COUNTER_CACHE) tutulur. Varsayılan
+'counters' takma adı ayıklama (cull) yapmayan süreç içi bir LocMemCache'tir;
+birden fazla süreçle çalışırken ve flush_view_counts komutunun diğer
+süreçlerin artışlarını görmesi için ortak bir önbellek (Redis, Memcached)
+kullanılmalıdır. Süreç içi önbellekte artışları her sürecin kendi zamanlayıcısı
+yazar.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, Set
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+FLUSH_LOCK_TIMEOUT = 60
+
+# flush_view_counts komutunun (artış yapmamış bir süreçte) boşalttığı sayaçlar
+DEFAULT_COUNTERS = [('main.Book', 'view_count')]
+
+
+def get_flush_interval() -> float:
+    return getattr(settings, 'VIEW_COUNTER_FLUSH_INTERVAL', 60)
+
+
+def get_counter_cache():
+    return caches[getattr(settings, 'VIEW_COUNTER_CACHE', 'counters')]
+
+
+def is_process_local() -> bool:
+    """Sayaç önbelleği yalnızca bu süreçte mi görülüyor (başka süreç boşaltamaz)"""
+    return isinstance(get_counter_cache(), (LocMemCache, DummyCache))
+
+
+class _FlushTimer(threading.Thread):
+    """Yeni artış gelmese de bekleyen artışları aralıklarla yazan iş parçacığı"""
+
+    def __init__(self, counter: 'BufferedCounter'):
+        super().__init__(daemon=True)
+        self.counter = counter
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(max(1, get_flush_interval())):
+                self.counter.flush_if_due()
+        finally:
+            connection.close()
+
+
+class BufferedCounter:
+    """
+    Bir model alanı için tamponlu sayaç
+
+    Artırılan kayıtların id'leri süreç içinde tutulur; bu süreçteki otomatik
+    boşaltma yalnızca onları yazar. flush(all_rows=True) tablodaki tüm
+    kayıtların bekleyen artışlarını yazar (diğer süreçlerinkiler dahil).
+    Aynı anda tek bir sürecin boşaltma yapması önbellekteki bir kilitle sağlanır.
+    """
+
+    def __init__(self, model, field: str):
+        self.model = model
+        self.field = field
+        self.prefix = f'counter:{model._meta.label_lower}:{field}'
+        self._dirty: Set[int] = set()
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._timer: Optional[_FlushTimer] = None
+        self.database = None  # Artışların ait olduğu veritabanı
+
+    @property
+    def cache(self):
+        return get_counter_cache()
+
+    def key(self, pk: int) -> str:
+        return f'{self.prefix}:{pk}'
+
+    def increment(self, pk: int, amount: int = 1) -> None:
+        """Artışı tampona ekler; süre dolduysa tamponu boşaltır"""
+        key = self.key(pk)
+        try:
+            self.cache.incr(key, amount)
+        except ValueError:
+            # Anahtar yok; aynı anda başka bir istek oluşturduysa incr ile devam et
+            if not self.cache.add(key, amount, timeout=None):
+                self.cache.incr(key, amount)
+
+        with self._lock:
+            self._dirty.add(pk)
+            self.database = connection.settings_dict['NAME']
+            due = time.monotonic() - self._last_flush >= get_flush_interval()
+            # fork sonrası alt süreçte iş parçacığı yoktur; yeniden başlatılır
+            if self._timer is None or not self._timer.is_alive():
+                self._timer = _FlushTimer(self)
+                self._timer.start()
+        if due:
+            self.flush()
+
+    def flush_if_due(self) -> None:
+        """Zamanlayıcıdan çağrılır; aralık dolduysa ve bekleyen artış varsa yazar"""
+        with self._lock:
+            due = bool(self._dirty) and time.monotonic() - self._last_flush >= get_flush_interval()
+            # Veritabanı değiştiyse (örn. test veritabanı silindi) yazılmaz
+            due = due and self.database == connection.settings_dict['NAME']
+        if due:
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning("Görüntülenme sayaçları yazılamadı: %s", e)
+
+    def pending(self, pk: int) -> int:
+        """Henüz veritabanına yazılmamış artış"""
+        return self.cache.get(self.key(pk)) or 0
+
+    def _acquire(self, wait: float) -> bool:
+        deadline = time.monotonic() + wait
+        while not self.cache.add(f'{self.prefix}:flush-lock', 1, timeout=FLUSH_LOCK_TIMEOUT):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def _release(self) -> None:
+        self.cache.delete(f'{self.prefix}:flush-lock')
+
+    def _take(self, pks: Iterable[int]) -> Dict[int, int]:
+        """Bekleyen artışları önbellekten düşer ve {pk: artış} döndürür"""
+        pks = list(pks)
+        values = self.cache.get_many([self.key(pk) for pk in pks])
+        taken = {}
+        for pk in pks:
+            value = values.get(self.key(pk)) or 0
+            if value > 0:
+                # Okuma ile düşme arasında gelen artışlar anahtarda kalır
+                self.cache.decr(self.key(pk), value)
+                taken[pk] = value
+        return taken
+
+    def _write(self, taken: Dict[int, int]) -> None:
+        """Aynı artışa sahip kayıtları tek UPDATE ile yazar"""
+        by_amount = defaultdict(list)
+        for pk, amount in taken.items():
+            by_amount[amount].append(pk)
+        with transaction.atomic():
+            for amount, pks in by_amount.items():
+                for start in range(0, len(pks), BATCH_SIZE):
+                    self.model.objects.filter(pk__in=pks[start:start + BATCH_SIZE]).update(
+                        **{self.field: F(self.field) + amount}
+                    )
+
+    def flush(self, all_rows: bool = False, wait: float = 0) -> Optional[int]:
+        """
+        Bekleyen artışları veritabanına yazar
+        Args:
+            all_rows: Yalnızca bu süreçte artırılanlar değil, tablodaki tüm kayıtlar
+            wait: Başka bir süreç boşaltıyorsa kilit için beklenecek süre (saniye)
+        Returns:
+            Optional[int]: Yazılan toplam artış; kilit alınamadıysa None
+        """
+        if not self._acquire(wait):
+            return None
+        try:
+            with self._lock:
+                dirty, self._dirty = self._dirty, set()
+                self._last_flush = time.monotonic()
+
+            taken = {}
+            try:
+                if all_rows:
+                    pks = list(self.model.objects.values_list('pk', flat=True).order_by('pk'))
+                    for start in range(0, len(pks), BATCH_SIZE):
+                        taken.update(self._take(pks[start:start + BATCH_SIZE]))
+                taken.update(self._take(dirty - set(taken)))
+                self._write(taken)
+            except Exception:
+                # Yazılamayan artışları tampona geri koy
+                for pk, amount in taken.items():
+                    self._restore(pk, amount)
+                raise
+            return sum(taken.values())
+        finally:
+            self._release()
+
+    def _restore(self, pk: int, amount: int) -> None:
+        key = self.key(pk)
+        if not self.cache.add(key, amount, timeout=None):
+            self.cache.incr(key, amount)
+        with self._lock:
+            self._dirty.add(pk)
+
+
+_counters: Dict[str, BufferedCounter] = {}
+_counters_lock = threading.Lock()
+
+
+def get_counter(model, field: str = 'view_count') -> BufferedCounter:
+    """Model alanının süreç genelinde paylaşılan sayacı"""
+    label = f'{model._meta.label_lower}.{field}'
+    with _counters_lock:
+        if label not in _counters:
+            _counters[label] = BufferedCounter(model, field)
+        return _counters[label]
+
+
+def flush_all(all_rows: bool = False, wait: float = 0) -> Dict[str, Optional[int]]:
+    """Tüm sayaçları boşaltır; {sayaç: yazılan artış}"""
+    for model_label, field in DEFAULT_COUNTERS:
+        get_counter(apps.get_model(model_label), field)
+    with _counters_lock:
+        counters = list(_counters.items())
+    return {label: counter.flush(all_rows=all_rows, wait=wait) for label, counter in counters}
+
+
+@atexit.register
+def _flush_on_exit():
+    # Süreç düzgün kapanırken süreç içi önbellekteki artışlar kaybolmasın.
+    # Veritabanı değiştiyse (örn. test veritabanı silindi) yazılmaz.
+    with _counters_lock:
+        counters = list(_counters.values())
+    for counter in counters:
+        if counter.database != connection.settings_dict['NAME']:
+            continue
+        try:
+            counter.flush(wait=5)
+        except Exception:
+            pass
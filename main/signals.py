@@ -0,0 +1,101 @@
+"""
+Model sinyalleri
+Kitap arama indeksini (main_book_fts) kitap, ortak yazar ve kullanıcı adı
+değişiklikleriyle, bölüm indeksini (main_chapter_fts) bölüm kayıtlarıyla
+eşzamanlı tutar. SiteSettings kaydedildiğinde ayar önbelleğini, içerik
+modelleri değiştiğinde bağlı oldukları sayfa önbelleği etiketlerini geçersiz kılar.
+
+Bölüm silme için sinyal yoktur: kitap işlenirken binlerce bölüm silinir ve
+chapter_ingest toplu sildiği bölümleri indeksten kendisi çıkarır. Tek tek silinen
+bölümlerin indeks kalıntıları aramada main_chapter ile JOIN edilerek elenir.
+"""
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from .models import Book, Chapter, SiteSettings
+from .services import page_cache, search, site_settings_cache
+
+
+def _touches(update_fields, fields) -> bool:
+    # update_fields verilmemişse tüm alanlar kaydedilmiştir
+    return update_fields is None or bool(fields & set(update_fields))
+
+
+@receiver(post_save, sender=Book, dispatch_uid='book_search_index_save')
+def index_book(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or not _touches(update_fields, search.BOOK_FIELDS):
+        return
+    search.index_books([instance])
+
+
+@receiver(post_delete, sender=Book, dispatch_uid='book_search_index_delete')
+def unindex_book(sender, instance, **kwargs):
+    search.remove_book(instance.pk)
+
+
+@receiver(post_save, sender=Chapter, dispatch_uid='chapter_search_index_save')
+def index_chapter(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw or not _touches(update_fields, search.CHAPTER_FIELDS):
+        return
+    search.index_chapters([instance])
+
+
+@receiver(m2m_changed, sender=Book.co_authors.through, dispatch_uid='book_search_index_co_authors')
+def index_co_authors(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            search.index_books([instance])
+        return
+    # Kullanıcı tarafından değiştirildi: instance kullanıcı, pk_set kitaplar.
+    # clear işleminde pk_set gelmediğinden kitaplar temizlemeden önce alınır.
+    if action == 'pre_clear':
+        instance._search_cleared_books = list(instance.co_authored_books.values_list('pk', flat=True))
+        return
+    if action == 'post_clear':
+        pk_set = instance.__dict__.pop('_search_cleared_books', [])
+    elif action not in ('post_add', 'post_remove'):
+        return
+    books = Book.objects.filter(pk__in=pk_set).select_related('author').prefetch_related('co_authors')
+    search.index_books(books)
+
+
+@receiver(post_save, sender=get_user_model(), dispatch_uid='book_search_index_author')
+def index_author_books(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    if created or raw or not _touches(update_fields, search.AUTHOR_FIELDS):
+        return
+    books = Book.objects.filter(Q(author=instance) | Q(co_authors=instance)).distinct()
+    search.index_books(books.select_related('author').prefetch_related('co_authors'))
+
+
+@receiver(post_save, sender=SiteSettings, dispatch_uid='site_settings_cache_save')
+@receiver(post_delete, sender=SiteSettings, dispatch_uid='site_settings_cache_delete')
+def invalidate_site_settings(sender, created=False, **kwargs):
+    # Kayıt ilk okumada get_or_create ile oluşur; o ana kadar önbellekte başka bir kopya olamaz
+    if created:
+        return
+    site_settings_cache.invalidate()
+    # Commit'ten önce eski kaydı okuyup yeni sürümle önbelleğe alan süreç olabilir
+    transaction.on_commit(site_settings_cache.invalidate)
+
+
+def invalidate_page_cache(sender, **kwargs):
+    tag = page_cache.MODEL_TAGS[sender._meta.label]
+    page_cache.invalidate_tags(tag)
+    # Commit'ten önce eski veriyle üretilip önbelleğe alınan sayfalar da bayatlasın
+    transaction.on_commit(lambda: page_cache.invalidate_tags(tag))
+
+
+for model_label in page_cache.MODEL_TAGS:
+    model = apps.get_model(model_label)
+    post_save.connect(invalidate_page_cache, sender=model, dispatch_uid=f'page_cache_save_{model_label}')
+    post_delete.connect(invalidate_page_cache, sender=model, dispatch_uid=f'page_cache_delete_{model_label}')
+
+
+@receiver(post_migrate, dispatch_uid='search_index_migrate')
+def reset_search_availability(sender, **kwargs):
+    # Migration'lar FTS tablolarını oluşturup siler; tablo var mı bilgisi yeniden okunsun
+    search.reset_availability()
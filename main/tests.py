@@ -1,3 +1,1559 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.files import File
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.http import HttpResponse, QueryDict
+from django.template import engines
+from django.template.loader import get_template
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from .models import Article, ArticleSeries, Book, BookCategory, BookSummary, Chapter, ProcessingJob, SiteSettings
+from .management.commands.benchmark_book_processing import build_sample_docx
+from .management.commands.benchmark_pdf_extraction import build_sample_pdf
+from .management.commands.benchmark_toc_detection import build_sample_text, legacy_extract_toc_patterns
+from . import views
+from .pagination import CursorPaginator
+from .services import ai_service, chapter_ingest, job_queue, keywords, page_cache, search, site_settings_cache
+from .services.chapter_ingest import ingest_chapters
+from .services.document_processor import (
+    ChapterExtractor, DocumentProcessor, TableOfContentsExtractor, iter_book_chapters, iter_book_file,
+)
+from .services.extraction_cache import ExtractionCache
+from .services.fake_provider import FakeProviderServer
+from .services.rate_limit import RateLimiter, RetryPolicy, call_with_retry_async, reset_rate_limiters
+from .services.response_cache import ResponseCache, make_cache_key
+from .services.summary_stream import stream_book_summary
+from .services.view_counter import BufferedCounter, get_counter
+
+try:
+    import openai  # noqa: F401
+    HAS_OPENAI = True
+except ImportError:
+    HAS_OPENAI = False
+
+try:
+    import docx  # noqa: F401
+    HAS_DOCX = True
+except ImportError:
+    HAS_DOCX = False
+
+try:
+    sqlite3.connect(':memory:').execute('CREATE VIRTUAL TABLE fts USING fts5(content)')
+    HAS_FTS5 = connection.vendor == 'sqlite'
+except sqlite3.OperationalError:
+    HAS_FTS5 = False
+
+
+class PdfExtractionTests(SimpleTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.file_path = f'{self.tmp_dir.name}/kitap.pdf'
+        build_sample_pdf(self.file_path, 40, lines_per_page=3)
+
+    def test_parallel_extraction_matches_serial(self):
+        serial = DocumentProcessor.extract_pages_from_pdf(self.file_path, workers=1)
+        self.assertEqual(len(serial), 40)
+        self.assertIn('Sayfa 40 satir 3', serial[-1])
+        self.assertEqual(DocumentProcessor.extract_pages_from_pdf(self.file_path, workers=2), serial)
+        self.assertEqual(
+            DocumentProcessor.extract_text_from_pdf(self.file_path, workers=2),
+            DocumentProcessor.extract_text_from_pdf(self.file_path, workers=1),
+        )
+
+    def test_pool_failure_falls_back_to_serial(self):
+        serial = DocumentProcessor.extract_pages_from_pdf(self.file_path, workers=1)
+        with mock.patch('main.services.document_processor.ProcessPoolExecutor', side_effect=OSError('izin yok')), \
+                self.assertLogs('main.services.document_processor', 'WARNING') as logs:
+            pages = DocumentProcessor.extract_pages_from_pdf(self.file_path, workers=2)
+        self.assertEqual(pages, serial)
+        self.assertIn('izin yok', logs.output[0])
+
+
+def build_docx(file_path, paragraphs):
+    """paragraphs: (metin, başlık seviyesi veya None) listesinden Word dosyası oluşturur"""
+    from docx import Document
+
+    document = Document()
+    for text, level in paragraphs:
+        if level is None:
+            document.add_paragraph(text)
+        else:
+            document.add_heading(text, level=level)
+    document.save(file_path)
+
+
+def chapter_fields(chapters):
+    # Toplu metin her sayfa/paragraf sonuna satır sonu ekler; son bölümün
+    # sonundaki bu satır sonu dışında iki yol aynı bölümleri üretmeli
+    return [
+        (chapter['order'], chapter['title'], chapter['level'], chapter['content'].rstrip('\n'))
+        for chapter in chapters
+    ]
+
+
+@skipUnless(HAS_DOCX, 'python-docx paketi yüklü değil')
+class StreamingChapterTests(SimpleTestCase):
+    pdf_pages = [
+        ['Kitap basligi', 'On soz satiri'],
+        ['CHAPTER 1: Baslangic', 'ilk bolum metni', 'devam'],
+        ['sayfa tasan metin', '2. Ikinci kisim', 'ikinci metin'],
+        ['CHAPTER 2: Son', 'son metin'],
+    ]
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def path(self, name):
+        return f'{self.tmp_dir.name}/{name}'
+
+    def test_pdf_lines_match_extracted_text(self):
+        build_sample_pdf(self.path('kitap.pdf'), 0, pages=self.pdf_pages)
+        text = DocumentProcessor.extract_text_from_pdf(self.path('kitap.pdf'))
+        records = list(DocumentProcessor().iter_lines(self.path('kitap.pdf'), 'pdf'))
+        self.assertEqual([line for _, _, line in records], text.split('\n')[:-1])
+        self.assertEqual([line_no for _, line_no, _ in records], list(range(len(records))))
+        self.assertEqual(records[2][0], 2)
+
+    def test_pdf_stream_matches_split_into_chapters(self):
+        build_sample_pdf(self.path('kitap.pdf'), 0, pages=self.pdf_pages)
+        text = DocumentProcessor.extract_text_from_pdf(self.path('kitap.pdf'))
+        expected = ChapterExtractor.split_into_chapters(text, TableOfContentsExtractor.extract_toc_patterns(text))
+
+        chapters = list(iter_book_chapters(self.path('kitap.pdf'), 'pdf'))
+        self.assertEqual(chapter_fields(chapters), chapter_fields(expected))
+        self.assertEqual([(c['page_start'], c['page_end']) for c in chapters], [(2, 3), (3, 3), (4, 4)])
+
+    def test_docx_stream_takes_headings_from_the_same_pass(self):
+        build_docx(self.path('kitap.docx'), [
+            ('Önsöz', None),
+            ('Birinci Bölüm', 1), ('metin\nikinci satır', None),
+            ('Alt Bölüm', 2), ('alt metin', None),
+            ('İkinci Bölüm', 1), ('son', None),
+        ])
+        text, toc = DocumentProcessor.parse_docx(self.path('kitap.docx'))
+        expected = ChapterExtractor.split_into_chapters(text, toc)
+
+        import docx
+        with mock.patch('docx.Document', wraps=docx.Document) as opened:
+            chapters = list(iter_book_chapters(self.path('kitap.docx'), 'docx'))
+        self.assertEqual(opened.call_count, 1)
+        self.assertEqual(chapter_fields(chapters), chapter_fields(expected))
+        self.assertEqual([c['level'] for c in chapters], [1, 2, 1])
+
+    def test_without_headings_whole_text_is_one_chapter(self):
+        build_docx(self.path('kitap.docx'), [('düz metin', None), ('ikinci paragraf', None)])
+        text, toc = DocumentProcessor.parse_docx(self.path('kitap.docx'))
+        chapters = list(iter_book_chapters(self.path('kitap.docx'), 'docx'))
+        self.assertEqual(chapter_fields(chapters), chapter_fields(ChapterExtractor.split_into_chapters(text, toc)))
+
+
+    def test_book_file_is_cached_chapter_by_chapter(self):
+        build_sample_pdf(self.path('kitap.pdf'), 0, pages=self.pdf_pages)
+        chapters = list(iter_book_chapters(self.path('kitap.pdf'), 'pdf'))
+
+        with override_settings(EXTRACTION_CACHE_DIR=self.path('cache')):
+            # Yarıda bırakılan akış kayıt bırakmaz
+            stream = iter_book_file(self.path('kitap.pdf'), 'pdf')
+            self.assertEqual(next(stream), chapters[0])
+            stream.close()
+            self.assertEqual(ExtractionCache().stats()['entries'], 0)
+
+            self.assertEqual(list(iter_book_file(self.path('kitap.pdf'), 'pdf')), chapters)
+            hits = ExtractionCache.hits
+            with mock.patch('main.services.document_processor.iter_book_chapters') as extract:
+                self.assertEqual(list(iter_book_file(self.path('kitap.pdf'), 'pdf')), chapters)
+            extract.assert_not_called()
+            self.assertEqual(ExtractionCache.hits, hits + 1)
+
+
+class ExtractionCacheTests(SimpleTestCase):
+    chapters = [
+        {'order': i, 'title': f'Bölüm {i}', 'line_number': i * 10, 'level': 1,
+         'page_start': i, 'page_end': i + 1, 'content': f'Bölüm {i}\nmetin\n' * 50}
+        for i in range(1, 4)
+    ]
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.cache = ExtractionCache(cache_dir=self.tmp_dir.name, max_bytes=10 ** 6)
+
+    def test_miss_then_hit(self):
+        hits, misses = ExtractionCache.hits, ExtractionCache.misses
+        self.assertIsNone(self.cache.get('ab' * 32))
+        self.cache.set('ab' * 32, self.chapters)
+        self.assertEqual(list(self.cache.get('ab' * 32)), self.chapters)
+        self.assertEqual((ExtractionCache.hits, ExtractionCache.misses), (hits + 1, misses + 1))
+
+    def test_chapters_are_read_one_chunk_at_a_time(self):
+        self.cache.set('ab' * 32, self.chapters * 20)
+        with mock.patch('main.services.extraction_cache.READ_CHUNK_SIZE', 256):
+            chapters = self.cache.get('ab' * 32)
+            self.assertEqual(next(chapters), self.chapters[0])
+            # Başlık ve ilk bölüm için dosyanın yalnızca başı açılır
+            self.assertLess(chapters.gi_frame.f_locals['file'].tell(), os.path.getsize(self.cache._path('ab' * 32)))
+            self.assertEqual(list(chapters), (self.chapters * 20)[1:])
+
+    def test_entries_of_other_format_versions_are_misses(self):
+        path = self.cache._path('ab' * 32)
+        os.makedirs(os.path.dirname(path))
+        with open(path, 'wb') as file:
+            file.write(zlib.compress(json.dumps({'version': 2, 'toc': [], 'chapters': self.chapters}).encode()))
+        self.assertIsNone(self.cache.get('ab' * 32))
+
+    def test_corrupt_entry_raises_and_is_removed(self):
+        self.cache.set('ab' * 32, self.chapters)
+        path = self.cache._path('ab' * 32)
+        with open(path, 'rb') as file:
+            data = file.read()
+        with open(path, 'wb') as file:
+            file.write(data[:len(data) // 2])
+
+        with self.assertRaises(OSError):
+            list(self.cache.get('ab' * 32))
+        self.assertFalse(os.path.exists(path))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        for digest in ('aa' * 32, 'bb' * 32):
+            self.cache.set(digest, self.chapters)
+        os.utime(self.cache._path('aa' * 32), (1, 1))
+        os.utime(self.cache._path('bb' * 32), (2, 2))
+        # Okunan kayıt en yeni olur; sınır aşılınca en uzun süredir kullanılmayan silinir
+        self.cache.get('aa' * 32).close()
+        self.cache.max_bytes = self.cache.stats()['size_bytes']
+        self.cache.set('cc' * 32, self.chapters)
+
+        self.assertIsNotNone(self.cache.get('aa' * 32))
+        self.assertIsNone(self.cache.get('bb' * 32))
+        self.assertIsNotNone(self.cache.get('cc' * 32))
+
+    def test_failed_write_leaves_previous_entry_and_no_temp_file(self):
+        self.cache.set('ab' * 32, self.chapters)
+        with mock.patch('main.services.extraction_cache.os.replace', side_effect=OSError('disk dolu')):
+            with self.assertRaises(OSError):
+                self.cache.set('ab' * 32, [])
+        self.assertEqual(list(self.cache.get('ab' * 32)), self.chapters)
+        directory = os.path.dirname(self.cache._path('ab' * 32))
+        self.assertEqual(os.listdir(directory), [os.path.basename(self.cache._path('ab' * 32))])
+
+
+@skipUnless(HAS_DOCX, 'python-docx paketi yüklü değil')
+class DocxParseTests(SimpleTestCase):
+
+    def test_heading_offsets_and_lines_point_at_titles(self):
+        import docx
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = f'{tmp_dir}/kitap.docx'
+            build_docx(file_path, [
+                ('Önsöz\niki satırlık paragraf', None),
+                ('Bölüm 1: Başlangıç', 1), ('Birinci bölümün metni.', None),
+                ('Kısım 1.1', 2), ('Alt bölüm\nsatır sonlu metin', None),
+                ('Bölüm 2: Son', 1),
+            ])
+            with mock.patch('docx.Document', wraps=docx.Document) as opened:
+                text, toc = DocumentProcessor.parse_docx(file_path)
+            self.assertEqual(opened.call_count, 1)
+            self.assertEqual(TableOfContentsExtractor.extract_toc_from_docx(file_path), toc)
+
+        lines = text.split('\n')
+        self.assertEqual([entry['title'] for entry in toc], ['Bölüm 1: Başlangıç', 'Kısım 1.1', 'Bölüm 2: Son'])
+        self.assertEqual([entry['level'] for entry in toc], [1, 2, 1])
+        for entry in toc:
+            self.assertEqual(entry['offset'], text.find(entry['title']))
+            self.assertEqual(lines[entry['line_number']], entry['title'])
+
+
+class HeadingPatternTests(SimpleTestCase):
+    sample = '\n'.join([
+        'BÖLÜM 1: Giriş', 'Bölüm IV. Dönüş', 'CHAPTER 12 The End', 'Chapter 3:Kısa',
+        '1. Başlık', '  12.   Girintili başlık  ', 'GIRIS VE TEMEL KAVRAMLAR', ' ANA BÖLÜMLER ŞÖYLE ',
+        # Başlık olmayanlar
+        'Bölüm', 'Bölüm 3', 'Bölüm 3:', '1.5 kilogram', '1.', 'KISA', 'Ab CDEFGHIJKLM',
+        'düz bir satır', '', '   ', 'bölüm 2: küçük harf', 'CHAPTERS 2 fazla harf',
+    ])
+
+    def test_combined_pattern_matches_legacy_pattern_loop(self):
+        for text in (self.sample, build_sample_text(3000)):
+            legacy = legacy_extract_toc_patterns(text)
+            current = TableOfContentsExtractor.extract_toc_patterns(text)
+            self.assertEqual(
+                [(entry['title'], entry['line_number']) for entry in current],
+                [(entry['title'], entry['line_number']) for entry in legacy],
+            )
+        self.assertEqual(len(legacy_extract_toc_patterns(self.sample)), 8)
+
+
+@override_settings(PROCESSING_JOB_LEASE_SECONDS=300, PROCESSING_JOB_RETRY_BACKOFF=10, PROCESSING_JOB_MAX_ATTEMPTS=3)
+class JobQueueTests(TestCase):
+
+    def setUp(self):
+        author = get_user_model().objects.create_user('yazar', 'yazar@example.com', 'parola')
+        self.book = Book.objects.create(title='Kitap', author=author, description='-')
+        self.job = job_queue.enqueue_book_processing(self.book, provider='local')
+
+    def expire_lease(self):
+        ProcessingJob.objects.filter(pk=self.job.pk).update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+
+    def test_only_one_worker_claims_a_job(self):
+        first = job_queue.claim_job('isci-1')
+        self.assertEqual(first.pk, self.job.pk)
+        self.assertEqual((first.status, first.attempts, first.locked_by), ('running', 1, 'isci-1'))
+        self.assertIsNone(job_queue.claim_job('isci-2'))
+        self.assertEqual(job_queue.enqueue_book_processing(self.book), first)
+
+    def test_expired_lease_moves_job_to_another_worker(self):
+        stale = job_queue.claim_job('isci-1')
+        self.expire_lease()
+
+        current = job_queue.claim_job('isci-2')
+        self.assertEqual((current.pk, current.attempts, current.locked_by), (self.job.pk, 2, 'isci-2'))
+        # Eski işçi kirayı uzatamaz ve ilerleme yazamaz
+        self.assertFalse(job_queue.heartbeat(stale, 'isci-1'))
+        with self.assertRaises(job_queue.LeaseLost):
+            job_queue.update_progress(stale, 'isci-1', 'chapters', 40)
+
+        self.expire_lease()
+        self.assertTrue(job_queue.heartbeat(current, 'isci-2'))
+        current.refresh_from_db()
+        self.assertGreater(current.lease_expires_at, timezone.now() + timedelta(seconds=290))
+        job_queue.update_progress(current, 'isci-2', 'chapters', 40)
+        self.assertEqual(ProcessingJob.objects.get(pk=self.job.pk).progress, 40)
+
+    def test_failures_are_retried_with_exponential_backoff(self):
+        for attempt, delay in ((1, 10), (2, 20)):
+            job = job_queue.claim_job('isci-1')
+            self.assertEqual(job.attempts, attempt)
+            started = timezone.now()
+            job_queue.fail_job(job, 'isci-1', 'geçici hata')
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.locked_by), ('queued', ''))
+            self.assertAlmostEqual((job.run_after - started).total_seconds(), delay, delta=1)
+            # Bekleme süresi dolmadan görev alınmaz
+            self.assertIsNone(job_queue.claim_job('isci-1'))
+            ProcessingJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+
+        job = job_queue.claim_job('isci-1')
+        job_queue.fail_job(job, 'isci-1', 'kalıcı hata')
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 3))
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.processing_error, 'kalıcı hata')
+
+    def test_expired_lease_without_attempts_left_fails(self):
+        job_queue.claim_job('isci-1')
+        ProcessingJob.objects.filter(pk=self.job.pk).update(attempts=3)
+        self.expire_lease()
+        self.assertIsNone(job_queue.claim_job('isci-2'))
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, 'failed')
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.processing_error, self.job.last_error)
+
+    def test_heartbeat_thread_stops_when_lease_is_lost(self):
+        job = job_queue.claim_job('isci-1')
+        with override_settings(PROCESSING_JOB_LEASE_SECONDS=1), \
+                mock.patch.object(job_queue, 'heartbeat', return_value=False) as beat:
+            thread = job_queue._Heartbeat(job, 'isci-1')
+            thread.start()
+            thread.join(timeout=5)
+        self.assertFalse(thread.is_alive())
+        self.assertTrue(thread.lost)
+        beat.assert_called_once_with(job, 'isci-1')
+
+    @skipUnless(HAS_DOCX, 'python-docx paketi yüklü değil')
+    def test_worker_streams_book_into_chapters(self):
+        with tempfile.TemporaryDirectory() as tmp_dir, override_settings(
+            MEDIA_ROOT=tmp_dir,
+            EXTRACTION_CACHE_DIR=f'{tmp_dir}/cache',
+            KEYWORD_INDEX_PATH=f'{tmp_dir}/keywords.json.z',
+        ):
+            build_sample_docx(f'{tmp_dir}/ornek.docx', 3)
+            with open(f'{tmp_dir}/ornek.docx', 'rb') as sample:
+                self.book.file.save('kitap.docx', File(sample))
+
+            job_queue.run_job(job_queue.claim_job('isci-1'), 'isci-1')
+
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.status, self.job.progress), ('done', 100))
+        self.book.refresh_from_db()
+        self.assertTrue(self.book.has_toc and self.book.is_processed)
+        self.assertEqual(
+            list(self.book.chapters.values_list('title', flat=True)),
+            ['Bölüm 1: Örnek Başlık', 'Bölüm 2: Örnek Başlık', 'Bölüm 3: Örnek Başlık'],
+        )
+
+
+class ChapterIngestTests(TestCase):
+
+    def setUp(self):
+        author = get_user_model().objects.create_user('yazar', 'yazar@example.com', 'parola')
+        self.book = Book.objects.create(title='Kitap', author=author, description='-')
+
+    def chapters(self, count, levels=(1, 2, 2, 3)):
+        return [
+            {'order': i, 'title': f'Bölüm {i}', 'level': levels[i % len(levels)], 'content': f'Bölüm {i} metni'}
+            for i in range(count)
+        ]
+
+    def ingest_queries(self, book, chapters):
+        with CaptureQueriesContext(connection) as context:
+            ingest_chapters(book, chapters)
+        return len(context.captured_queries)
+
+    def test_query_count_does_not_grow_with_chapters(self):
+        # 80 bölüm SQLite'ın tek INSERT'e sığan satır sınırının (999 parametre) altında kalır
+        other = Book.objects.create(title='Diğer', author=self.book.author, description='-')
+        first = self.ingest_queries(self.book, self.chapters(8))
+        self.assertEqual(self.ingest_queries(other, self.chapters(80)), first)
+
+        # Yeniden işlemede eski bölümler tek DELETE ile silinir
+        replace = self.ingest_queries(self.book, self.chapters(9))
+        self.assertEqual(self.ingest_queries(other, self.chapters(81)), replace)
+        self.assertEqual(other.chapters.count(), 81)
+
+    def test_nested_levels_get_parent_links(self):
+        ingest_chapters(self.book, [
+            {'order': 1, 'title': 'Kısım 1', 'level': 1, 'content': '-'},
+            {'order': 2, 'title': 'Bölüm 1.1', 'level': 2, 'content': '-'},
+            {'order': 3, 'title': 'Alt 1.1.1', 'level': 3, 'content': '-'},
+            {'order': 4, 'title': 'Bölüm 1.2', 'level': 2, 'content': '-'},
+            {'order': 5, 'title': 'Kısım 2', 'level': 1, 'content': '-'},
+            {'order': 6, 'title': 'Alt 2.0.1', 'level': 3, 'content': '-'},
+        ])
+        parents = dict(self.book.chapters.values_list('title', 'parent__title'))
+        self.assertEqual(parents, {
+            'Kısım 1': None, 'Bölüm 1.1': 'Kısım 1', 'Alt 1.1.1': 'Bölüm 1.1',
+            'Bölüm 1.2': 'Kısım 1', 'Kısım 2': None, 'Alt 2.0.1': 'Kısım 2',
+        })
+
+    def chapter_ids(self):
+        return list(self.book.chapters.order_by('order').values_list('pk', flat=True))
+
+    def test_chapters_are_saved_while_the_stream_is_read(self):
+        saved_before = []
+
+        def stream():
+            for chapter in self.chapters(10):
+                saved_before.append(Chapter.objects.filter(book=self.book).count())
+                yield chapter
+
+        with mock.patch.object(chapter_ingest, 'BATCH_SIZE', 3):
+            self.assertEqual(ingest_chapters(self.book, stream()), 10)
+
+        # Her grup bir sonraki grup okunmadan kaydedilir
+        self.assertEqual(saved_before, [0, 0, 0, 3, 3, 3, 6, 6, 6, 9])
+        parents = dict(self.book.chapters.values_list('order', 'parent__order'))
+        self.assertEqual(parents, {0: None, 1: 0, 2: 0, 3: 2, 4: None, 5: 4, 6: 4, 7: 6, 8: None, 9: 8})
+
+    def test_changed_tail_keeps_unchanged_leading_batches(self):
+        chapters = self.chapters(9)
+        with mock.patch.object(chapter_ingest, 'BATCH_SIZE', 3):
+            ingest_chapters(self.book, chapters)
+            before = self.chapter_ids()
+            chapters[7] = dict(chapters[7], content='Değişen metin')
+            self.assertEqual(ingest_chapters(self.book, chapters[:8]), 8)
+
+        after = self.chapter_ids()
+        self.assertEqual(after[:6], before[:6])
+        self.assertFalse(set(after[6:]) & set(before))
+        self.assertEqual(self.book.chapters.get(order=7).content, 'Değişen metin')
+
+    def test_repeated_orders_are_moved_after_the_largest(self):
+        ingest_chapters(self.book, [
+            {'order': 1, 'title': 'A', 'content': '-'},
+            {'order': 1, 'title': 'B', 'content': '-'},
+            {'order': 2, 'title': 'C', 'content': '-'},
+        ])
+        self.assertEqual(list(self.book.chapters.values_list('title', 'order')), [('A', 1), ('B', 2), ('C', 3)])
+
+    def test_unchanged_chapters_are_kept(self):
+        chapters = self.chapters(5)
+        ingest_chapters(self.book, chapters)
+        created = self.chapter_ids()
+        BookSummary.objects.create(book=self.book, chapter_id=created[0], summary_type='chapter', content='Özet')
+
+        with CaptureQueriesContext(connection) as context:
+            ingest_chapters(self.book, chapters)
+        self.assertEqual(self.chapter_ids(), created)
+        self.assertFalse(any(
+            query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE')) for query in context.captured_queries
+        ))
+        self.assertTrue(BookSummary.objects.filter(chapter_id=created[0]).exists())
+
+    @skipUnless(HAS_FTS5, 'SQLite FTS5 desteği yok')
+    def test_search_index_follows_reingest(self):
+        ingest_chapters(self.book, [{'order': 1, 'title': 'Liman', 'content': '<p>Gemi limana yanaştı.</p>'}])
+        self.assertEqual(len(search.search_chapters(self.book.pk, 'gemi')), 1)
+
+        ingest_chapters(self.book, [{'order': 1, 'title': 'Fener', 'content': '<p>Fener yandı.</p>'}])
+        self.assertEqual(search.search_chapters(self.book.pk, 'gemi'), [])
+        self.assertEqual(search.search_chapter_ids('fener'), self.chapter_ids())
+
+
+class StubProviderMixin:
+    """Her test için yerel sahte sağlayıcı sunucusu başlatır"""
+    latency = 0.0
+
+    def setUp(self):
+        super().setUp()
+        self.server = FakeProviderServer(latency=self.latency).start()
+        self.base_url = self.server.base_url
+        ai_service.reset_provider_clients()
+        reset_rate_limiters()
+        self.cache_setting = override_settings(AI_RESPONSE_CACHE_ENABLED=False)
+        self.cache_setting.enable()
+
+    def tearDown(self):
+        self.cache_setting.disable()
+        ai_service.reset_provider_clients()
+        self.server.stop()
+        super().tearDown()
+
+
+@skipUnless(HAS_OPENAI, 'openai paketi yüklü değil')
+class PooledProviderClientTests(StubProviderMixin, SimpleTestCase):
+
+    def test_client_is_shared_and_connection_reused(self):
+        with override_settings(OPENAI_BASE_URL=self.base_url, OPENAI_API_KEY='test'):
+            service = ai_service.AIService('openai')
+            first = service.generate_summary('metin', 'short')
+            second = service.generate_summary('metin', 'medium')
+            keywords = service.extract_keywords('metin')
+
+            self.assertIsNone(first['error'])
+            self.assertEqual(second['summary'], 'Sahte özet')
+            self.assertEqual(keywords, ['Sahte özet'])
+            self.assertIs(
+                ai_service.get_provider_client('openai', 'test'),
+                ai_service.get_provider_client('openai', 'test'),
+            )
+
+        # Üç istek de aynı TCP bağlantısından gelmeli
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(len({address for address, _ in self.server.requests}), 1)
+
+    def test_client_created_once_across_threads(self):
+        with override_settings(OPENAI_BASE_URL=self.base_url, OPENAI_API_KEY='test'):
+            clients = []
+            threads = [
+                threading.Thread(target=lambda: clients.append(ai_service.get_provider_client('openai', 'test')))
+                for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len({id(client) for client in clients}), 1)
+
+
+class ConcurrentChapterSummaryTests(SimpleTestCase):
+
+    def test_order_preserved_and_errors_collected(self):
+        def fake_summary(service, title, content):
+            if title == 'Bölüm 3':
+                raise RuntimeError('bağlantı koptu')
+            return {'summary': f'{title} özeti', 'error': None}
+
+        chapters = [{'order': i, 'title': f'Bölüm {i}', 'content': 'metin'} for i in range(1, 9)]
+        with mock.patch.object(ai_service.AIService, 'generate_chapter_summary', fake_summary):
+            results = ai_service.generate_all_chapter_summaries(chapters, concurrency=4)
+
+        self.assertEqual([r['chapter_order'] for r in results], list(range(1, 9)))
+        self.assertEqual(results[0]['summary'], 'Bölüm 1 özeti')
+        self.assertIn('bağlantı koptu', results[2]['error'])
+        self.assertEqual(sum(1 for r in results if r['error']), 1)
+
+
+@skipUnless(HAS_OPENAI, 'openai paketi yüklü değil')
+class MapReduceSummaryTests(StubProviderMixin, SimpleTestCase):
+    limit = ai_service.PROMPT_CHAR_LIMITS['openai']
+
+    def setUp(self):
+        super().setUp()
+        self.settings_override = override_settings(
+            OPENAI_BASE_URL=self.base_url, OPENAI_API_KEY='test', AI_MAX_RETRIES=0,
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def reply_with(self, func):
+        self.server.httpd.reply = func
+
+    def sent_parts(self):
+        """Bölümü bölen isteklerde sağlayıcıya ulaşan içerikler, parça sırasıyla"""
+        parts = []
+        for _, body in self.server.requests:
+            match = re.search(r'\((\d+)/\d+\)\n\nİçerik:\n(.*)\n$', body['messages'][-1]['content'], re.S)
+            if match:
+                parts.append((int(match.group(1)), match.group(2)))
+        return [content for _, content in sorted(parts)]
+
+    def test_chapter_summaries_keep_order_when_replies_arrive_out_of_order(self):
+        def reply(prompt):
+            number = int(re.search(r'Bölüm Başlığı: Bölüm (\d+)', prompt).group(1))
+            time.sleep(0.02 * (8 - number))  # İlk bölümler en son yanıtlanır
+            return f'Bölüm {number} özeti'
+        self.reply_with(reply)
+
+        chapters = [{'order': i, 'title': f'Bölüm {i}', 'content': 'metin'} for i in range(1, 9)]
+        results = ai_service.generate_all_chapter_summaries(chapters, concurrency=4)
+
+        self.assertEqual([r['chapter_order'] for r in results], list(range(1, 9)))
+        self.assertEqual([r['summary'] for r in results], [f'Bölüm {i} özeti' for i in range(1, 9)])
+
+    def test_long_chapter_reaches_provider_without_truncation(self):
+        content = ' '.join(f'kelime{i}' for i in range(5000))
+        self.assertGreater(len(content), 3 * self.limit)
+
+        text, usage = ai_service.condense_chapters(
+            [{'order': 1, 'title': 'Uzun Bölüm ' + 'x' * 170, 'content': content}], 'openai', concurrency=2,
+        )
+
+        self.assertEqual(usage['errors'], [])
+        self.assertEqual(''.join(self.sent_parts()), content)
+        self.assertTrue(all(
+            len(body['messages'][-1]['content']) <= self.limit + 100 for _, body in self.server.requests
+        ))
+        self.assertTrue(text)
+
+    def test_ready_summaries_that_fit_are_not_resent(self):
+        chapters = [{'order': i, 'title': f'Bölüm {i}', 'content': 'x' * self.limit, 'summary': f'Özet {i}'}
+                    for i in range(1, 4)]
+        text, usage = ai_service.condense_chapters(chapters, 'openai')
+        self.assertEqual(text, 'Özet 1\n\nÖzet 2\n\nÖzet 3')
+        self.assertEqual((usage['token_count'], self.server.requests), (0, []))
+
+    def test_partials_are_reduced_until_they_fit(self):
+        self.reply_with(lambda prompt: 'ara özet ' * 300)
+        chapters = [{'order': i, 'title': f'Bölüm {i}', 'content': 'metin ' * 1200} for i in range(1, 13)]
+
+        text, usage = ai_service.condense_chapters(chapters, 'openai', concurrency=3)
+
+        map_requests = len(list(ai_service._chunk_chapters(chapters, self.limit - ai_service.CHAPTER_PROMPT_OVERHEAD)))
+        self.assertGreater(len(self.server.requests), map_requests)
+        self.assertLessEqual(len(text), self.limit)
+        self.assertGreater(usage['token_count'], 0)
+
+    def test_windows_bound_chunks_in_flight_and_collect_errors(self):
+        self.server.httpd.statuses = [200, 200, 500]
+        pulled = []
+
+        def chunks():
+            for i in range(1, 11):
+                pulled.append(len(self.server.requests))
+                yield {'order': i, 'title': f'Parça {i}', 'content': f'içerik {i}'}
+
+        usage = {'token_count': 0, 'errors': []}
+        summaries = ai_service._summarize_in_windows(chunks(), 'openai', 2, usage)
+
+        self.assertEqual(len(summaries), 9)
+        self.assertEqual(len(usage['errors']), 1)
+        # Her pencere (2 x 2 parça) özetlenmeden sonraki pencere okunmaz
+        self.assertEqual(pulled, [0, 0, 0, 0, 4, 4, 4, 4, 8, 8])
+
+
+@skipUnless(HAS_OPENAI, 'openai paketi yüklü değil')
+class BookSummaryModeTests(StubProviderMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.settings_override = override_settings(
+            OPENAI_BASE_URL=self.base_url, OPENAI_API_KEY='test', AI_MAX_RETRIES=0,
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def reply_with(self, json_reply):
+        def reply(prompt):
+            return json_reply if 'JSON nesnesi' in prompt else f'özet {len(self.server.requests)}'
+        self.server.httpd.reply = reply
+
+    def test_combined_sends_one_request(self):
+        self.reply_with(json.dumps({'short': 'kısa', 'medium': 'orta', 'detailed': 'uzun'}))
+        summaries = ai_service.generate_book_summary('Kitap metni.', 'openai', mode='combined')
+
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual({key: value['summary'] for key, value in summaries.items()},
+                         {'short': 'kısa', 'medium': 'orta', 'detailed': 'uzun'})
+        # İsteğin maliyeti bir kez, ilk özete yazılır
+        self.assertGreater(summaries['short']['token_count'], 0)
+        self.assertEqual(summaries['medium']['token_count'], 0)
+
+    def test_separate_sends_the_book_three_times(self):
+        self.reply_with('{}')
+        ai_service.generate_book_summary('Kitap metni.', 'openai', mode='separate')
+
+        prompts = [body['messages'][-1]['content'] for _, body in self.server.requests]
+        self.assertEqual(len(prompts), 3)
+        self.assertTrue(all('Kitap metni.' in prompt for prompt in prompts))
+
+    def test_bad_json_falls_back_to_derived(self):
+        self.reply_with('bu bir JSON değil')
+        summaries = ai_service.generate_book_summary('Kitap metni.', 'openai', mode='combined')
+
+        prompts = [body['messages'][-1]['content'] for _, body in self.server.requests]
+        # JSON isteği + detaylı özet + detaylı özetten türetilen kısa ve orta özet
+        self.assertEqual(len(prompts), 4)
+        self.assertEqual(sum('Kitap metni.' in prompt for prompt in prompts), 2)
+        self.assertEqual(summaries['detailed']['summary'], 'özet 2')
+        self.assertIn('özet 2', prompts[2])
+        self.assertTrue(all(not value['error'] for value in summaries.values()))
+
+    def test_summary_rows_are_saved_together(self):
+        author = get_user_model().objects.create_user('yazar', 'yazar@example.com', 'parola')
+        book = Book.objects.create(title='Kitap', author=author, description='-')
+        BookSummary.objects.create(book=book, summary_type='short', content='eski')
+        summaries = {summary_type: {'summary': f'yeni {summary_type}', 'token_count': 1, 'error': None}
+                     for summary_type in ai_service.SUMMARY_TYPES}
+
+        original = BookSummary.objects.update_or_create
+        calls = []
+
+        def failing_update_or_create(**kwargs):
+            calls.append(kwargs['summary_type'])
+            if len(calls) == 3:
+                raise RuntimeError('yazma hatası')
+            return original(**kwargs)
+
+        with mock.patch.object(BookSummary.objects, 'update_or_create', side_effect=failing_update_or_create):
+            with self.assertRaises(RuntimeError):
+                job_queue.save_book_summaries(book, summaries, 'openai')
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(list(book.summaries.values_list('summary_type', 'content')), [('short', 'eski')])
+
+        job_queue.save_book_summaries(book, summaries, 'openai')
+        self.assertEqual(dict(book.summaries.values_list('summary_type', 'content')),
+                         {summary_type: f'yeni {summary_type}' for summary_type in ai_service.SUMMARY_TYPES})
+
+
+class ResponseCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = f'{self.tmp_dir.name}/responses.sqlite3'
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_key_depends_on_every_input(self):
+        base = ('openai', 'gpt-4o-mini', 1, 'short', 'metin')
+        key = make_cache_key(*base)
+        self.assertEqual(key, make_cache_key(*base))
+        for index, value in enumerate(['gemini', 'gpt-4o', 2, 'medium', 'metin2']):
+            changed = list(base)
+            changed[index] = value
+            self.assertNotEqual(key, make_cache_key(*changed))
+
+    def test_ttl_and_lru_eviction(self):
+        cache = ResponseCache(self.path, ttl=60, max_bytes=200)
+        with mock.patch('main.services.response_cache.time.time', return_value=1000.0):
+            cache.set('a', {'summary': 'x' * 60})
+        with mock.patch('main.services.response_cache.time.time', return_value=1010.0):
+            cache.set('b', {'summary': 'y' * 60})
+        with mock.patch('main.services.response_cache.time.time', return_value=1020.0):
+            self.assertIsNotNone(cache.get('a'))  # a artık b'den yeni kullanıldı
+            cache.set('c', {'summary': 'z' * 60})
+            self.assertIsNone(cache.get('b'))
+            self.assertIsNotNone(cache.get('c'))
+        with mock.patch('main.services.response_cache.time.time', return_value=1065.0):
+            self.assertIsNone(cache.get('a'))  # süresi doldu
+            self.assertIsNotNone(cache.get('c'))
+
+
+@skipUnless(HAS_OPENAI, 'openai paketi yüklü değil')
+class CachedSummaryTests(StubProviderMixin, SimpleTestCase):
+
+    def test_repeated_summary_served_from_cache(self):
+        with tempfile.TemporaryDirectory() as tmp_dir, override_settings(
+            OPENAI_BASE_URL=self.base_url, OPENAI_API_KEY='test',
+            AI_RESPONSE_CACHE_ENABLED=True, AI_RESPONSE_CACHE_PATH=f'{tmp_dir}/responses.sqlite3',
+        ):
+            service = ai_service.AIService('openai')
+            first = service.generate_summary('aynı bölüm', 'short')
+            second = service.generate_summary('aynı bölüm', 'short')
+            other = service.generate_summary('aynı bölüm', 'medium')
+
+        self.assertEqual(second['summary'], first['summary'])
+        self.assertTrue(second['cached'])
+        self.assertEqual(second['token_count'], 0)
+        self.assertNotIn('cached', other)
+        self.assertEqual(len(self.server.requests), 2)
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f'HTTP {status_code}')
+        self.status_code = status_code
+
+
+class RateLimiterTests(SimpleTestCase):
+
+    def test_requests_per_minute(self):
+        limiter = RateLimiter(requests_per_minute=2)
+        self.assertEqual(limiter.reserve(), 0)
+        self.assertEqual(limiter.reserve(), 0)
+        self.assertAlmostEqual(limiter.reserve(), 30, delta=0.5)
+
+    def test_tokens_per_minute(self):
+        limiter = RateLimiter(tokens_per_minute=600)
+        self.assertEqual(limiter.reserve(500), 0)
+        self.assertAlmostEqual(limiter.reserve(200), 10, delta=0.5)
+
+    def test_async_retry_honours_schedule(self):
+        schedule = [ProviderError(429), ProviderError(503), None]
+        calls = []
+
+        async def request():
+            calls.append(time.monotonic())
+            error = schedule.pop(0)
+            if error:
+                raise error
+            return 'tamam'
+
+        policy = RetryPolicy(max_retries=3, base_delay=0.01, max_delay=0.02)
+        result = asyncio.run(call_with_retry_async(request, limiter=RateLimiter(), policy=policy))
+        self.assertEqual(result, 'tamam')
+        self.assertEqual(len(calls), 3)
+
+    def test_non_retryable_error_raised_immediately(self):
+        async def request():
+            raise ProviderError(400)
+
+        with self.assertRaises(ProviderError):
+            asyncio.run(call_with_retry_async(request, policy=RetryPolicy(max_retries=3, base_delay=0.01)))
+
+
+@skipUnless(HAS_OPENAI, 'openai paketi yüklü değil')
+@override_settings(OPENAI_API_KEY='test', AI_RESPONSE_CACHE_ENABLED=False,
+                   AI_RETRY_BASE_DELAY=0.01, AI_RETRY_MAX_DELAY=0.05)
+class ProviderRetryTests(SimpleTestCase):
+
+    def setUp(self):
+        ai_service.reset_provider_clients()
+        reset_rate_limiters()
+
+    def tearDown(self):
+        ai_service.reset_provider_clients()
+        reset_rate_limiters()
+
+    def summarize(self, server, **overrides):
+        with override_settings(OPENAI_BASE_URL=server.base_url, **overrides):
+            return ai_service.AIService('openai').generate_summary('metin', 'short')
+
+    def test_429_retried_after_retry_after(self):
+        with FakeProviderServer(statuses=[429, 429], retry_after=0.2) as server:
+            started = time.monotonic()
+            result = self.summarize(server)
+            elapsed = time.monotonic() - started
+
+        self.assertIsNone(result['error'])
+        self.assertEqual(len(server.requests), 3)
+        self.assertGreaterEqual(elapsed, 0.4)
+
+    def test_gives_up_after_max_retries(self):
+        with FakeProviderServer(statuses=[500, 500, 500]) as server:
+            result = self.summarize(server, AI_MAX_RETRIES=2)
+
+        self.assertIn('OpenAI hatası', result['error'])
+        self.assertEqual(len(server.requests), 3)
+
+    def test_client_error_not_retried(self):
+        with FakeProviderServer(statuses=[400]) as server:
+            result = self.summarize(server)
+
+        self.assertIn('OpenAI hatası', result['error'])
+        self.assertEqual(len(server.requests), 1)
+
+
+@override_settings(AI_RESPONSE_CACHE_ENABLED=False)
+class LocalProviderTests(SimpleTestCase):
+    text = (
+        'Ahmet sabah erkenden köye gitti. Köy meydanında eski dostlarıyla karşılaştı. '
+        'Hava çok güzeldi. Dostları Ahmet için köy meydanında bir şenlik hazırlamıştı. '
+        'Akşam olunca herkes evine döndü.'
+    )
+
+    def test_extractive_summary_is_deterministic(self):
+        service = ai_service.AIService('local')
+        first = service.generate_summary(self.text, 'short')
+        self.assertIsNone(first['error'])
+        self.assertEqual(first, service.generate_summary(self.text, 'short'))
+        self.assertIn('Köy meydanında eski dostlarıyla karşılaştı.', first['summary'])
+        self.assertNotIn('Hava çok güzeldi.', first['summary'])
+
+        levels = service.generate_multi_level_summary(self.text)['summaries']
+        self.assertEqual(levels['short'], first['summary'])
+        self.assertGreater(len(levels['detailed']), len(levels['short']))
+        self.assertIn('köy', service.extract_keywords(self.text, 3))
+
+    @override_settings(OPENAI_API_KEY='', AI_FALLBACK_PROVIDER='local')
+    def test_falls_back_to_local_provider(self):
+        result = ai_service.AIService('openai').generate_summary(self.text, 'short')
+        self.assertIsNone(result['error'])
+        self.assertEqual(result['provider'], 'local')
+        self.assertEqual(ai_service.PROVIDER_LABELS['local'], 'Yerel')
+
+
+class KeywordIndexTests(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(KEYWORD_INDEX_PATH=f'{self.tmp_dir.name}/keywords.json.z')
+        self.settings_override.enable()
+        author = get_user_model().objects.create_user('yazar', 'yazar@example.com', 'parola')
+        self.books = []
+        for title, word in [('Deniz', 'gemi'), ('Dağ', 'zirve'), ('Orman', 'ağaç')]:
+            book = Book.objects.create(title=title, author=author, description='-')
+            Chapter.objects.create(
+                book=book, title='Bölüm 1', slug='bolum-1', order=1,
+                content=f'Yolculuk uzun sürdü. {word} {word} {word} göründü. Yolculuk bitti.',
+            )
+            self.books.append(book)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.tmp_dir.cleanup()
+
+    def test_fills_empty_tags_with_distinctive_terms(self):
+        Book.objects.filter(pk=self.books[2].pk).update(tags='elle girilmiş')
+
+        self.assertEqual(keywords.fill_book_tags(count=2), 2)
+
+        self.assertEqual(Book.objects.get(pk=self.books[0].pk).tags, 'gemi, yolculuk')
+        self.assertEqual(Book.objects.get(pk=self.books[1].pk).tags, 'zirve, yolculuk')
+        self.assertEqual(Book.objects.get(pk=self.books[2].pk).tags, 'elle girilmiş')
+
+    def test_books_are_read_in_bounded_batches(self):
+        with mock.patch.object(keywords, 'BATCH_SIZE', 2), CaptureQueriesContext(connection) as context:
+            self.assertEqual(keywords.fill_book_tags(count=2), 3)
+            self.assertEqual(keywords.fill_book_tags([book.pk for book in self.books], count=2, overwrite=True), 0)
+
+        self.assertEqual(Book.objects.get(pk=self.books[2].pk).tags, 'ağaç, yolculuk')
+        in_lists = re.findall(r' IN \(([^)]*)\)', ' '.join(query['sql'] for query in context.captured_queries))
+        self.assertTrue(in_lists)
+        self.assertLessEqual(max(len(values.split(',')) for values in in_lists), 2)
+
+    def test_index_rebuilt_incrementally(self):
+        keywords.fill_book_tags()
+        index = keywords.KeywordIndex.load()
+        self.assertEqual(len(index), 3)
+        self.assertEqual(keywords.refresh_index(index), [])
+
+        book = self.books[0]
+        book.chapters.all().delete()
+        Chapter.objects.create(book=book, title='Yeni', slug='yeni', order=1, content='fener fener ışık')
+        self.books[1].delete()
+
+        self.assertEqual(keywords.refresh_index(index), [book.pk])
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index.keywords(book.pk, 1), ['fener'])
+        self.assertNotIn('zirve', index.df)
+
+    def test_edited_chapter_is_recounted(self):
+        index = keywords.KeywordIndex()
+        keywords.refresh_index(index)
+
+        # Panelden düzenleme: bölüm sayısı ve id'si değişmez
+        chapter = self.books[0].chapters.get()
+        chapter.content = 'pusula pusula pusula'
+        chapter.save()
+
+        self.assertEqual(keywords.refresh_index(index), [self.books[0].pk])
+        self.assertEqual(index.keywords(self.books[0].pk, 1), ['pusula'])
+
+    def test_html_markup_is_not_counted(self):
+        Chapter.objects.filter(book=self.books[0]).update(
+            content='<p class="giris"><strong>fener</strong>&nbsp;fener</p><script>var kod;</script>'
+        )
+        index = keywords.KeywordIndex()
+        keywords.refresh_index(index)
+
+        self.assertEqual(index.documents[self.books[0].pk]['terms'], {'fener': 2})
+
+    def test_worker_fills_tags_once_per_drained_queue(self):
+        for book in self.books:
+            job_queue.enqueue_book_processing(book, provider='local')
+
+        with mock.patch.object(job_queue, 'process_book', return_value=''), \
+                mock.patch.object(job_queue, 'fill_book_tags') as fill:
+            processed = job_queue.work('isci-1', threading.Event(), once=True)
+
+        self.assertEqual(processed, 3)
+        fill.assert_called_once_with([book.pk for book in self.books])
+
+
+@skipUnless(HAS_OPENAI, 'openai paketi yüklü değil')
+@override_settings(OPENAI_API_KEY='test', AI_RESPONSE_CACHE_ENABLED=False, AI_MAX_RETRIES=0)
+class StreamingSummaryTests(TestCase):
+    reply = 'Birinci cümle burada. İkinci cümle de burada. Üçüncü cümle sonuncu.'
+
+    def setUp(self):
+        ai_service.reset_provider_clients()
+        reset_rate_limiters()
+        author = get_user_model().objects.create_user('yazar', 'yazar@example.com', 'parola')
+        self.book = Book.objects.create(title='Akış', author=author, description='-', status='published')
+
+    def tearDown(self):
+        ai_service.reset_provider_clients()
+
+    def test_partial_output_saved_and_resumed(self):
+        with FakeProviderServer(reply=self.reply, stream_cuts=[3]) as server, \
+                override_settings(OPENAI_BASE_URL=server.base_url):
+            failed = stream_book_summary(self.book, 'short', 'kitap metni', 'openai', restart=True)
+            partial = BookSummary.objects.get(book=self.book, summary_type='short')
+
+            self.assertTrue(failed['error'])
+            self.assertEqual(partial.content, 'Birinci cümle burada. ')
+            self.assertFalse(partial.is_complete)
+
+            resumed = stream_book_summary(self.book, 'short', 'kitap metni', 'openai')
+
+        self.assertIsNone(resumed['error'])
+        self.assertTrue(resumed['resumed'])
+        summary = BookSummary.objects.get(book=self.book, summary_type='short')
+        self.assertTrue(summary.is_complete)
+        self.assertTrue(summary.content.startswith('Birinci cümle burada. ' + self.reply[:10]))
+        self.assertGreater(summary.token_count, 0)
+        continuation = server.requests[1][1]['messages'][-1]['content']
+        self.assertIn('Yazılmış kısım:\nBirinci cümle burada.', continuation)
+
+    def test_completed_summary_not_regenerated_without_restart(self):
+        with FakeProviderServer(reply=self.reply) as server, override_settings(OPENAI_BASE_URL=server.base_url):
+            stream_book_summary(self.book, 'short', 'kitap metni', 'openai')
+            result = stream_book_summary(self.book, 'short', 'kitap metni', 'openai')
+
+        self.assertEqual(result['summary'], self.reply)
+        self.assertEqual(len(server.requests), 1)
+
+    def test_status_endpoint_hides_premium_content(self):
+        BookSummary.objects.create(book=self.book, summary_type='short', content='Yarım', is_complete=False)
+        url = f'/books/{self.book.slug}/summary-status/'
+
+        anonymous = self.client.get(url).json()
+        self.assertEqual(anonymous['summaries'][0]['content'], '')
+        self.assertTrue(anonymous['summaries'][0]['locked'])
+        self.assertFalse(anonymous['is_complete'])
+
+        self.client.force_login(self.book.author)
+        owner = self.client.get(url).json()
+        self.assertEqual(owner['summaries'][0]['content'], 'Yarım')
+
+
+@override_settings(
+    CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'view-counter-tests'},
+        'counters': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'view-counter-tests-counters',
+            'TIMEOUT': None, 'OPTIONS': {'MAX_ENTRIES': 10 ** 9},
+        },
+    },
+    VIEW_COUNTER_FLUSH_INTERVAL=3600,
+)
+class BufferedViewCounterTests(TransactionTestCase):
+
+    def setUp(self):
+        author = get_user_model().objects.create_user('yazar', 'yazar@example.com', 'parola')
+        self.books = [
+            Book.objects.create(title=f'Kitap {i}', author=author, description='-', status='published')
+            for i in range(3)
+        ]
+        self.counter = BufferedCounter(Book, 'view_count')
+
+    # Test veritabanı paylaşımlı önbellekli bellek içi SQLite: eşzamanlı yazma beklemek yerine
+    # "table is locked" verir; bu yüzden istekler sırasında boşaltma yapılmaz, sonda tek seferde yazılır
+    def test_no_increments_lost_under_concurrent_requests(self):
+        threads_count, views_per_thread = 8, 25
+        errors = []
+        SiteSettings.get_settings()  # Ayar kaydı istekler aynı anda oluşturmaya çalışmasın diye önceden
+
+        # Tarayıcı önbelleğindeki sayfa: şablon üretilmeden 304 döner, görüntülenme yine sayılır
+        since = http_date(time.time() + 3600)
+
+        def reader(index):
+            client = Client()
+            try:
+                for view in range(views_per_thread):
+                    book = self.books[(index + view) % len(self.books)]
+                    response = client.get(
+                        reverse('book_detail', args=[book.slug]), HTTP_IF_MODIFIED_SINCE=since,
+                    )
+                    if response.status_code != 304:
+                        errors.append(response.status_code)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=reader, args=(i,)) for i in range(threads_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.counter.flush(all_rows=True, wait=5)
+
+        self.assertEqual(errors, [])
+        total = sum(Book.objects.values_list('view_count', flat=True))
+        self.assertEqual(total, threads_count * views_per_thread)
+        self.assertEqual(sum(self.counter.pending(book.pk) for book in self.books), 0)
+
+    def test_flush_uses_batched_updates(self):
+        with override_settings(VIEW_COUNTER_FLUSH_INTERVAL=3600):
+            for book in self.books:
+                self.counter.increment(book.pk)
+            self.counter.increment(self.books[0].pk)
+
+            # Artışı 1 olan iki kitap tek UPDATE, artışı 2 olan kitap bir UPDATE
+            with self.assertNumQueries(4):  # SAVEPOINT/BEGIN, 2 UPDATE, RELEASE/COMMIT
+                self.assertEqual(self.counter.flush(), 4)
+
+        self.assertEqual(Book.objects.get(pk=self.books[0].pk).view_count, 2)
+        self.assertEqual(Book.objects.get(pk=self.books[1].pk).view_count, 1)
+
+    def test_timer_flushes_without_new_views(self):
+        # Sayaç önbellekte sıfırlandıktan sonra UPDATE commit edilir; bitişi flush'ın dönüşüyle beklenir
+        flushed = threading.Event()
+        flush = self.counter.flush
+
+        def tracked_flush(*args, **kwargs):
+            written = flush(*args, **kwargs)
+            if written:  # Kilit alınamadıysa (None) sonraki turda yeniden denenir
+                flushed.set()
+            return written
+
+        with override_settings(VIEW_COUNTER_FLUSH_INTERVAL=1), \
+                mock.patch.object(self.counter, 'flush', side_effect=tracked_flush):
+            self.counter.increment(self.books[0].pk)
+            self.assertEqual(Book.objects.get(pk=self.books[0].pk).view_count, 0)
+
+            # Başka görüntülenme gelmez; zamanlayıcı aralık dolunca yazar
+            self.assertTrue(flushed.wait(5))
+
+        self.assertEqual(Book.objects.get(pk=self.books[0].pk).view_count, 1)
+
+    def test_flush_command_refuses_process_local_cache(self):
+        self.counter.increment(self.books[0].pk, 3)
+        with self.assertRaises(CommandError):
+            call_command('flush_view_counts', stdout=StringIO())
+        self.assertEqual(self.counter.pending(self.books[0].pk), 3)
+
+    def test_flush_command_writes_shared_cache(self):
+        with tempfile.TemporaryDirectory() as tmp_dir, override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'counters': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': tmp_dir},
+        }):
+            # Başka bir sürecin artışları gibi: bu süreçteki sayaçlar kitabı tanımaz
+            self.counter.increment(self.books[1].pk, 2)
+            call_command('flush_view_counts', stdout=StringIO())
+
+        self.assertEqual(Book.objects.get(pk=self.books[1].pk).view_count, 2)
+
+
+@skipUnless(HAS_FTS5, 'SQLite FTS5 desteği yok')
+class BookSearchIndexTests(TestCase):
+
+    def setUp(self):
+        User = get_user_model()
+        self.author = User.objects.create_user('ayse', 'ayse@example.com', 'parola', first_name='Ayşe', last_name='Işık')
+        self.other = User.objects.create_user('mehmet', 'mehmet@example.com', 'parola')
+        self.lighthouse = Book.objects.create(
+            title='Deniz Feneri', author=self.author, description='Kıyıda geçen bir hikâye', tags='deniz, fener',
+        )
+        self.mountain = Book.objects.create(
+            title='Dağın Öteki Yüzü', author=self.other, description='Fenerin ışığı dağdan görünmez',
+        )
+
+    def search(self, query):
+        return list(search.search_books(Book.objects.all(), query).values_list('title', flat=True))
+
+    def test_prefix_match_ranked_by_title_first(self):
+        self.assertEqual(self.search('fener'), ['Deniz Feneri', 'Dağın Öteki Yüzü'])
+        self.assertEqual(self.search('fen dağ'), ['Dağın Öteki Yüzü'])
+
+    def test_turkish_case_folding(self):
+        self.assertEqual(self.search('IŞI'), ['Deniz Feneri', 'Dağın Öteki Yüzü'])
+        self.assertEqual(self.search('DAĞIN'), ['Dağın Öteki Yüzü'])
+        self.assertEqual(self.search('ayse isik'), ['Deniz Feneri'])
+        self.assertEqual(self.search('"*'), [])
+
+    def test_index_follows_changes(self):
+        self.mountain.title = 'Zirve'
+        self.mountain.save()
+        self.assertEqual(self.search('zirve'), ['Zirve'])
+        self.assertEqual(self.search('dağın'), [])
+
+        self.mountain.co_authors.add(self.author)
+        self.assertCountEqual(self.search('ayşe'), ['Deniz Feneri', 'Zirve'])
+        self.author.co_authored_books.clear()
+        self.assertEqual(self.search('ayşe'), ['Deniz Feneri'])
+
+        self.other.last_name = 'Yılmaz'
+        self.other.save()
+        self.assertEqual(self.search('yilmaz'), ['Zirve'])
+
+        self.lighthouse.delete()
+        self.assertEqual(self.search('deniz'), [])
+
+
+@skipUnless(HAS_FTS5, 'SQLite FTS5 desteği yok')
+class ChapterSearchTests(TestCase):
+
+    def setUp(self):
+        author = get_user_model().objects.create_user('yazar', 'yazar@example.com', 'parola')
+        self.book = Book.objects.create(title='Deniz', author=author, description='-', status='published')
+        self.other = Book.objects.create(title='Dağ', author=author, description='-', status='published')
+        ingest_chapters(self.book, [
+            {'title': 'Liman', 'order': 1, 'content': '<p>Gemi limana yanaştı.</p><p>Martılar <b>bağırıyordu</b>.</p>'},
+            {'title': 'Fener', 'order': 2, 'content': '<p>Fenerin IŞIĞI &amp; <script>x()</script>dalgalar.</p>'},
+        ])
+        ingest_chapters(self.other, [{'title': 'Zirve', 'order': 1, 'content': '<p>Fener yoktu, ışık vardı.</p>'}])
+
+    def test_snippets_highlight_original_text(self):
+        response = self.client.get(reverse('book_search', args=[self.book.slug]), {'q': 'ışığı'})
+        results = response.json()['results']
+
+        self.assertEqual([result['title'] for result in results], ['Fener'])
+        self.assertEqual(results[0]['snippet'], 'Fenerin <mark>IŞIĞI</mark> &amp; dalgalar.')
+        self.assertEqual(results[0]['url'], reverse('book_chapter', args=[self.book.slug, 2]))
+
+        chapter = self.client.get(results[0]['url'])
+        self.assertEqual(chapter.status_code, 200)
+        self.assertEqual(chapter.json()['title'], 'Fener')
+
+    def test_chapter_link_hidden_for_unpublished_book(self):
+        self.book.status = 'draft'
+        self.book.save()
+        response = self.client.get(reverse('book_chapter', args=[self.book.slug, 2]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_results_limited_to_book_and_follow_edits(self):
+        self.assertEqual([r['title'] for r in search.search_chapters(self.book.pk, 'fen')], ['Fener'])
+        self.assertEqual([r['title'] for r in search.search_chapters(self.other.pk, 'fen')], ['Zirve'])
+        self.assertEqual(search.search_chapters(self.book.pk, 'mart bağır')[0]['title'], 'Liman')
+
+        chapter = self.book.chapters.get(order=1)
+        chapter.content = '<p>Rıhtım boştu.</p>'
+        chapter.save()
+        self.assertEqual(search.search_chapters(self.book.pk, 'martı'), [])
+        self.assertEqual(search.search_chapters(self.book.pk, 'rihtim')[0]['id'], chapter.pk)
+
+        chapter.delete()
+        self.assertEqual(search.search_chapters(self.book.pk, 'rihtim'), [])
+        self.book.delete()
+        self.assertEqual(search.search_chapter_ids('fener'), [self.other.chapters.get().pk])
+
+
+class CursorPaginationTests(TestCase):
+
+    def setUp(self):
+        author = get_user_model().objects.create_user('yazar', 'yazar@example.com', 'parola')
+        for i in range(11):
+            Book.objects.create(title=f'Kitap {i}', author=author, description='-', status='published')
+        # Eşit sıralama değerleri id ile ayrışmalı
+        Book.objects.update(created_at=timezone.now())
+        self.expected = list(Book.objects.order_by('-created_at', '-id').values_list('pk', flat=True))
+
+    def test_walks_forward_and_back_without_offset_or_count(self):
+        paginator = CursorPaginator(Book.objects.all(), 4, ('-created_at', '-id'))
+        pages = [paginator.get_page()]
+        while pages[-1].has_next():
+            with self.assertNumQueries(1):
+                pages.append(paginator.get_page(pages[-1].next_cursor))
+
+        self.assertEqual([book.pk for page in pages for book in page], self.expected)
+        self.assertEqual([len(page) for page in pages], [4, 4, 3])
+        self.assertFalse(pages[0].has_previous())
+
+        back = paginator.get_page(pages[2].previous_cursor)
+        self.assertEqual([book.pk for book in back], self.expected[4:8])
+        self.assertEqual([book.pk for book in paginator.get_page(back.previous_cursor)], self.expected[:4])
+
+    def test_tampered_cursor_falls_back_to_first_page(self):
+        paginator = CursorPaginator(Book.objects.all(), 4, ('-created_at', '-id'))
+        cursor = paginator.get_page().next_cursor
+        page = paginator.get_page(cursor[:-2] + 'xx')
+        self.assertEqual([book.pk for book in page], self.expected[:4])
+
+    def test_links_keep_filters_and_count_is_cached(self):
+        paginator = CursorPaginator(Book.objects.all(), 4, ('-created_at', '-id'), count=True)
+        page = paginator.get_page(query_params=QueryDict('category=roman&page=3'))
+        self.assertTrue(page.next_url.startswith('?category=roman&cursor='))
+        self.assertEqual(page.count, 11)
+
+        Book.objects.first().delete()
+        self.assertEqual(CursorPaginator(Book.objects.all(), 4, count=True).get_page().count, 11)
+
+
+class SiteSettingsCacheTests(TestCase):
+
+    def setUp(self):
+        site_settings_cache.get_cache().clear()
+        site_settings_cache._local.entry = None
+        self.request = RequestFactory().get('/')
+        self.template = engines['django'].from_string('{{ site_name }} {{ site_settings.contact_email }}')
+
+    def test_warm_render_does_not_query_settings(self):
+        self.template.render(request=self.request)
+        with self.assertNumQueries(0):
+            self.template.render(request=self.request)
+
+    def test_save_invalidates_cached_copy(self):
+        self.template.render(request=self.request)
+        site_settings = SiteSettings.objects.get(pk=1)
+        site_settings.site_name = 'Yeni Ad'
+        site_settings.save()
+
+        self.assertTrue(self.template.render(request=self.request).startswith('Yeni Ad'))
+
+    def test_version_bump_from_another_process_reloads(self):
+        self.template.render(request=self.request)
+        # Başka bir süreç kaydetti: veritabanı ve ortak sürüm değişti, bu sürecin kopyası eski
+        SiteSettings.objects.filter(pk=1).update(site_name='Diğer Süreç')
+        site_settings_cache.get_cache().incr(site_settings_cache.VERSION_KEY)
+
+        with self.assertNumQueries(1):
+            self.assertTrue(self.template.render(request=self.request).startswith('Diğer Süreç'))
+
+
+class PageCacheTests(TestCase):
+
+    def setUp(self):
+        page_cache.get_cache().clear()
+        SiteSettings.get_settings()  # Kaydın ilk oluşturulması 'site' etiketini bayatlatır
+        self.author = get_user_model().objects.create_user('yazar', 'yazar@example.com', 'parola')
+        ArticleSeries.objects.create(title='İlk Seri', slug='ilk-seri', author=self.author)
+
+    def test_anonymous_page_served_from_cache_until_model_saved(self):
+        self.assertNotIn('X-Page-Cache', self.client.get('/'))
+        with self.assertNumQueries(0):
+            response = self.client.get('/')
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+
+        ArticleSeries.objects.create(title='Yeni Seri', slug='yeni-seri', author=self.author)
+        response = self.client.get('/')
+        self.assertNotIn('X-Page-Cache', response)
+        self.assertContains(response, 'Yeni Seri')
+        # Farklı sorgu parametresi ayrı kayıttır
+        self.assertNotIn('X-Page-Cache', self.client.get('/?cursor=x'))
+
+    def test_authenticated_users_bypass_cache(self):
+        self.client.get('/')
+        self.client.force_login(self.author)
+        self.assertNotIn('X-Page-Cache', self.client.get('/'))
+
+    def test_evicted_tag_versions_do_not_revive_stale_pages(self):
+        tags = list(page_cache.MODEL_TAGS.values())
+        keys = [page_cache._tag_key(tag) for tag in tags]
+        page_cache.get_cache().delete_many(keys)
+        page_cache.invalidate_tags(*tags)
+        self.client.get('/')
+        self.assertEqual(self.client.get('/')['X-Page-Cache'], 'hit')
+
+        # LocMemCache ayıklaması sürüm anahtarlarını düşürür, ardından içerik değişir;
+        # yeniden başlayan sürümler sayfanın kaydedildiği sürümlerle çakışmamalı
+        page_cache.get_cache().delete_many(keys)
+        page_cache.invalidate_tags(*tags)
+        self.assertNotIn('X-Page-Cache', self.client.get('/'))
+
+    def test_concurrent_misses_render_once_and_hits_call_hook(self):
+        calls, hits = [], []
+
+        def view():
+            calls.append(1)
+            time.sleep(0.2)
+            response = HttpResponse('sayfa')
+            response.page_cache_meta = {'book_id': 7}
+            return response
+
+        def fetch(results):
+            request = RequestFactory().get('/books/ornek/')
+            request.user = AnonymousUser()
+            results.append(page_cache.cached_response(
+                request, view, ('books',), on_hit=lambda request, meta: hits.append(meta['book_id']),
+            ).content)
+
+        results = []
+        threads = [threading.Thread(target=fetch, args=(results,)) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [b'sayfa'] * 5)
+        self.assertEqual(hits, [7] * 4)
+
+
+@override_settings(VIEW_COUNTER_FLUSH_INTERVAL=3600)
+class ConditionalGetTests(TestCase):
+
+    def setUp(self):
+        page_cache.get_cache().clear()
+        author = get_user_model().objects.create_user('yazar', 'yazar@example.com', 'parola')
+        series = ArticleSeries.objects.create(title='Seri', slug='seri', author=author)
+        self.article = Article.objects.create(title='Yazı', article_slug='yazi', series=series, author=author)
+        self.book = Book.objects.create(title='Kitap', author=author, description='-', status='published')
+        self.url = '/blog/seri/yazi/'
+
+    def test_unchanged_article_answers_304_without_rendering(self):
+        response = self.client.get(self.url)
+        etag = response['ETag']
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('Last-Modified'))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.article.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_validators_change_with_site_settings_and_login(self):
+        etag = self.client.get(self.url)['ETag']
+        SiteSettings.get_settings().save()
+        self.assertNotEqual(self.client.get(self.url)['ETag'], etag)
+
+        etag = self.client.get(self.url)['ETag']
+        self.client.force_login(self.article.author)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_not_modified_book_page_still_counts_view(self):
+        counter = get_counter(Book, 'view_count')
+        since = http_date(time.time() + 3600)
+        response = self.client.get(f'/books/{self.book.slug}/', HTTP_IF_MODIFIED_SINCE=since)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(counter.pending(self.book.pk), 1)
+
+    def test_logged_in_users_get_no_last_modified(self):
+        since = http_date(time.time() + 3600)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=since).status_code, 304)
+
+        # Giriş öncesi alınan sayfanın tarihi, giriş sonrasında 304 almaya yetmemeli
+        self.client.force_login(self.article.author)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Last-Modified'))
+        self.assertTrue(response.has_header('ETag'))
+
+    def test_processing_changes_book_validators(self):
+        Book.objects.filter(pk=self.book.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        before, _ = views.book_validators(request, self.book.slug)
+
+        job_queue.enqueue_book_processing(self.book, provider='local')
+        chapters = [{'order': 1, 'title': 'Bölüm 1', 'line_number': 0, 'level': 1, 'content': 'Metin'}]
+        with tempfile.TemporaryDirectory() as tmp_dir, override_settings(MEDIA_ROOT=tmp_dir), \
+                mock.patch('main.services.document_processor.iter_book_file', return_value=iter(chapters)):
+            self.book.file.save('kitap.pdf', File(io.BytesIO(b'-')))
+            Book.objects.filter(pk=self.book.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+            job_queue.process_book(job_queue.claim_job('isci-1'), 'isci-1')
+        after, _ = views.book_validators(request, self.book.slug)
+
+        self.assertNotEqual(after[0], before[0])
+        self.assertGreater(after[1], before[1])
+
+
+class FragmentCacheTests(TestCase):
+
+    def setUp(self):
+        page_cache.get_cache().clear()
+        self.header = get_template('includes/header.html')
+        self.footer = get_template('includes/footer.html')
+
+    def render(self, template, user):
+        request = RequestFactory().get('/')
+        request.user = user
+        return template.render(request=request)
+
+    def test_user_specific_parts_are_not_shared(self):
+        User = get_user_model()
+        ayse = User.objects.create_user('ayse', 'ayse@example.com', 'parola', user_role='author')
+        ali = User.objects.create_user('ali', 'ali@example.com', 'parola', user_role='author')
+        okur = User.objects.create_user('okur', 'okur@example.com', 'parola')
+
+        self.render(self.header, ayse)
+        header = self.render(self.header, ali)
+        self.assertIn('ali', header)
+        self.assertNotIn('ayse', header)
+        self.assertIn('Kitap Yükle', header)
+        self.assertNotIn('Kitap Yükle', self.render(self.header, okur))
+
+    def test_settings_change_refreshes_fragments(self):
+        self.render(self.footer, AnonymousUser())
+        site_settings = SiteSettings.get_settings()
+        site_settings.contact_email = 'yeni@example.com'
+        site_settings.save()
+        self.assertIn('yeni@example.com', self.render(self.footer, AnonymousUser()))
+
+
+class AdminChangelistQueryTests(TestCase):
+    changelists = [
+        'main_articleseries', 'main_article', 'main_bookcategory', 'main_book', 'main_chapter',
+        'main_booksummary', 'main_processingjob', 'users_customuser', 'users_subscribedusers',
+    ]
+
+    def setUp(self):
+        admin_user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'parola')
+        self.client.force_login(admin_user)
+        self.rows = 0
+
+    def add_rows(self, count):
+        """Her modele, her satırı farklı yazar/kitap/bölüme bağlı count kayıt ekler"""
+        User = get_user_model()
+        for _ in range(count):
+            self.rows += 1
+            n = self.rows
+            author = User.objects.create_user(f'yazar{n}', f'yazar{n}@example.com', 'parola')
+            series = ArticleSeries.objects.create(title=f'Seri {n}', slug=f'seri-{n}', author=author)
+            Article.objects.create(title=f'Yazı {n}', article_slug=f'yazi-{n}', series=series, author=author)
+            category = BookCategory.objects.create(name=f'Kategori {n}')
+            book = Book.objects.create(title=f'Kitap {n}', author=author, category=category, description='-')
+            chapter = Chapter.objects.create(book=book, title=f'Bölüm {n}', order=1)
+            BookSummary.objects.create(book=book, chapter=chapter, summary_type='chapter', content='Özet')
+            ProcessingJob.objects.create(book=book)
+
+    def count_queries(self, changelist):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse(f'admin:{changelist}_changelist'))
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self.add_rows(2)
+        few = {changelist: self.count_queries(changelist) for changelist in self.changelists}
+        self.add_rows(8)
+        for changelist in self.changelists:
+            with self.subTest(changelist=changelist):
+                self.assertEqual(self.count_queries(changelist), few[changelist])
+
+    def test_article_count_comes_from_annotation(self):
+        self.add_rows(1)
+        series = ArticleSeries.objects.get()
+        Article.objects.create(title='Ek', article_slug='ek', series=series, author=series.author)
+        response = self.client.get(reverse('admin:main_articleseries_changelist'))
+        self.assertContains(response, '2 Makale')
@@ -12,6 +12,10 @@ urlpatterns = [
     # Book URLs
     path("books/", views.book_list, name="book_list"),
     path("books/<slug:slug>/", views.book_detail, name="book_detail"),
+    path("books/<slug:slug>/processing-status/", views.book_processing_status, name="book_processing_status"),
+    path("books/<slug:slug>/summary-status/", views.book_summary_status, name="book_summary_status"),
+    path("books/<slug:slug>/search/", views.book_search, name="book_search"),
+    path("books/<slug:slug>/chapters/<int:order>/", views.book_chapter, name="book_chapter"),
     
     # Admin/Newsletter URLs
     path("newsletter/", views.newsletter, name="newsletter"),
@@ -1,5 +1,6 @@
 from django.http import JsonResponse
 from django.shortcuts import render, redirect
+from django.urls import reverse
 from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
 from django.core.paginator import Paginator
@@ -7,10 +8,15 @@ from django.db import models
 
 from users.models import SubscribedUsers
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.core.mail import EmailMessage
 
-from .models import Article, ArticleSeries, Book, BookCategory
-from .decorators import user_is_superuser
+from .models import Article, ArticleSeries, Book, BookCategory, BookSummary, Chapter, ProcessingJob
+from .decorators import cache_anonymous_page, conditional_page, user_is_superuser
+from .services import search
+from .services.conditional import page_validators
+from .services.view_counter import get_counter
+from .pagination import paginate
 from .forms import NewsletterForm, SeriesCreateForm, ArticleCreateForm, SeriesUpdateForm, ArticleUpdateForm#, NewsletterForm
 from users.models import SubscribedUsers
 
@@ -18,14 +24,13 @@ import os
 from uuid import uuid4
 
 # Create your views here.
+@cache_anonymous_page('series', 'site')
 def homepage(request):
     # Son blog yazıları için pagination
-    all_series = ArticleSeries.objects.all().order_by('-published')
+    all_series = ArticleSeries.objects.all()
     
     # Pagination - 6 seri per sayfa
-    paginator = Paginator(all_series, 6)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate(request, all_series, 6, ('-published', '-id'))
     
     return render(
         request=request,
@@ -39,15 +44,14 @@ def homepage(request):
         )
 
 # Blog Views
+@cache_anonymous_page('articles', 'series', 'site')
 def blog_list(request):
     """Tüm blog yazılarını listeler"""
-    articles = Article.objects.all().order_by('-published')
+    articles = Article.objects.all()
     series_list = ArticleSeries.objects.all().order_by('-published')
     
     # Pagination
-    paginator = Paginator(articles, 9)  # 9 makale per sayfa
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate(request, articles, 9, ('-published', '-id'))  # 9 makale per sayfa
     
     return render(
         request=request,
@@ -59,18 +63,17 @@ def blog_list(request):
         }
     )
 
+@cache_anonymous_page('articles', 'series', 'site')
 def blog_series(request, series_slug):
     """Belirli bir serinin tüm yazılarını listeler"""
     series = ArticleSeries.objects.filter(slug=series_slug).first()
     if not series:
         return redirect('blog_list')
     
-    articles = Article.objects.filter(series=series).order_by('-published')
+    articles = Article.objects.filter(series=series)
     
     # Pagination
-    paginator = Paginator(articles, 9)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate(request, articles, 9, ('-published', '-id'))
     
     return render(
         request=request,
@@ -82,6 +85,15 @@ def blog_series(request, series_slug):
         }
     )
 
+def article_validators(request, series_slug, article_slug):
+    row = Article.objects.filter(
+        series__slug=series_slug, article_slug=article_slug
+    ).values_list('pk', 'modified').first()
+    if not row:
+        return None
+    return page_validators(request, f'article-{row[0]}', row[1]), None
+
+@conditional_page(article_validators)
 def blog_detail(request, series_slug, article_slug):
     """Blog yazısı detay sayfası"""
     article = Article.objects.filter(series__slug=series_slug, article_slug=article_slug).first()
@@ -297,9 +309,10 @@ def newsletter(request):
     return render(request=request, template_name='main/newsletter.html', context={'form': form})
 
 # Book Views
+@cache_anonymous_page('books', 'categories', 'site')
 def book_list(request):
     """Tüm kitapları listeler"""
-    books = Book.objects.filter(status='published').order_by('-created_at')
+    books = Book.objects.filter(status='published')
     categories = BookCategory.objects.filter(is_active=True).order_by('order', 'name')
     
     # Kategori filtresi
@@ -313,18 +326,21 @@ def book_list(request):
     # Arama filtresi
     search_query = request.GET.get('q')
     if search_query:
-        books = books.filter(
-            models.Q(title__icontains=search_query) |
-            models.Q(description__icontains=search_query) |
-            models.Q(author__username__icontains=search_query) |
-            models.Q(author__first_name__icontains=search_query) |
-            models.Q(author__last_name__icontains=search_query)
-        )
-    
-    # Pagination - 12 kitap per sayfa
-    paginator = Paginator(books, 12)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+        # Tam metin indeksi (BM25 sıralı); FTS5 yoksa LIKE aramasına dön
+        results = search.search_books(books, search_query)
+        if results is None:
+            results = books.filter(
+                models.Q(title__icontains=search_query) |
+                models.Q(description__icontains=search_query) |
+                models.Q(author__username__icontains=search_query) |
+                models.Q(author__first_name__icontains=search_query) |
+                models.Q(author__last_name__icontains=search_query)
+            ).order_by('-created_at', '-id')
+        # Alaka sırası imleçle devam ettirilemez; arama sonuçları sayfa numarasıyla gezilir
+        page_obj = Paginator(results, 12).get_page(request.GET.get('page'))
+    else:
+        # Pagination - 12 kitap per sayfa
+        page_obj = paginate(request, books, 12, ('-created_at', '-id'))
     
     return render(
         request=request,
@@ -338,6 +354,19 @@ def book_list(request):
         }
     )
 
+def count_cached_book_view(request, meta):
+    """Önbellekten sunulan ya da 304 ile yanıtlanan kitap sayfası da görüntülenme sayılır"""
+    if meta:
+        get_counter(Book, 'view_count').increment(meta['book_id'])
+
+def book_validators(request, slug):
+    row = Book.objects.filter(slug=slug, status='published').values_list('pk', 'updated_at').first()
+    if not row:
+        return None
+    return page_validators(request, f'book-{row[0]}', row[1]), {"book_id": row[0]}
+
+@conditional_page(book_validators, on_not_modified=count_cached_book_view)
+@cache_anonymous_page('books', 'categories', 'site', on_hit=count_cached_book_view)
 def book_detail(request, slug):
     """Kitap detay sayfası"""
     book = Book.objects.filter(slug=slug, status='published').select_related('author', 'category').first()
@@ -345,9 +374,10 @@ def book_detail(request, slug):
         messages.error(request, "Kitap bulunamadı veya henüz yayınlanmadı.")
         return redirect('book_list')
     
-    # Görüntülenme sayısını artır
-    book.view_count += 1
-    book.save(update_fields=['view_count'])
+    # Görüntülenme sayısını artır (tamponlanır, toplu olarak yazılır)
+    book_views = get_counter(Book, 'view_count')
+    book_views.increment(book.pk)
+    book.view_count += book_views.pending(book.pk)
     
     # İlgili kitaplar (aynı kategoriden)
     related_books = Book.objects.filter(
@@ -355,11 +385,114 @@ def book_detail(request, slug):
         status='published'
     ).exclude(id=book.id)[:6]
     
-    return render(
+    response = render(
         request=request,
         template_name='main/book_detail.html',
         context={
             "book": book,
             "related_books": related_books
         }
-    )
\ No newline at end of file
+    )
+    response.page_cache_meta = {"book_id": book.pk}
+    return response
+
+@staff_member_required
+def book_processing_status(request, slug):
+    """Kitabın son işleme görevinin durumunu JSON olarak döndürür (admin takibi için)"""
+    job = ProcessingJob.objects.filter(book__slug=slug).order_by('-created_at').first()
+    if not job:
+        return JsonResponse({"status": None})
+    
+    return JsonResponse({
+        "status": job.status,
+        "status_display": job.get_status_display(),
+        "stage": job.stage,
+        "stage_display": job.get_stage_display(),
+        "progress": job.progress,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "last_error": job.last_error,
+        "heartbeat_at": job.heartbeat_at.isoformat() if job.heartbeat_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    })
+
+def book_summary_status(request, slug):
+    """
+    Kitap özetlerinin güncel (yarım olabilir) halini JSON olarak döndürür
+    Okuyucu sayfası özet üretilirken bu adresi yoklayarak ilerlemeyi gösterir.
+    Premium özetlerin içeriği yalnızca premium üyelere, yazara ve yöneticilere gönderilir.
+    """
+    book = Book.objects.filter(slug=slug, status='published').only('id', 'author_id').first()
+    if not book:
+        return JsonResponse({"error": "Kitap bulunamadı"}, status=404)
+    
+    user = request.user
+    has_access = user.is_authenticated and (
+        user.is_staff or user.pk == book.author_id or user.is_premium_active
+    )
+    
+    summaries = []
+    for summary in BookSummary.objects.filter(book=book, chapter__isnull=True).order_by('summary_type'):
+        locked = summary.is_premium_only and not has_access
+        summaries.append({
+            "summary_type": summary.summary_type,
+            "is_complete": summary.is_complete,
+            "locked": locked,
+            "content": "" if locked else summary.content,
+            "length": len(summary.content),
+            "updated_at": summary.updated_at.isoformat(),
+        })
+    
+    return JsonResponse({
+        "summaries": summaries,
+        "is_complete": bool(summaries) and all(item["is_complete"] for item in summaries),
+    })
+
+def book_search(request, slug):
+    """
+    Kitabın bölümlerinde arama yapar (kitap içi arama)
+    Sonuçlar alakaya göre sıralı, eşleşmeleri <mark> ile işaretlenmiş kısa alıntılar
+    ve bölüm bağlantılarıyla JSON olarak döner.
+    """
+    book = Book.objects.filter(slug=slug, status='published').only('id', 'slug').first()
+    if not book:
+        return JsonResponse({"error": "Kitap bulunamadı"}, status=404)
+    
+    query = request.GET.get('q', '').strip()
+    try:
+        limit = min(max(int(request.GET.get('limit', 20)), 1), 100)
+    except ValueError:
+        limit = 20
+    
+    results = search.search_chapters(book.pk, query, limit=limit)
+    if results is None:
+        return JsonResponse({"error": "Kitap içi arama kullanılamıyor"}, status=503)
+    
+    for result in results:
+        result["url"] = reverse('book_chapter', args=[book.slug, result['order']])
+    
+    return JsonResponse({"query": query, "results": results})
+
+def book_chapter(request, slug, order):
+    """
+    Kitabın tek bir bölümünü JSON olarak döndürür
+    Kitap içi arama sonuçları bu adrese bağlanır; bölümler sıra numarasıyla adreslenir
+    çünkü slug kitap içinde tekil değildir.
+    """
+    chapter = Chapter.objects.filter(
+        book__slug=slug, book__status='published', order=order,
+    ).select_related('parent').first()
+    if not chapter:
+        return JsonResponse({"error": "Bölüm bulunamadı"}, status=404)
+    
+    return JsonResponse({
+        "title": chapter.title,
+        "slug": chapter.slug,
+        "order": chapter.order,
+        "level": chapter.level,
+        "parent_order": chapter.parent.order if chapter.parent else None,
+        "page_start": chapter.page_start,
+        "page_end": chapter.page_end,
+        "word_count": chapter.word_count,
+        "content": chapter.content,
+    })
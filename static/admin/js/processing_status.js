@@ -0,0 +1,33 @@
+// ============================================
+// LIBROVAAI ADMIN - KİTAP İŞLEME DURUMU
+// data-processing-status-url taşıyan öğeleri görev bitene kadar yoklar
+// ============================================
+
+(function () {
+    'use strict';
+
+    var POLL_INTERVAL = 5000;
+    var FINISHED = ['done', 'failed'];
+
+    function poll(element) {
+        fetch(element.dataset.processingStatusUrl, {credentials: 'same-origin'})
+            .then(function (response) { return response.json(); })
+            .then(function (job) {
+                if (!job.status) {
+                    return;
+                }
+                element.textContent = job.status_display + ' - ' + job.stage_display + ' (%' + job.progress + ')';
+                if (FINISHED.indexOf(job.status) === -1) {
+                    setTimeout(function () { poll(element); }, POLL_INTERVAL);
+                }
+            })
+            .catch(function () {
+                setTimeout(function () { poll(element); }, POLL_INTERVAL * 2);
+            });
+    }
+
+    document.addEventListener('DOMContentLoaded', function () {
+        var elements = document.querySelectorAll('[data-processing-status-url]');
+        Array.prototype.forEach.call(elements, poll);
+    });
+})();